@@ -0,0 +1,106 @@
+"""
+Bounded-concurrency batch execution for RBoost PRO.
+
+Debloat, service and scheduled-task changes each come down to running a
+console tool once per item. BatchExecutor runs such items on a shared,
+size-limited thread pool instead of one after another. Every command gets a
+timeout, transient failures (timeouts, TransientError) are retried with a
+short backoff, and the outcome of every item is gathered into an
+ItemReport. Commands go through an injectable runner, so batches can be
+exercised with a stub that never starts a process.
+"""
+import logging
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+ItemReport = namedtuple("ItemReport", ["item", "status", "detail", "attempts"])  # status: changed, already or failed
+
+
+class TransientError(Exception):
+    """Raised by an action for a failure that is worth retrying."""
+
+
+def run_hidden(args, timeout=60):
+    """Runs a console tool without a window; returns (exit code, stdout)."""
+    creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout, creationflags=creationflags)
+    return result.returncode, result.stdout
+
+
+class BatchExecutor:
+    """
+    Shared pool for per-item batch work. `runner(args, timeout)` runs one
+    command and returns (exit code, stdout); `command()` applies this
+    executor's timeout to it. The pool is created on first use.
+    """
+
+    def __init__(self, runner=run_hidden, workers=4, timeout=120, retries=2, retry_delay=1.0):
+        self.runner = runner
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rboost-batch")
+            return self._executor
+
+    def command(self, args):
+        """Runs one command with the executor's timeout; returns (exit code, stdout)."""
+        return self.runner(args, timeout=self.timeout)
+
+    def map(self, fn, items):
+        """Calls fn on every item concurrently; returns the results in item order."""
+        return list(self._pool().map(fn, items))
+
+    def _attempt(self, action, item):
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                status, detail = action(item)
+                return ItemReport(item, status, detail, attempts)
+            except (subprocess.TimeoutExpired, TransientError) as e:
+                if attempts > self.retries:
+                    return ItemReport(item, "failed", e, attempts)
+                logging.warning(f"Retrying {item} after transient failure: {e}")
+                time.sleep(self.retry_delay * attempts)
+            except (OSError, subprocess.SubprocessError, ValueError) as e:
+                return ItemReport(item, "failed", e, attempts)
+
+    def run(self, items, action, progress=None):
+        """
+        Runs `action(item)` for every item, at most `workers` at a time.
+        The action returns ("changed" | "already", detail) or raises.
+        `progress(done, total)` is called as items finish. Returns an
+        ItemReport per item, in item order.
+        """
+        items = list(items)
+        futures = [self._pool().submit(self._attempt, action, item) for item in items]
+        reports = []
+        for done, future in enumerate(futures, 1):
+            reports.append(future.result())
+            if progress is not None:
+                progress(done, len(items))
+        return reports
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def summarize_reports(reports):
+    """Returns (changed, already, failed) counts for a list of ItemReports."""
+    counts = {"changed": 0, "already": 0, "failed": 0}
+    for report in reports:
+        counts[report.status] += 1
+    return counts["changed"], counts["already"], counts["failed"]
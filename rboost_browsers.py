@@ -0,0 +1,235 @@
+"""
+Browser cache discovery and cleanup for RBoost PRO.
+
+Every Chromium profile (Default, Profile N, Guest Profile) and every Firefox
+profile is found under LOCALAPPDATA/APPDATA, along with each profile's cache
+stores. Browsers are cleaned concurrently, one worker per browser, and a
+browser that is running is skipped rather than fighting its open files.
+Discovery only reads the environment mapping it is given, so it can be
+pointed at a fake profile tree.
+
+Instead of wiping stores, CacheEviction keeps them warm: it drops only cache
+entries unused for N days, or the least recently used ones above a
+per-profile size budget, decided from a single stat pass.
+"""
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from rboost_cleanup import TreeWalker
+
+BrowserSpec = namedtuple("BrowserSpec", ["name", "kind", "variable", "parts", "processes"])
+CacheStore = namedtuple("CacheStore", ["browser", "profile", "store", "path"])
+StoreReport = namedtuple("StoreReport", ["store", "bytes_freed", "files_deleted", "errors"])
+BrowserReport = namedtuple("BrowserReport", ["browser", "running", "stores"])
+
+BROWSERS = (
+    BrowserSpec("Chrome", "chromium", "LOCALAPPDATA", ("Google", "Chrome", "User Data"), ("chrome.exe",)),
+    BrowserSpec("Edge", "chromium", "LOCALAPPDATA", ("Microsoft", "Edge", "User Data"), ("msedge.exe",)),
+    BrowserSpec("Brave", "chromium", "LOCALAPPDATA", ("BraveSoftware", "Brave-Browser", "User Data"), ("brave.exe",)),
+    BrowserSpec("Firefox", "firefox", "APPDATA", ("Mozilla", "Firefox", "Profiles"), ("firefox.exe",)),
+)
+
+# Relative to a Chromium profile folder
+CHROMIUM_PROFILE_STORES = ("Cache", "Code Cache", "GPUCache", os.path.join("Service Worker", "CacheStorage"))
+# Relative to the Chromium "User Data" folder, shared by all profiles
+CHROMIUM_SHARED_STORES = ("ShaderCache", "GrShaderCache")
+# Relative to a Firefox profile folder, looked up in both the roaming and local copy
+FIREFOX_PROFILE_STORES = ("cache2", "startupCache")
+
+# Bookkeeping files the browsers need to open a cache; entries are never these
+CACHE_INDEX_NAMES = re.compile(r"^(index|the-real-index|data_\d+)$", re.IGNORECASE)
+# Chromium simple-cache entries span <hash>_0, <hash>_1 and <hash>_s
+CACHE_ENTRY_PARTS = re.compile(r"^([0-9a-f]{16})_[0-9s]$")
+
+
+def _chromium_profiles(user_data):
+    try:
+        names = sorted(os.listdir(user_data))
+    except OSError:
+        return []
+    return [name for name in names
+            if (name == "Default" or name.startswith("Profile ") or name == "Guest Profile")
+            and os.path.isdir(os.path.join(user_data, name))]
+
+
+def discover_cache_stores(environ=None, browsers=BROWSERS):
+    """Returns a CacheStore for every existing cache folder of every profile."""
+    environ = os.environ if environ is None else environ
+    stores = []
+    for spec in browsers:
+        base = environ.get(spec.variable)
+        if not base:
+            continue
+        root = os.path.join(base, *spec.parts)
+        if spec.kind == "chromium":
+            for profile in _chromium_profiles(root):
+                stores.extend(CacheStore(spec.name, profile, store, os.path.join(root, profile, store))
+                              for store in CHROMIUM_PROFILE_STORES)
+            stores.extend(CacheStore(spec.name, "(shared)", store, os.path.join(root, store))
+                          for store in CHROMIUM_SHARED_STORES)
+        else:
+            try:
+                profiles = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+            except OSError:
+                continue
+            # Firefox keeps caches in the local copy of each roaming profile
+            local = environ.get("LOCALAPPDATA")
+            bases = [root] + ([os.path.join(local, *spec.parts)] if local else [])
+            for profile in profiles:
+                for store in FIREFOX_PROFILE_STORES:
+                    stores.extend(CacheStore(spec.name, profile, store, os.path.join(profile_base, profile, store))
+                                  for profile_base in bases)
+    seen = set()
+    existing = []
+    for store in stores:
+        key = os.path.normcase(os.path.realpath(store.path))
+        if key not in seen and os.path.isdir(store.path):
+            seen.add(key)
+            existing.append(store)
+    return existing
+
+
+def running_browsers(browsers=BROWSERS, process_names=None):
+    """Names of browsers with a live process; `process_names` overrides the process scan."""
+    if process_names is None:
+        process_names = set()
+        for proc in psutil.process_iter(['name']):
+            name = proc.info.get('name')
+            if name:
+                process_names.add(name.lower())
+    else:
+        process_names = {name.lower() for name in process_names}
+    return {spec.name for spec in browsers if any(exe in process_names for exe in spec.processes)}
+
+
+def clear_store(store):
+    """Deletes everything inside a cache folder, keeping the folder itself."""
+    walker = TreeWalker(store.path)
+    freed = deleted = errors = 0
+    for path, st in walker.files():
+        try:
+            os.remove(path)
+            freed += st.st_size
+            deleted += 1
+        except OSError:
+            errors += 1
+    for path in walker.dirs:
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass  # Still holds files that could not be deleted
+    return StoreReport(store, freed, deleted, errors + walker.errors)
+
+
+def wipe_stores(stores):
+    """Cleaning policy that empties every store of a profile."""
+    return [clear_store(store) for store in stores]
+
+
+class CacheEviction:
+    """
+    Cleaning policy that leaves cache folders in place and removes only
+    cold entries: those unused for `max_age_days`, then the least recently
+    used ones until the profile fits in `budget_bytes`. Last use is the
+    later of access and modification time, since access times are often
+    not updated.
+    """
+
+    def __init__(self, max_age_days=None, budget_bytes=None, now=None):
+        self.max_age_days = max_age_days
+        self.budget_bytes = budget_bytes
+        self.now = now
+
+    def _entries(self, store):
+        """One stat pass over a store: {entry key: [last used, bytes, [(path, size)]]}."""
+        entries = {}
+        walker = TreeWalker(store.path)
+        for path, st in walker.files():
+            name = os.path.basename(path)
+            if CACHE_INDEX_NAMES.match(name) or os.sep + "index-dir" + os.sep in path:
+                continue
+            part = CACHE_ENTRY_PARTS.match(name)
+            key = os.path.join(os.path.dirname(path), part.group(1)) if part else path
+            entry = entries.setdefault(key, [0.0, 0, []])
+            entry[0] = max(entry[0], st.st_atime, st.st_mtime)
+            entry[1] += st.st_size
+            entry[2].append((path, st.st_size))
+        return entries, walker.errors
+
+    def __call__(self, stores):
+        """Evicts across all stores of one profile; returns a StoreReport per store."""
+        now = time.time() if self.now is None else self.now
+        candidates = []  # (last used, bytes, store index, files)
+        scan_errors = [0] * len(stores)
+        for position, store in enumerate(stores):
+            entries, scan_errors[position] = self._entries(store)
+            candidates.extend((used, size, position, files) for used, size, files in entries.values())
+        candidates.sort(key=lambda entry: entry[0])
+
+        total = sum(entry[1] for entry in candidates)
+        cutoff = now - self.max_age_days * 86400 if self.max_age_days is not None else None
+        evict = []
+        for entry in candidates:
+            too_old = cutoff is not None and entry[0] < cutoff
+            over_budget = self.budget_bytes is not None and total > self.budget_bytes
+            if not (too_old or over_budget):
+                break  # Oldest first, so nothing later qualifies either
+            evict.append(entry)
+            total -= entry[1]
+
+        freed = [0] * len(stores)
+        deleted = [0] * len(stores)
+        errors = list(scan_errors)
+        for _, _, position, files in evict:
+            for path, size in files:
+                try:
+                    os.remove(path)
+                    freed[position] += size
+                    deleted[position] += 1
+                except OSError:
+                    errors[position] += 1
+        return [StoreReport(store, freed[i], deleted[i], errors[i]) for i, store in enumerate(stores)]
+
+
+def _clean_browser(browser, stores, policy):
+    by_profile = {}
+    for store in stores:
+        by_profile.setdefault(store.profile, []).append(store)
+    reports = []
+    for profile_stores in by_profile.values():
+        reports.extend(policy(profile_stores))
+    return BrowserReport(browser, False, reports)
+
+
+def clean_browser_caches(stores=None, running=None, policy=wipe_stores, workers=4):
+    """
+    Cleans `stores` (every discovered store by default), one worker per
+    browser. `policy(stores)` handles one profile's stores at a time, e.g.
+    wipe_stores or a CacheEviction. Browsers named in `running` (detected
+    when None) are skipped. Returns a BrowserReport per browser.
+    """
+    stores = discover_cache_stores() if stores is None else stores
+    running = running_browsers() if running is None else running
+    by_browser = {}
+    for store in stores:
+        by_browser.setdefault(store.browser, []).append(store)
+
+    reports = [BrowserReport(browser, True, []) for browser in by_browser if browser in running]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_clean_browser, browser, browser_stores, policy)
+                   for browser, browser_stores in by_browser.items() if browser not in running]
+        reports.extend(future.result() for future in futures)
+    for report in reports:
+        if report.running:
+            logging.info(f"Skipped {report.browser} cache: browser is running.")
+        for store_report in report.stores:
+            logging.info(f"{report.browser} [{store_report.store.profile}] {store_report.store.store}: "
+                         f"freed {store_report.bytes_freed} bytes in {store_report.files_deleted} files "
+                         f"({store_report.errors} errors).")
+    return reports
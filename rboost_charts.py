@@ -0,0 +1,245 @@
+"""
+Lightweight Dashboard charts for RBoost PRO.
+
+Sparklines are drawn straight onto a Tk canvas. Canvas items are created
+once and only re-configured when their coordinates or text actually change,
+and long series are decimated to one min/max pair per pixel column, so the
+cost of a redraw is bounded by the chart width rather than the series length.
+TreemapChart lays out blocks with the squarified treemap algorithm.
+"""
+import math
+import tkinter as tk
+
+import numpy as np
+
+
+def decimate_minmax(times, lows, highs, start, end, columns):
+    """
+    Buckets samples in [start, end] into `columns` pixel columns.
+    Returns (column indexes, per-column minimum, per-column maximum).
+    `times` must be ascending.
+    """
+    empty = np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    if columns < 1 or end <= start or not len(times):
+        return empty
+    keep = (times >= start) & (times <= end) & np.isfinite(lows) & np.isfinite(highs)
+    if not keep.any():
+        return empty
+    times, lows, highs = times[keep], lows[keep], highs[keep]
+    cols = ((times - start) * ((columns - 1) / (end - start))).astype(np.int64)
+    np.clip(cols, 0, columns - 1, out=cols)
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    return cols[starts], np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts)
+
+
+def _nice_ceiling(value):
+    """Rounds a positive value up to 1, 2 or 5 times a power of ten."""
+    if value <= 0 or not math.isfinite(value):
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+class SparklineChart(tk.Canvas):
+    """
+    Stacked sparkline panels on a single canvas.
+    `panels` is a list of (key, title, color, fixed_max); a fixed_max of
+    None autoscales that panel to its visible data.
+    """
+
+    PADDING = 8
+    TITLE_HEIGHT = 20
+
+    def __init__(self, master, panels, bg="#2b2b2b", fg="white", grid_color="#444444", **kwargs):
+        super().__init__(master, bg=bg, highlightthickness=0, **kwargs)
+        self.panels = list(panels)
+        self.fg = fg
+        self.grid_color = grid_color
+        self._items = {}   # key -> dict of canvas item ids
+        self._coords = {}  # item id -> last coords tuple
+        self._texts = {}   # item id -> last text
+        self._data = None  # Last series passed to set_series, kept for resizes
+        self.items_updated = 0  # Canvas item changes made, for profiling
+        self._create_items()
+        self.bind("<Configure>", lambda event: self._render())
+
+    def _create_items(self):
+        for key, title, color, _ in self.panels:
+            self._items[key] = {
+                "frame": self.create_rectangle(0, 0, 0, 0, outline=self.grid_color),
+                "title": self.create_text(0, 0, anchor="nw", fill=self.fg, text=title, font=("Segoe UI", 11, "bold")),
+                "value": self.create_text(0, 0, anchor="ne", fill=color, text="", font=("Segoe UI", 11, "bold")),
+                "scale": self.create_text(0, 0, anchor="nw", fill="#aaaaaa", text="", font=("Segoe UI", 9)),
+                "line": self.create_line(0, 0, 0, 0, fill=color, width=1.5, state="hidden"),
+            }
+
+    def _set_coords(self, item, coords):
+        coords = tuple(coords)
+        if self._coords.get(item) != coords:
+            self.coords(item, *coords)
+            self._coords[item] = coords
+            self.items_updated += 1
+
+    def _set_text(self, item, text):
+        if self._texts.get(item) != text:
+            self.itemconfigure(item, text=text)
+            self._texts[item] = text
+            self.items_updated += 1
+
+    def _set_state(self, item, state):
+        if self._texts.get((item, "state")) != state:
+            self.itemconfigure(item, state=state)
+            self._texts[(item, "state")] = state
+
+    def set_series(self, times, values, start, end, lows=None, highs=None, formats=None):
+        """
+        Plots `values[key]` against `times` over [start, end]. Optional
+        `lows`/`highs` give per-sample envelopes for rolled-up data.
+        `formats` maps a key to a format string for its current value.
+        """
+        self._data = (times, values, start, end, lows or {}, highs or {}, formats or {})
+        self._render()
+
+    def _render(self):
+        width = self.winfo_width()
+        height = self.winfo_height()
+        if width < 20 or height < 20 or not self.panels:
+            return
+        panel_height = height / len(self.panels)
+        pad = self.PADDING
+
+        for index, (key, _, _, fixed_max) in enumerate(self.panels):
+            items = self._items[key]
+            top = index * panel_height
+            left, right = pad, width - pad
+            plot_top = top + self.TITLE_HEIGHT + pad / 2
+            plot_bottom = top + panel_height - pad
+            self._set_coords(items["frame"], (left, plot_top, right, plot_bottom))
+            self._set_coords(items["title"], (left, top + pad / 2))
+            self._set_coords(items["value"], (right, top + pad / 2))
+            self._set_coords(items["scale"], (left + 4, plot_top + 2))
+
+            if self._data is None or key not in self._data[1]:
+                self._set_state(items["line"], "hidden")
+                continue
+            times, values, start, end, lows, highs, formats = self._data
+            series = np.asarray(values[key], dtype=np.float64)
+            plot_width = max(int(right - left), 1)
+            cols, col_low, col_high = decimate_minmax(
+                times, np.asarray(lows.get(key, series), dtype=np.float64),
+                np.asarray(highs.get(key, series), dtype=np.float64), start, end, plot_width)
+
+            if len(series):
+                self._set_text(items["value"], formats.get(key, "{:.1f}").format(series[-1]))
+            if len(cols) < 2:
+                self._set_state(items["line"], "hidden")
+                continue
+
+            y_max = fixed_max if fixed_max is not None else _nice_ceiling(float(col_high.max()))
+            self._set_text(items["scale"], f"max {y_max:g}")
+            scale = (plot_bottom - plot_top) / y_max if y_max else 0.0
+
+            # Two points per pixel column trace the min/max envelope
+            points = np.empty((len(cols) * 2, 2))
+            points[:, 0] = np.repeat(left + cols, 2)
+            points[0::2, 1] = plot_bottom - np.clip(col_low, 0, y_max) * scale
+            points[1::2, 1] = plot_bottom - np.clip(col_high, 0, y_max) * scale
+            self._set_coords(items["line"], np.round(points.ravel(), 1).tolist())
+            self._set_state(items["line"], "normal")
+
+
+def squarify(values, x, y, width, height):
+    """
+    Squarified treemap layout. `values` must be sorted largest first;
+    returns one (x, y, width, height) rectangle per value.
+    """
+    total = float(sum(values))
+    if total <= 0 or width <= 0 or height <= 0:
+        return [(x, y, 0, 0)] * len(values)
+    scale = width * height / total
+    areas = [value * scale for value in values if value > 0]
+    rects = []
+    i = 0
+    while i < len(areas):
+        short = min(width, height)
+        row = [areas[i]]
+        j = i + 1
+        while j < len(areas) and _worst_ratio(row + [areas[j]], short) <= _worst_ratio(row, short):
+            row.append(areas[j])
+            j += 1
+        thickness = sum(row) / short
+        offset = 0.0
+        for area in row:
+            length = area / thickness
+            if width >= height:
+                rects.append((x, y + offset, thickness, length))
+            else:
+                rects.append((x + offset, y, length, thickness))
+            offset += length
+        if width >= height:
+            x += thickness
+            width -= thickness
+        else:
+            y += thickness
+            height -= thickness
+        i = j
+    rects.extend([(x, y, 0, 0)] * (len(values) - len(rects)))
+    return rects
+
+
+def _worst_ratio(row, short):
+    total = sum(row)
+    return max(short * short * max(row) / (total * total), total * total / (short * short * min(row)))
+
+
+class TreemapChart(tk.Canvas):
+    """
+    One level of a treemap. `set_items` takes (key, label, size) tuples,
+    largest first; only that level is laid out, so drilling into a node
+    costs as much as its direct children. Clicking a block calls
+    on_open(key) unless the key is None; right-clicking calls on_back().
+    """
+
+    PALETTE = ("#4CAF50", "#2196F3", "#FF9800", "#9C27B0", "#009688", "#F44336", "#3F51B5", "#795548")
+
+    def __init__(self, master, on_open=None, on_back=None, bg="#2b2b2b", fg="white", **kwargs):
+        super().__init__(master, bg=bg, highlightthickness=0, **kwargs)
+        self.bg = bg
+        self.fg = fg
+        self.on_open = on_open
+        self.on_back = on_back
+        self._entries = []
+        self._keys = {}  # canvas item -> entry key
+        self.bind("<Configure>", lambda event: self._render())
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<Button-3>", lambda event: self.on_back and self.on_back())
+
+    def set_items(self, entries):
+        self._entries = list(entries)
+        self._render()
+
+    def _render(self):
+        self.delete("all")
+        self._keys = {}
+        width = self.winfo_width()
+        height = self.winfo_height()
+        if width < 20 or height < 20:
+            return
+        rects = squarify([size for _, _, size in self._entries], 1, 1, width - 2, height - 2)
+        for index, ((key, label, _), (x, y, w, h)) in enumerate(zip(self._entries, rects)):
+            if w < 2 or h < 2:
+                continue
+            rect = self.create_rectangle(x, y, x + w, y + h, fill=self.PALETTE[index % len(self.PALETTE)], outline=self.bg)
+            self._keys[rect] = key
+            if w > 60 and h > 30:
+                text = self.create_text(x + 4, y + 4, anchor="nw", text=label, fill=self.fg, width=w - 8, font=("Segoe UI", 9))
+                self._keys[text] = key
+
+    def _on_click(self, event):
+        items = self.find_withtag("current")
+        key = self._keys.get(items[0]) if items else None
+        if key is not None and self.on_open:
+            self.on_open(key)
@@ -0,0 +1,705 @@
+"""
+Temp-file cleanup engine for RBoost PRO.
+
+A dry-run scan walks each target tree once with os.scandir, reusing the
+DirEntry stat results, and records every reclaimable file in a compact
+CleanupIndex with running totals by category, age bucket and top-level
+directory. The real cleanup pass deletes straight from that index, so the
+numbers shown before cleaning are exactly what gets removed and the tree
+is never walked twice. Deletes are spread over a bounded thread pool in
+batches and progress is coalesced to a few callbacks per second. Which
+files qualify is decided by CleanupRules, compiled once per run into a
+single matcher that filters the walk as a stream. Nothing here touches Tk
+or Windows-only APIs, so it runs headless on any tree.
+"""
+import fnmatch
+import heapq
+import json
+import logging
+import os
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+CleanupProgress = namedtuple("CleanupProgress", ["found", "deleted", "bytes_freed", "errors", "current"])
+CleanupResult = namedtuple("CleanupResult", ["files_deleted", "dirs_deleted", "bytes_freed", "errors", "elapsed"])
+
+CLEANUP_STATE_FILE = "rboost_cleanup_state.json"
+
+_FILE_ATTRIBUTE_REPARSE_POINT = getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0x400)
+
+CLEANUP_CATEGORIES = ("User temp", "Windows temp", "Browser caches", "Logs", "Crash dumps")
+
+# Files a category never deletes whatever the rules say; browsers need their
+# cache index files to open a cache (see rboost_browsers.CACHE_INDEX_NAMES)
+CATEGORY_EXCLUDES = {
+    "Browser caches": ("index", "the-real-index", "data_[0-9]*", os.path.join("*", "index-dir", "*")),
+}
+
+# (upper bound in seconds or None, label) for the age breakdown
+AGE_BUCKETS = (
+    (86400, "< 1 day"),
+    (7 * 86400, "1-7 days"),
+    (30 * 86400, "7-30 days"),
+    (None, "> 30 days"),
+)
+
+
+def _env_path(variable, *parts):
+    base = os.environ.get(variable)
+    return os.path.join(base, *parts) if base else ''
+
+
+def default_cleanup_targets(extra_temp=(), running=None):
+    """
+    Returns {category: [existing root folders]} for every cleanup category.
+    Cache stores of browsers named in `running` (detected when None) are
+    left out, since deleting entries under a live browser corrupts its cache.
+    """
+    from rboost_browsers import discover_cache_stores, running_browsers  # rboost_browsers builds on this module
+    running = running_browsers() if running is None else running
+    targets = {
+        "User temp": [os.environ.get('TEMP', ''), _env_path('LOCALAPPDATA', 'Temp')] + list(extra_temp),
+        "Windows temp": [_env_path('WINDIR', 'Temp')],
+        "Browser caches": [store.path for store in discover_cache_stores() if store.browser not in running],
+        "Logs": [_env_path('WINDIR', 'Logs', 'CBS'), _env_path('WINDIR', 'Logs', 'DISM')],
+        "Crash dumps": [
+            _env_path('LOCALAPPDATA', 'CrashDumps'),
+            _env_path('WINDIR', 'Minidump'),
+            _env_path('PROGRAMDATA', 'Microsoft', 'Windows', 'WER', 'ReportArchive'),
+            _env_path('PROGRAMDATA', 'Microsoft', 'Windows', 'WER', 'ReportQueue'),
+        ],
+    }
+    # A folder listed under two categories is only scanned for the first one
+    seen = set()
+    result = {}
+    for category, paths in targets.items():
+        roots = [root for root in unique_roots(paths) if os.path.normcase(os.path.realpath(root)) not in seen]
+        seen.update(os.path.normcase(os.path.realpath(root)) for root in roots)
+        result[category] = roots
+    return result
+
+
+def default_temp_roots(extra=()):
+    """Returns the usual Windows temp folders that exist, deduplicated."""
+    targets = default_cleanup_targets(extra_temp=extra, running=())
+    return targets["User temp"] + targets["Windows temp"]
+
+
+def unique_roots(paths):
+    """Drops empty, missing and duplicate directories (TEMP often equals LOCALAPPDATA\\Temp)."""
+    seen = set()
+    roots = []
+    for path in paths:
+        if not path or not os.path.isdir(path):
+            continue
+        key = os.path.normcase(os.path.realpath(path))
+        if key not in seen:
+            seen.add(key)
+            roots.append(path)
+    return roots
+
+
+def is_link(entry):
+    """
+    True for symlinks and, on Windows, junctions and other reparse points,
+    which must never be descended. The reparse attribute comes from the
+    directory listing itself, so this costs no extra system call there.
+    """
+    if entry.is_symlink():
+        return True
+    try:
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    except OSError:
+        return True  # Cannot tell; never descend
+    return bool(attributes & _FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+class TreeWalker:
+    """
+    Iterative os.scandir walk. files() yields (path, stat) for every
+    non-directory entry; afterwards `dirs` lists subdirectories with
+    children before parents, ready for bottom-up removal.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = []
+        self.errors = 0
+
+    def files(self):
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and not is_link(entry):
+                                stack.append(entry.path)
+                                self.dirs.append(entry.path)
+                            else:
+                                # On Windows this stat comes from the directory listing itself
+                                yield entry.path, entry.stat(follow_symlinks=False)
+                        except OSError:
+                            self.errors += 1
+            except OSError as e:
+                self.errors += 1
+                logging.debug(f"Cannot scan {path}: {e}")
+        self.dirs.reverse()
+
+
+def open_file_set():
+    """Returns normalised paths of every file currently open by a live process."""
+    started = time.perf_counter()
+    paths = set()
+    for proc in psutil.process_iter(['pid']):
+        try:
+            for opened in proc.open_files():
+                paths.add(os.path.normcase(opened.path))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError):
+            continue
+    logging.info(f"Collected {len(paths)} open files in {time.perf_counter() - started:.2f}s.")
+    return paths
+
+
+class LazyOpenFiles:
+    """
+    Supports `normcase(path) in open_files`, running open_file_set() on the
+    first lookup only. That sweep takes seconds on Windows; an incremental
+    pass that finds nothing to check never pays for it.
+    """
+
+    def __init__(self):
+        self._paths = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, path):
+        if self._paths is None:
+            with self._lock:
+                if self._paths is None:
+                    self._paths = open_file_set()
+        return path in self._paths
+
+
+def _compile_globs(patterns):
+    """Compiles glob patterns into one case-insensitive regex, or None when empty."""
+    patterns = [p for p in patterns if p]
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns), re.IGNORECASE)
+
+
+class CleanupRules:
+    """
+    Declarative cleanup policy. Globs without a path separator match the
+    file name, others match the full path. compile() builds the matcher
+    used during a scan.
+    """
+
+    def __init__(self, min_age_days=1.0, min_size=0, max_size=None, include=("*",), exclude=(),
+                 skip_open_files=True):
+        self.min_age_days = min_age_days
+        self.min_size = min_size
+        self.max_size = max_size
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.skip_open_files = skip_open_files
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Builds rules from the `cleanup_rules` settings dict (missing keys use defaults)."""
+        settings = settings or {}
+        return cls(
+            min_age_days=float(settings.get("min_age_days", 1.0)),
+            min_size=int(settings.get("min_size", 0)),
+            max_size=settings.get("max_size"),
+            include=settings.get("include", ["*"]),
+            exclude=settings.get("exclude", []),
+            skip_open_files=settings.get("skip_open_files", True),
+        )
+
+    def to_settings(self):
+        return {
+            "min_age_days": self.min_age_days,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "include": self.include,
+            "exclude": self.exclude,
+            "skip_open_files": self.skip_open_files,
+        }
+
+    def excluding(self, patterns):
+        """Returns a copy of these rules that also excludes `patterns`."""
+        return CleanupRules(self.min_age_days, self.min_size, self.max_size, self.include,
+                            self.exclude + list(patterns), self.skip_open_files)
+
+    def compile(self, now=None, open_files=None):
+        """
+        Returns matcher(path, stat) -> bool. The open-file set is gathered
+        once per run, on the first file that needs it, unless one is passed in.
+        """
+        rejection = self.compile_rejection(now, open_files)
+        return lambda path, st: rejection(path, st) is None
+
+    def compile_rejection(self, now=None, open_files=None):
+        """
+        Returns rejection(path, stat) -> None for a file that qualifies, else
+        the first reason it does not: "size", "excluded", "young" or "open".
+        "young" and "open" are only reported for files that pass every
+        earlier check, so they mean the file can qualify later as it is.
+        """
+        cutoff = (time.time() if now is None else now) - self.min_age_days * 86400
+        min_size = self.min_size
+        max_size = self.max_size
+        if self.skip_open_files and open_files is None:
+            open_files = LazyOpenFiles()
+        open_files = open_files if self.skip_open_files else None
+
+        include = [p for p in self.include if p and p != "*"]
+        name_include = _compile_globs([p for p in include if os.sep not in p and "/" not in p])
+        path_include = _compile_globs([p for p in include if os.sep in p or "/" in p])
+        name_exclude = _compile_globs([p for p in self.exclude if os.sep not in p and "/" not in p])
+        path_exclude = _compile_globs([p for p in self.exclude if os.sep in p or "/" in p])
+        any_include = name_include is not None or path_include is not None
+
+        def rejection(path, st):
+            # Cheapest checks first; the open-file lookup only for survivors
+            size = st.st_size
+            if size < min_size or (max_size is not None and size > max_size):
+                return "size"
+            name = path.rpartition(os.sep)[2]
+            if name_exclude is not None and name_exclude.match(name):
+                return "excluded"
+            if path_exclude is not None and path_exclude.match(path):
+                return "excluded"
+            if any_include and not ((name_include is not None and name_include.match(name))
+                                    or (path_include is not None and path_include.match(path))):
+                return "excluded"
+            if st.st_mtime > cutoff:
+                return "young"
+            if open_files and os.path.normcase(path) in open_files:
+                return "open"
+            return None
+
+        return rejection
+
+
+def select_files(files, matcher, skipped):
+    """Streams (path, stat) pairs that pass `matcher`; counts the rest in `skipped` [files, bytes]."""
+    for path, st in files:
+        if matcher(path, st):
+            yield path, st
+        else:
+            skipped[0] += 1
+            skipped[1] += st.st_size
+
+
+def _delete_batch(batch):
+    """Deletes (path, size) pairs; returns (deleted, bytes, errors)."""
+    deleted = freed = errors = 0
+    for path, size in batch:
+        try:
+            os.unlink(path)
+        except IsADirectoryError:
+            # Directory links (junctions) are removed without touching their target
+            try:
+                os.rmdir(path)
+            except OSError:
+                errors += 1
+                continue
+        except OSError:
+            errors += 1
+            continue
+        deleted += 1
+        freed += size
+    return deleted, freed, errors
+
+
+class ProgressThrottle:
+    """Forwards at most one progress update per `interval` seconds."""
+
+    def __init__(self, callback, interval=0.25):
+        self.callback = callback
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, progress, force=False):
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.callback(progress)
+
+
+class CleanupIndex:
+    """
+    Reclaimable files found by a dry-run scan. Per-file data lives in
+    parallel arrays; totals by category, age bucket and top-level directory
+    are kept up to date as files are added.
+    """
+
+    def __init__(self, now=None):
+        self.now = time.time() if now is None else now
+        self.categories = []                 # category names, indexed by id
+        self.paths = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.category_ids = array('B')
+        self.dirs = []                       # (category id, [dirs, children first]) per root
+        self.errors = 0
+        self.category_totals = {}            # name -> [files, bytes]
+        self.age_totals = {}                 # name -> [bytes per AGE_BUCKETS entry]
+        self.top_dir_totals = {}             # top-level path -> bytes
+        self.skipped = [0, 0]                # [files, bytes] kept back by the rules
+        self.complete = False                # False if the scan was stopped; such an index must not be cleaned
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _category_id(self, category):
+        if category not in self.categories:
+            self.categories.append(category)
+            self.category_totals[category] = [0, 0]
+            self.age_totals[category] = [0] * len(AGE_BUCKETS)
+        return self.categories.index(category)
+
+    def add(self, category, path, size, mtime, top_dir):
+        """Records one reclaimable file and updates the running totals."""
+        category_id = self._category_id(category)
+        self.paths.append(path)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.category_ids.append(category_id)
+
+        totals = self.category_totals[category]
+        totals[0] += 1
+        totals[1] += size
+        age = self.now - mtime
+        for bucket, (limit, _) in enumerate(AGE_BUCKETS):
+            if limit is None or age < limit:
+                self.age_totals[category][bucket] += size
+                break
+        self.top_dir_totals[top_dir] = self.top_dir_totals.get(top_dir, 0) + size
+
+    def total_bytes(self, categories=None):
+        return sum(bytes_ for name, (_, bytes_) in self.category_totals.items()
+                   if categories is None or name in categories)
+
+    def top_directories(self, n=10):
+        """Returns the `n` largest top-level directories as (path, bytes)."""
+        return heapq.nlargest(n, self.top_dir_totals.items(), key=lambda item: item[1])
+
+    def summary_lines(self, top=5):
+        """Human-readable breakdown for the status box or a dialog."""
+        lines = []
+        for name in self.categories:
+            files, bytes_ = self.category_totals[name]
+            ages = ", ".join(f"{label}: {b / (1024*1024):.1f} MB"
+                             for (_, label), b in zip(AGE_BUCKETS, self.age_totals[name]) if b)
+            lines.append(f"{name}: {files} files, {bytes_ / (1024*1024):.1f} MB ({ages or 'empty'})")
+        for path, bytes_ in self.top_directories(top):
+            lines.append(f"  {bytes_ / (1024*1024):.1f} MB  {path}")
+        if self.skipped[0]:
+            lines.append(f"Kept by cleanup rules (too new, excluded or in use): {self.skipped[0]} files, "
+                         f"{self.skipped[1] / (1024*1024):.1f} MB")
+        return lines
+
+
+class DirectoryState:
+    """
+    Persisted per-directory state from earlier scans, so scheduled runs can
+    skip directories that cannot have gained eligible files.
+
+    For each directory it keeps [mtime, entry count, file bytes, next check
+    time, subdirectory names]. A directory's own files are re-listed only
+    when its mtime changed (entries added, removed or renamed) or when its
+    next check time has passed. That time is when the youngest kept-back
+    file ages past the rules, or right away if something was eligible or
+    in use. Files kept back by size or glob rules are not revisited until
+    the directory changes. A full rescan happens every `full_every_days`
+    or whenever the rules change.
+    """
+
+    def __init__(self, path=CLEANUP_STATE_FILE, full_every_days=7):
+        self.path = path
+        self.full_every_days = full_every_days
+        self.dirs = {}
+        self.rules_key = None
+        self.last_full = 0.0
+        self.visited = set()
+        self.scanned_dirs = 0
+        self.skipped_dirs = 0
+
+    @classmethod
+    def load(cls, path=CLEANUP_STATE_FILE, full_every_days=7):
+        state = cls(path, full_every_days)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            state.dirs = data.get("dirs", {})
+            state.rules_key = data.get("rules")
+            state.last_full = data.get("last_full", 0.0)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cleanup state {path}: {e}")
+        return state
+
+    def save(self):
+        """Writes the state, keeping only directories seen in this run."""
+        self.dirs = {path: entry for path, entry in self.dirs.items() if path in self.visited}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"rules": self.rules_key, "last_full": self.last_full, "dirs": self.dirs}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Failed to save cleanup state: {e}")
+
+    def begin(self, rules, now):
+        """Starts a run; drops all state if the rules changed or a full rescan is due."""
+        rules_key = json.dumps(rules.to_settings(), sort_keys=True)
+        if rules_key != self.rules_key or now - self.last_full > self.full_every_days * 86400:
+            logging.info("Cleanup state reset; doing a full scan.")
+            self.dirs = {}
+            self.rules_key = rules_key
+            self.last_full = now
+        self.visited = set()
+        self.scanned_dirs = 0
+        self.skipped_dirs = 0
+
+
+class IncrementalWalker(TreeWalker):
+    """
+    TreeWalker that consults a DirectoryState. files() yields only files
+    that `rejection` (from CleanupRules.compile_rejection) lets through,
+    since skipping needs to know why files were kept back.
+    """
+
+    def __init__(self, root, state, rejection, rules, now, skipped):
+        super().__init__(root)
+        self.state = state
+        self.rejection = rejection
+        self.now = now
+        self.min_age = rules.min_age_days * 86400
+        self.skipped = skipped
+
+    def files(self):
+        state = self.state
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue  # Gone since the last run
+            state.visited.add(path)
+            saved = state.dirs.get(path)
+            if saved and saved[0] == mtime and (saved[3] is None or saved[3] > self.now):
+                state.skipped_dirs += 1
+                for name in saved[4]:
+                    child = os.path.join(path, name)
+                    stack.append(child)
+                    self.dirs.append(child)
+                continue
+
+            count = file_bytes = 0
+            next_check = None
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        count += 1
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and not is_link(entry):
+                                stack.append(entry.path)
+                                self.dirs.append(entry.path)
+                                subdirs.append(entry.name)
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            self.errors += 1
+                            continue
+                        file_bytes += st.st_size
+                        reason = self.rejection(entry.path, st)
+                        if reason is None:
+                            next_check = self.now  # Re-list next run in case the delete failed
+                            yield entry.path, st
+                            continue
+                        self.skipped[0] += 1
+                        self.skipped[1] += st.st_size
+                        if reason == "young":
+                            ready = st.st_mtime + self.min_age
+                        elif reason == "open":
+                            ready = self.now
+                        else:
+                            continue  # Size or globs; only a change to the file re-lists it
+                        next_check = ready if next_check is None else min(next_check, ready)
+            except OSError as e:
+                self.errors += 1
+                logging.debug(f"Cannot scan {path}: {e}")
+                continue
+            state.scanned_dirs += 1
+            # A next check of None means nothing here becomes eligible until the directory changes
+            state.dirs[path] = [mtime, count, file_bytes, next_check, subdirs]
+        self.dirs.reverse()
+
+
+def scan_reclaimable(targets, rules=None, progress=None, progress_interval=0.25, stop_event=None, state=None):
+    """
+    Dry-run scan of {category: [roots]}; returns a CleanupIndex holding the
+    files that `rules` (a CleanupRules, default policy when None) allows.
+    With a DirectoryState, unchanged directories are skipped and the state
+    is updated; call state.save() afterwards. If `stop_event` is set the
+    scan returns at once with index.complete False.
+    `progress` receives CleanupProgress tuples (deleted is always 0).
+    """
+    throttle = ProgressThrottle(progress, progress_interval)
+    stop_event = stop_event or threading.Event()
+    index = CleanupIndex()
+    rules = rules or CleanupRules()
+    open_files = LazyOpenFiles() if rules.skip_open_files else None
+    base_rejection = rules.compile_rejection(now=index.now, open_files=open_files)
+    if state is not None:
+        state.begin(rules, index.now)
+    total = 0
+    for category, roots in targets.items():
+        if category in CATEGORY_EXCLUDES:
+            rejection = rules.excluding(CATEGORY_EXCLUDES[category]).compile_rejection(now=index.now, open_files=open_files)
+        else:
+            rejection = base_rejection
+        for root in roots:
+            if stop_event.is_set():
+                logging.info(f"Reclaimable scan stopped after {len(index)} files; index is incomplete.")
+                return index
+            if state is not None:
+                walker = IncrementalWalker(root, state, rejection, rules, index.now, index.skipped)
+                files = walker.files()
+            else:
+                walker = TreeWalker(root)
+                files = select_files(walker.files(), lambda path, st: rejection(path, st) is None, index.skipped)
+            prefix = len(root.rstrip(os.sep)) + 1
+            for path, st in files:
+                if stop_event.is_set():
+                    logging.info(f"Reclaimable scan stopped after {len(index)} files; index is incomplete.")
+                    return index
+                head = path[prefix:].split(os.sep, 1)[0]
+                index.add(category, path, st.st_size, st.st_mtime, os.path.join(root, head))
+                total += st.st_size
+                throttle(CleanupProgress(len(index), 0, total, index.errors, path))
+            index.dirs.append((index._category_id(category), walker.dirs))
+            index.errors += walker.errors
+    throttle(CleanupProgress(len(index), 0, total, index.errors, ""), force=True)
+    index.complete = True
+    if state is not None:
+        logging.info(f"Incremental scan: {state.scanned_dirs} directories listed, {state.skipped_dirs} unchanged and skipped.")
+    logging.info(f"Reclaimable scan: {len(index)} files, {total} bytes in {len(index.categories)} categories.")
+    return index
+
+
+class CleanupEngine:
+    """
+    Deletes the files recorded in a CleanupIndex (never the scanned roots
+    themselves). `progress` receives CleanupProgress tuples from the
+    calling thread, a few times per second at most.
+    """
+
+    def __init__(self, workers=8, batch_size=256, progress=None, progress_interval=0.25, stop_event=None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.progress = ProgressThrottle(progress, progress_interval)
+        self.stop_event = stop_event or threading.Event()
+
+    def clean(self, index, categories=None):
+        """Deletes the indexed files of `categories` (all when None), then their emptied folders."""
+        if not index.complete:
+            raise ValueError("Refusing to clean from an incomplete scan")
+        started = time.perf_counter()
+        selected = {i for i, name in enumerate(index.categories) if categories is None or name in categories}
+        found = deleted = freed = errors = dirs_deleted = 0
+        in_flight = deque()
+        max_in_flight = self.workers * 4
+
+        def collect(future):
+            nonlocal deleted, freed, errors
+            d, f, e = future.result()
+            deleted += d
+            freed += f
+            errors += e
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rboost-cleanup") as pool:
+            batch = []
+            for i, path in enumerate(index.paths):
+                if self.stop_event.is_set():
+                    break
+                if index.category_ids[i] not in selected:
+                    continue
+                batch.append((path, index.sizes[i]))
+                found += 1
+                if len(batch) >= self.batch_size:
+                    in_flight.append(pool.submit(_delete_batch, batch))
+                    batch = []
+                    # Bound memory: wait for the oldest batch once enough are queued
+                    while len(in_flight) >= max_in_flight:
+                        collect(in_flight.popleft())
+                    while in_flight and in_flight[0].done():
+                        collect(in_flight.popleft())
+                    self.progress(CleanupProgress(found, deleted, freed, errors, path))
+            if batch:
+                in_flight.append(pool.submit(_delete_batch, batch))
+            while in_flight:
+                collect(in_flight.popleft())
+
+        # Directories are emptied by now; remove them deepest first
+        for category_id, dirs in index.dirs:
+            if category_id not in selected:
+                continue
+            for path in dirs:
+                if self.stop_event.is_set():
+                    break
+                try:
+                    os.rmdir(path)
+                    dirs_deleted += 1
+                except OSError:
+                    pass  # Still holds a locked or new file
+
+        result = CleanupResult(deleted, dirs_deleted, freed, errors, time.perf_counter() - started)
+        self.progress(CleanupProgress(found, deleted, freed, errors, ""), force=True)
+        logging.info(f"Cleanup finished: {result}")
+        return result
+
+
+def _make_bench_tree(root, files, per_dir=200, size=512):
+    """Creates `files` small files spread over subdirectories of `root`."""
+    payload = b"x" * size
+    for i in range(files):
+        directory = os.path.join(root, f"d{i // per_dir:05d}")
+        if i % per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i:07d}.tmp"), "wb") as f:
+            f.write(payload)
+
+
+# --- Headless benchmark on a synthetic tree ---
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    bench_root = tempfile.mkdtemp(prefix="rboost_bench_")
+    _make_bench_tree(bench_root, count)
+    scan_started = time.perf_counter()
+    bench_index = scan_reclaimable({"Benchmark": [bench_root]}, rules=CleanupRules(min_age_days=0, skip_open_files=False))
+    print(f"Scanned {len(bench_index)} files in {time.perf_counter() - scan_started:.2f}s")
+    result = CleanupEngine(workers=workers).clean(bench_index)
+    os.rmdir(bench_root)
+    print(f"{result.files_deleted} files, {result.dirs_deleted} dirs, {result.bytes_freed} bytes in "
+          f"{result.elapsed:.2f}s ({result.files_deleted / max(result.elapsed, 1e-9):.0f} files/s, {workers} workers)")
@@ -0,0 +1,512 @@
+"""
+Directory-tree disk usage analysis for RBoost PRO.
+
+A thread pool lists directories with os.scandir while a single coordinator
+records one node per directory in flat arrays (parent index, bytes and file
+count of the files directly inside it). Subtree totals are rolled up level
+by level with numpy on demand, so the UI can read partial results while the
+scan is still running.
+
+Finished scans can be saved as compressed snapshots and any two snapshots of
+the same drive diffed in one pass over their nodes. A separate largest-files
+mode streams over a volume keeping only a bounded heap of the K biggest files.
+"""
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from rboost_cleanup import ProgressThrottle, is_link
+
+DISK_SNAPSHOT_DIR = "rboost_disk_snapshots"
+SNAPSHOT_VERSION = 1
+
+DiskNode = namedtuple("DiskNode", ["index", "name", "path", "size", "files", "dirs"])
+DiskScanProgress = namedtuple("DiskScanProgress", ["dirs_scanned", "dirs_found", "bytes", "files", "current"])
+DiskChange = namedtuple("DiskChange", ["path", "old_size", "new_size", "delta"])
+LargeFile = namedtuple("LargeFile", ["size", "path", "mtime"])
+
+
+class DiskTree:
+    """
+    Array-backed directory tree. Node 0 is the scan root and every node is
+    added after its parent, so parent indexes are always smaller than the
+    node's own index. Writers and readers share `lock`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.names = [root]
+        self.parents = array("i", [-1])
+        self.depths = array("i", [0])
+        self.own_sizes = array("q", [0])
+        self.own_files = array("q", [0])
+        self.errors = 0
+        self.complete = False
+        self.version = 0
+        self._totals = None      # (version, sizes, files, subdirs)
+        self._children = None    # (version, order, starts)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add_dir(self, parent, name):
+        """Adds a child directory of `parent`; returns its index. Caller holds `lock`."""
+        self.names.append(name)
+        self.parents.append(parent)
+        self.depths.append(self.depths[parent] + 1)
+        self.own_sizes.append(0)
+        self.own_files.append(0)
+        return len(self.parents) - 1
+
+    def set_contents(self, index, size, files):
+        """Records the files directly inside a directory. Caller holds `lock`."""
+        self.own_sizes[index] = size
+        self.own_files[index] = files
+        self.version += 1
+
+    def path(self, index):
+        parts = []
+        while index > 0:
+            parts.append(self.names[index])
+            index = self.parents[index]
+        return os.path.join(self.root, *reversed(parts))
+
+    def totals(self):
+        """Returns (subtree bytes, subtree files, subdirectory count) arrays, cached per version."""
+        with self.lock:
+            cached = self._totals
+            if cached is not None and cached[0] == self.version and len(cached[1]) == len(self.parents):
+                return cached[1:]
+            parents = np.array(self.parents, dtype=np.int64)
+            depths = np.array(self.depths, dtype=np.int64)
+            sizes = np.array(self.own_sizes, dtype=np.int64)
+            files = np.array(self.own_files, dtype=np.int64)
+            version = self.version
+        subdirs = np.zeros(len(parents), dtype=np.int64)
+        # Deepest level first, so each level adds finished subtrees to its parents
+        for depth in range(int(depths.max()), 0, -1):
+            level = np.flatnonzero(depths == depth)
+            np.add.at(sizes, parents[level], sizes[level])
+            np.add.at(files, parents[level], files[level])
+            np.add.at(subdirs, parents[level], subdirs[level] + 1)
+        self._totals = (version, sizes, files, subdirs)
+        return sizes, files, subdirs
+
+    def children(self, index):
+        """Child node indexes of `index`, largest subtree first."""
+        with self.lock:
+            cached = self._children
+            if cached is None or cached[0] != len(self.parents):
+                parents = np.array(self.parents, dtype=np.int64)
+                order = np.argsort(parents, kind="stable")
+                cached = (len(parents), order, parents[order])
+                self._children = cached
+        _, order, sorted_parents = cached
+        lo, hi = np.searchsorted(sorted_parents, [index, index + 1])
+        kids = order[lo:hi]
+        sizes = self.totals()[0]
+        return kids[np.argsort(-sizes[kids], kind="stable")].tolist()
+
+    def node(self, index):
+        sizes, files, subdirs = self.totals()
+        return DiskNode(index, self.names[index], self.path(index), int(sizes[index]), int(files[index]), int(subdirs[index]))
+
+
+def _list_directory(path):
+    """Worker: returns (bytes, file count, subdirectory names, errors) for one directory."""
+    size = files = errors = 0
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_link(entry):
+                            subdirs.append(entry.name)
+                        continue
+                    size += entry.stat(follow_symlinks=False).st_size
+                    files += 1
+                except OSError:
+                    errors += 1
+    except OSError as e:
+        logging.debug(f"Cannot scan {path}: {e}")
+        errors += 1
+    return size, files, subdirs, errors
+
+
+def parallel_walk(root, lister, on_listed, workers=8, stop_event=None, root_context=None):
+    """
+    Lists directories on a thread pool. `lister(path)` runs on a worker;
+    `on_listed(context, path, result)` runs on the calling thread and
+    returns the (context, path) pairs to list next. At most `workers * 4`
+    directories are queued in the pool at once; the rest wait in a deque.
+    """
+    waiting = deque([(root_context, root)])
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while waiting or running:
+            while waiting and len(running) < workers * 4 and not (stop_event and stop_event.is_set()):
+                context, path = waiting.popleft()
+                running[executor.submit(lister, path)] = (context, path)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                context, path = running.pop(future)
+                waiting.extend(on_listed(context, path, future.result()))
+
+
+class DiskScanner:
+    """
+    Parallel directory walk into a DiskTree.
+    `progress` receives DiskScanProgress tuples from the scanning thread.
+    """
+
+    def __init__(self, workers=8, progress=None, progress_interval=0.5, stop_event=None):
+        self.workers = workers
+        self.throttle = ProgressThrottle(progress, progress_interval)
+        self.stop_event = stop_event or threading.Event()
+
+    def scan(self, root, tree=None):
+        """Scans `root`; pass a `tree` created up front to read partial results while this runs."""
+        started = time.monotonic()
+        tree = tree or DiskTree(root)
+        counts = [0, 0, 0]  # Folders scanned, bytes, files
+
+        def on_listed(index, path, result):
+            size, files, subdirs, errors = result
+            with tree.lock:
+                tree.set_contents(index, size, files)
+                tree.errors += errors
+                children = [(tree.add_dir(index, name), os.path.join(path, name)) for name in subdirs]
+            counts[0] += 1
+            counts[1] += size
+            counts[2] += files
+            self.throttle(DiskScanProgress(counts[0], len(tree), counts[1], counts[2], path))
+            return children
+
+        parallel_walk(root, _list_directory, on_listed, self.workers, self.stop_event, root_context=0)
+        scanned, total_bytes, total_files = counts
+        tree.complete = not self.stop_event.is_set()
+        self.throttle(DiskScanProgress(scanned, len(tree), total_bytes, total_files, ""), force=True)
+        logging.info(f"Disk scan of {root}: {len(tree)} folders, {total_files} files, {total_bytes} bytes "
+                     f"in {time.monotonic() - started:.1f}s ({tree.errors} errors).")
+        return tree
+
+
+# --- Largest files ---
+class LargeFileFilter:
+    """
+    Which files the largest-files scan considers: `extensions` like
+    (".iso", ".vhdx"), files untouched for at least `min_age_days`, and
+    paths starting with `path_prefix`.
+    """
+
+    def __init__(self, extensions=(), min_age_days=0, path_prefix=None, min_size=1):
+        self.extensions = tuple(ext.lower() if ext.startswith(".") else "." + ext.lower() for ext in extensions if ext)
+        self.min_age_days = min_age_days
+        self.prefix = os.path.normcase(path_prefix) if path_prefix else None
+        self.min_size = min_size
+        self.cutoff = None
+
+    def start(self, now=None):
+        self.cutoff = (time.time() if now is None else now) - self.min_age_days * 86400
+
+    def wants_dir(self, path):
+        """False for folders that cannot contain a path under the prefix."""
+        if self.prefix is None:
+            return True
+        key = os.path.normcase(path) + os.sep
+        return key.startswith(self.prefix) or self.prefix.startswith(key)
+
+    def matches(self, path, name, st):
+        if st.st_size < self.min_size:
+            return False
+        if self.extensions and not name.lower().endswith(self.extensions):
+            return False
+        if self.min_age_days and st.st_mtime > self.cutoff:
+            return False
+        return self.prefix is None or os.path.normcase(path).startswith(self.prefix)
+
+
+class LargestFiles:
+    """
+    Bounded min-heap of the K largest files offered so far. Memory stays at
+    K entries however many files are scanned; `version` changes whenever
+    the top K does, so viewers can poll cheaply.
+    """
+
+    def __init__(self, k=100):
+        self.k = k
+        self.lock = threading.Lock()
+        self.heap = []
+        self.version = 0
+        self.files_seen = 0
+        self.complete = False
+
+    def threshold(self):
+        """Smallest size that could still enter the top K."""
+        heap = self.heap
+        return heap[0][0] + 1 if len(heap) >= self.k else 0
+
+    def offer(self, size, path, mtime):
+        with self.lock:
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, (size, path, mtime))
+            elif size > self.heap[0][0]:
+                heapq.heapreplace(self.heap, (size, path, mtime))
+            else:
+                return
+            self.version += 1
+
+    def snapshot(self):
+        """Current top K as LargeFile tuples, largest first."""
+        with self.lock:
+            return [LargeFile(*entry) for entry in sorted(self.heap, reverse=True)]
+
+
+def _large_files_in(path, file_filter, threshold):
+    """Worker: returns (candidate files, subdirectory names, files seen) for one directory."""
+    candidates = []
+    subdirs = []
+    seen = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_link(entry) and file_filter.wants_dir(entry.path):
+                            subdirs.append(entry.name)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                seen += 1
+                if st.st_size >= threshold and file_filter.matches(entry.path, entry.name, st):
+                    candidates.append((st.st_size, entry.path, st.st_mtime))
+    except OSError as e:
+        logging.debug(f"Cannot scan {path}: {e}")
+    return candidates, subdirs, seen
+
+
+def find_largest_files(root, k=100, file_filter=None, workers=8, stop_event=None, results=None):
+    """
+    Streams over `root` and returns a LargestFiles holding the K biggest
+    matching files. Pass `results` created up front to watch the top K
+    change while the scan runs.
+    """
+    started = time.monotonic()
+    results = results or LargestFiles(k)
+    file_filter = file_filter or LargeFileFilter()
+    file_filter.start()
+
+    def lister(path):
+        return _large_files_in(path, file_filter, results.threshold())
+
+    def on_listed(_, path, result):
+        candidates, subdirs, seen = result
+        for candidate in candidates:
+            results.offer(*candidate)
+        results.files_seen += seen
+        return [(None, os.path.join(path, name)) for name in subdirs]
+
+    parallel_walk(root, lister, on_listed, workers, stop_event)
+    results.complete = not (stop_event and stop_event.is_set())
+    logging.info(f"Largest-files scan of {root}: {results.files_seen} files in {time.monotonic() - started:.1f}s.")
+    return results
+
+
+# --- Snapshots ---
+def _pack_names(names):
+    return np.frombuffer("\0".join(names).encode("utf-8", "surrogatepass"), dtype=np.uint8)
+
+
+def _unpack_names(packed):
+    return packed.tobytes().decode("utf-8", "surrogatepass").split("\0")
+
+
+def save_snapshot(tree, directory=DISK_SNAPSHOT_DIR, taken_at=None):
+    """Writes a finished DiskTree as a compressed .npz snapshot and returns its path."""
+    taken_at = time.time() if taken_at is None else taken_at
+    sizes, files, _ = tree.totals()
+    with tree.lock:
+        parents = np.array(tree.parents, dtype=np.int32)
+        names = list(tree.names)
+    meta = {"version": SNAPSHOT_VERSION, "root": tree.root, "taken_at": taken_at, "folders": len(parents),
+            "bytes": int(sizes[0]), "files": int(files[0])}
+    os.makedirs(directory, exist_ok=True)
+    label = re.sub(r"[^A-Za-z0-9]+", "_", tree.root).strip("_") or "root"
+    path = os.path.join(directory, f"{label}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(taken_at))}.npz")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                            parents=parents, names=_pack_names(names), sizes=sizes, files=files)
+    os.replace(tmp_path, path)
+    logging.info(f"Saved disk snapshot {path} ({len(parents)} folders).")
+    return path
+
+
+class DiskSnapshot:
+    """
+    A saved scan. Only the small metadata record is read up front; node
+    arrays are decompressed the first time they are used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(path) as data:
+            self.meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        self.root = self.meta["root"]
+        self.taken_at = self.meta["taken_at"]
+        self._arrays = None
+
+    def _load(self):
+        if self._arrays is None:
+            with np.load(self.path) as data:
+                self._arrays = (data["parents"].astype(np.int64), _unpack_names(data["names"]),
+                                data["sizes"], data["files"])
+        return self._arrays
+
+    @property
+    def parents(self):
+        return self._load()[0]
+
+    @property
+    def names(self):
+        return self._load()[1]
+
+    @property
+    def sizes(self):
+        return self._load()[2]
+
+    def __len__(self):
+        return self.meta["folders"]
+
+    def path_of(self, index):
+        parents, names = self.parents, self.names
+        parts = []
+        while index > 0:
+            parts.append(names[index])
+            index = parents[index]
+        return os.path.join(self.root, *reversed(parts))
+
+    def release(self):
+        """Drops the loaded arrays; they are read again on next use."""
+        self._arrays = None
+
+
+def list_snapshots(directory=DISK_SNAPSHOT_DIR, root=None):
+    """Saved snapshots, oldest first, optionally only those of `root`."""
+    snapshots = []
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".npz"))
+    except FileNotFoundError:
+        return snapshots
+    for name in names:
+        try:
+            snapshot = DiskSnapshot(os.path.join(directory, name))
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Skipping unreadable disk snapshot {name}: {e}")
+            continue
+        if root is None or os.path.normcase(snapshot.root) == os.path.normcase(root):
+            snapshots.append(snapshot)
+    snapshots.sort(key=lambda snapshot: snapshot.taken_at)
+    return snapshots
+
+
+def prune_snapshots(directory=DISK_SNAPSHOT_DIR, keep=20):
+    """Keeps the newest `keep` snapshots per scanned root."""
+    by_root = {}
+    for snapshot in list_snapshots(directory):
+        by_root.setdefault(os.path.normcase(snapshot.root), []).append(snapshot)
+    for snapshots in by_root.values():
+        for snapshot in snapshots[:-keep]:
+            try:
+                os.remove(snapshot.path)
+            except OSError as e:
+                logging.warning(f"Could not remove old snapshot {snapshot.path}: {e}")
+
+
+def diff_snapshots(old, new, top=20, dominance=0.9):
+    """
+    Compares two snapshots of the same root. Folders are matched by
+    (matched parent, name) in one pass over each snapshot. Returns
+    (growing, shrinking) lists of DiskChange, largest change first. A
+    folder whose change comes almost entirely (`dominance`) from a single
+    subfolder is left out in favour of that subfolder.
+    """
+    old_parents, old_names, old_sizes = old.parents, old.names, old.sizes
+    new_parents, new_names, new_sizes = new.parents, new.names, new.sizes
+    old_count, new_count = len(old_parents), len(new_parents)
+
+    lookup = {(int(parent), name): index for index, (parent, name) in enumerate(zip(old_parents.tolist(), old_names))}
+    match = np.full(new_count, -1, dtype=np.int64)
+    match[0] = 0
+    new_parent_list = new_parents.tolist()
+    for index in range(1, new_count):
+        parent_match = match[new_parent_list[index]]
+        if parent_match >= 0:
+            match[index] = lookup.get((int(parent_match), new_names[index]), -1)
+    del lookup
+
+    matched = match >= 0
+    inverse = np.full(old_count, -1, dtype=np.int64)
+    inverse[match[matched]] = np.flatnonzero(matched)
+    deleted = np.flatnonzero(inverse < 0)
+
+    # Combined node space: every new folder, then folders that only exist in the old snapshot
+    old_for_new = np.where(matched, old_sizes[np.maximum(match, 0)], 0)
+    deltas = np.concatenate([new_sizes - old_for_new, -old_sizes[deleted]])
+    befores = np.concatenate([old_for_new, old_sizes[deleted]])
+    afters = np.concatenate([new_sizes, np.zeros(len(deleted), dtype=new_sizes.dtype)])
+    deleted_position = np.full(old_count, -1, dtype=np.int64)
+    deleted_position[deleted] = new_count + np.arange(len(deleted))
+    deleted_parents = old_parents[deleted]
+    parents = np.concatenate([new_parents, np.where(inverse[deleted_parents] >= 0, inverse[deleted_parents],
+                                                    deleted_position[deleted_parents])])
+
+    children = np.arange(1, len(deltas))  # The roots are always matched to each other
+    largest_gain = np.zeros(len(deltas), dtype=np.int64)
+    largest_loss = np.zeros(len(deltas), dtype=np.int64)
+    np.maximum.at(largest_gain, parents[children], deltas[children])
+    np.minimum.at(largest_loss, parents[children], deltas[children])
+
+    def ranked(candidates, sign):
+        order = candidates[np.argsort(-sign * deltas[candidates], kind="stable")][:top]
+        return [DiskChange(new.path_of(i) if i < new_count else old.path_of(int(deleted[i - new_count])),
+                           int(befores[i]), int(afters[i]), int(deltas[i])) for i in order]
+
+    growing = np.flatnonzero((deltas > 0) & (largest_gain < dominance * deltas))
+    shrinking = np.flatnonzero((deltas < 0) & (largest_loss > dominance * deltas))
+    return ranked(growing, 1), ranked(shrinking, -1)
+
+
+if __name__ == "__main__":
+    # Headless benchmark: python rboost_diskmap.py <folder> [workers]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    bench_tree = DiskScanner(workers=workers).scan(folder)
+    for large in find_largest_files(folder, k=5, workers=workers).snapshot():
+        print(f"{large.size / (1024*1024):10.1f} MB  {large.path}")
+    bench_started = time.monotonic()
+    bench_path = save_snapshot(bench_tree)
+    bench_saved = time.monotonic()
+    bench_snapshot = DiskSnapshot(bench_path)
+    diff_snapshots(bench_snapshot, bench_snapshot)
+    print(f"Snapshot {os.path.getsize(bench_path)} bytes, saved in {bench_saved - bench_started:.2f}s, "
+          f"self-diff in {time.monotonic() - bench_saved:.2f}s")
+    for child in bench_tree.children(0)[:10]:
+        node = bench_tree.node(child)
+        print(f"{node.size / (1024*1024):10.1f} MB  {node.files:8d} files  {node.path}")
@@ -0,0 +1,370 @@
+"""
+Duplicate file finder for RBoost PRO.
+
+Candidates are narrowed in stages: files are grouped by size, then by a hash
+of their first and last few KB, and only files that still collide get a
+full-content hash. Metadata comes from a single os.scandir pass and lives in
+flat arrays (a directory table plus packed UTF-8 names), so a scan of
+millions of files costs a few dozen bytes per file instead of a Python
+string and stat result each. Hashing runs in a process pool that reads
+files through mmap.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from rboost_cleanup import ProgressThrottle, is_link, unique_roots
+
+PARTIAL_BYTES = 4096
+HASH_CHUNK = 8 * 1024 * 1024
+DUPLICATE_STAGES = ("Scanning", "Comparing file edges", "Hashing contents")
+
+DuplicateProgress = namedtuple("DuplicateProgress", ["stage", "done", "total", "current"])
+Removal = namedtuple("Removal", ["path", "size", "keeper"])
+
+
+class DuplicateGroup(namedtuple("DuplicateGroup", ["size", "digest", "paths", "mtimes"])):
+    """Files with identical contents; `paths` and `mtimes` are parallel lists."""
+
+    __slots__ = ()
+
+    @property
+    def reclaimable(self):
+        """Bytes freed by keeping a single copy."""
+        return self.size * (len(self.paths) - 1)
+
+
+DuplicateResult = namedtuple("DuplicateResult", ["groups", "files_scanned", "bytes_scanned", "partial_hashed",
+                                                 "full_hashed", "errors", "elapsed"])
+
+
+def reclaimable_bytes(groups):
+    """Total bytes freed by resolving every group."""
+    return sum(group.reclaimable for group in groups)
+
+
+def summary_lines(result, top=50):
+    """Human-readable summary of the largest duplicate groups."""
+    lines = [
+        f"Scanned {result.files_scanned} files ({result.bytes_scanned / (1024*1024):.1f} MB) in {result.elapsed:.1f}s.",
+        f"{len(result.groups)} duplicate groups, {reclaimable_bytes(result.groups) / (1024*1024):.1f} MB reclaimable.",
+        "",
+    ]
+    for group in result.groups[:top]:
+        lines.append(f"{group.reclaimable / (1024*1024):10.1f} MB  {len(group.paths)} x {group.size / 1024:.1f} KB")
+        lines.extend(f"    {path}" for path in group.paths)
+    if len(result.groups) > top:
+        lines.append(f"... and {len(result.groups) - top} more groups")
+    return lines
+
+
+# --- Scanning ---
+class FileTable:
+    """
+    Scanned file metadata in flat arrays. Directory paths are stored once;
+    file names are packed into one bytearray and only turned back into
+    full paths for files that survive the size stage.
+    """
+
+    def __init__(self):
+        self.dirs = []
+        self.dir_ids = array("i")
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.name_ends = array("q")
+        self.names = bytearray()
+        self.errors = 0
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def add(self, dir_id, name, size, mtime):
+        self.names += name.encode("utf-8", "surrogatepass")
+        self.name_ends.append(len(self.names))
+        self.dir_ids.append(dir_id)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+
+    def path(self, index):
+        start = self.name_ends[index - 1] if index else 0
+        name = self.names[start:self.name_ends[index]].decode("utf-8", "surrogatepass")
+        return os.path.join(self.dirs[self.dir_ids[index]], name)
+
+
+def outermost_roots(paths):
+    """Drops roots nested inside other roots so no file is listed twice."""
+    roots = unique_roots(paths)
+    keys = [os.path.normcase(os.path.realpath(root)).rstrip(os.sep) + os.sep for root in roots]
+    return [root for root, key in zip(roots, keys)
+            if not any(key != other and key.startswith(other) for other in keys)]
+
+
+def scan_files(roots, min_size=1, stop_event=None, progress=None):
+    """Walks `roots` once with os.scandir and returns a FileTable of files of at least `min_size` bytes."""
+    table = FileTable()
+    for root in outermost_roots(roots):
+        stack = [root]
+        while stack:
+            if stop_event is not None and stop_event.is_set():
+                return table
+            path = stack.pop()
+            dir_id = len(table.dirs)
+            table.dirs.append(path)
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not is_link(entry):
+                                    stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            table.errors += 1
+                            continue
+                        if st.st_size >= min_size:
+                            table.add(dir_id, entry.name, st.st_size, st.st_mtime)
+            except OSError as e:
+                table.errors += 1
+                logging.debug(f"Cannot scan {path}: {e}")
+            if progress is not None:
+                progress(DuplicateProgress(DUPLICATE_STAGES[0], len(table), 0, path))
+    return table
+
+
+def size_collisions(sizes):
+    """Returns (indexes, group starts): files sharing a size, grouped, largest sizes first."""
+    sizes = np.frombuffer(sizes, dtype=np.int64) if len(sizes) else np.empty(0, dtype=np.int64)
+    order = np.argsort(-sizes, kind="stable")
+    sorted_sizes = sizes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_sizes[1:] != sorted_sizes[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_sizes)])
+    keep = np.repeat(counts >= 2, counts)
+    indexes = order[keep]
+    kept_sizes = sorted_sizes[keep]
+    group_starts = np.flatnonzero(np.r_[True, kept_sizes[1:] != kept_sizes[:-1]]) if len(indexes) else np.empty(0, dtype=np.int64)
+    return indexes, group_starts
+
+
+# --- Hashing (runs in worker processes) ---
+def partial_digest(path, size, partial_bytes=PARTIAL_BYTES):
+    """Hashes the first and last `partial_bytes` of a file; None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(partial_bytes), digest_size=16)
+            if size > partial_bytes:
+                f.seek(max(size - partial_bytes, partial_bytes))
+                digest.update(f.read(partial_bytes))
+            return digest.digest()
+    except OSError:
+        return None
+
+
+def full_digest(path):
+    """Hashes a whole file through a read-only memory map; None if unreadable."""
+    digest = hashlib.blake2b(digest_size=32)
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return digest.digest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, len(view), HASH_CHUNK):
+                    digest.update(view[offset:offset + HASH_CHUNK])
+        return digest.digest()
+    except (OSError, ValueError):
+        return None
+
+
+def _hash_batch(full, items, partial_bytes):
+    """Worker entry point: digests for a batch of (path, size) pairs."""
+    if full:
+        return [full_digest(path) for path, _ in items]
+    return [partial_digest(path, size, partial_bytes) for path, size in items]
+
+
+# --- Finder ---
+class DuplicateFinder:
+    """
+    Finds groups of identical files under one or more folders.
+    `progress` receives DuplicateProgress tuples from the calling thread.
+    """
+
+    def __init__(self, workers=None, min_size=1, partial_bytes=PARTIAL_BYTES, batch_size=64, use_processes=True,
+                 progress=None, progress_interval=0.25, stop_event=None):
+        self.workers = workers or min(os.cpu_count() or 1, 8)
+        self.min_size = max(min_size, 1)  # Empty files are all "identical" but free nothing
+        self.partial_bytes = partial_bytes
+        self.batch_size = batch_size
+        self.use_processes = use_processes
+        self.throttle = ProgressThrottle(progress, progress_interval)
+        self.stop_event = stop_event or threading.Event()
+
+    def _executor(self):
+        if self.use_processes:
+            try:
+                return ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, NotImplementedError) as e:
+                logging.warning(f"Process pool unavailable, hashing on threads: {e}")
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _hash_all(self, executor, stage, table, indexes, full):
+        """
+        Yields (index, digest) for every file index, keeping a bounded number
+        of batches in flight. Paths are only built for the batch being submitted.
+        """
+        pending = deque()
+        done = 0
+        limit = self.workers * 4
+        for start in range(0, len(indexes), self.batch_size):
+            if self.stop_event.is_set():
+                break
+            batch = [int(i) for i in indexes[start:start + self.batch_size]]
+            items = [(table.path(i), table.sizes[i]) for i in batch]
+            pending.append((batch, items[-1][0], executor.submit(_hash_batch, full, items, self.partial_bytes)))
+            while len(pending) >= limit:
+                batch, current, future = pending.popleft()
+                done += len(batch)
+                yield from zip(batch, future.result())
+                self.throttle(DuplicateProgress(stage, done, len(indexes), current))
+        while pending:
+            batch, current, future = pending.popleft()
+            done += len(batch)
+            yield from zip(batch, future.result())
+            self.throttle(DuplicateProgress(stage, done, len(indexes), current))
+
+    def find(self, roots):
+        """Scans `roots` and returns a DuplicateResult with groups sorted by reclaimable bytes."""
+        started = time.monotonic()
+        table = scan_files(roots, self.min_size, self.stop_event, self.throttle)
+        indexes, group_starts = size_collisions(table.sizes)
+        logging.info(f"Duplicate scan: {len(table)} files, {len(indexes)} share a size with another file.")
+
+        errors = table.errors
+        groups = []
+        partial_hashed = full_hashed = 0
+        with self._executor() as executor:
+            # Stage 2: first and last KB; buckets hold file indexes, never paths
+            buckets = {}
+            for index, digest in self._hash_all(executor, DUPLICATE_STAGES[1], table, indexes, full=False):
+                partial_hashed += 1
+                if digest is None:
+                    errors += 1
+                    continue
+                buckets.setdefault((table.sizes[index], digest), []).append(index)
+
+            # Files no larger than both edges were hashed in full already
+            needs_full = array("q")
+            for (size, digest), members in buckets.items():
+                if len(members) < 2:
+                    continue
+                if size <= 2 * self.partial_bytes:
+                    groups.append(self._group(table, size, digest, members))
+                else:
+                    needs_full.extend(members)
+            del buckets
+
+            # Stage 3: full contents
+            buckets = {}
+            for index, digest in self._hash_all(executor, DUPLICATE_STAGES[2], table, needs_full, full=True):
+                full_hashed += 1
+                if digest is None:
+                    errors += 1
+                    continue
+                buckets.setdefault((table.sizes[index], digest), []).append(index)
+            groups.extend(self._group(table, size, digest, members)
+                          for (size, digest), members in buckets.items() if len(members) >= 2)
+
+        groups = [group for group in map(_drop_hardlinks, groups) if len(group.paths) >= 2]
+        groups.sort(key=lambda group: group.reclaimable, reverse=True)
+        bytes_scanned = int(np.frombuffer(table.sizes, dtype=np.int64).sum()) if len(table) else 0
+        elapsed = time.monotonic() - started
+        logging.info(f"Duplicate scan finished in {elapsed:.1f}s: {len(groups)} groups, "
+                     f"{reclaimable_bytes(groups)} bytes reclaimable ({partial_hashed} edge hashes, {full_hashed} full hashes).")
+        return DuplicateResult(groups, len(table), bytes_scanned, partial_hashed, full_hashed, errors, elapsed)
+
+    @staticmethod
+    def _group(table, size, digest, members):
+        """Builds a DuplicateGroup from file indexes; only confirmed duplicates get their paths built."""
+        return DuplicateGroup(size, digest.hex(), [table.path(index) for index in members],
+                              [table.mtimes[index] for index in members])
+
+
+def _drop_hardlinks(group):
+    """Hard links share storage, so only one path per file id counts as a copy."""
+    seen = set()
+    paths, mtimes = [], []
+    for path, mtime in zip(group.paths, group.mtimes):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        file_id = (st.st_dev, st.st_ino)
+        if st.st_ino and file_id in seen:
+            continue
+        seen.add(file_id)
+        paths.append(path)
+        mtimes.append(mtime)
+    return group._replace(paths=paths, mtimes=mtimes)
+
+
+# --- Resolution ---
+def plan_removals(groups, keep="newest", keep_in=None):
+    """
+    Chooses one file to keep per group and returns Removal tuples for the
+    rest. `keep` is "newest" or "oldest"; with `keep_in`, a copy inside that
+    folder is preferred whenever the group has one.
+    """
+    prefix = os.path.normcase(os.path.abspath(keep_in)).rstrip(os.sep) + os.sep if keep_in else None
+    pick = max if keep == "newest" else min
+    removals = []
+    for group in groups:
+        candidates = range(len(group.paths))
+        if prefix:
+            preferred = [i for i in candidates if os.path.normcase(os.path.abspath(group.paths[i])).startswith(prefix)]
+            candidates = preferred or candidates
+        kept = pick(candidates, key=lambda i: group.mtimes[i])
+        removals.extend(Removal(path, group.size, group.paths[kept])
+                        for i, path in enumerate(group.paths) if i != kept)
+    return removals
+
+
+def remove_duplicates(removals):
+    """
+    Deletes planned duplicates. A file is skipped if its size changed since
+    the scan or if the copy being kept has disappeared.
+    Returns (files deleted, bytes freed, errors).
+    """
+    deleted = freed = errors = 0
+    for removal in removals:
+        try:
+            if os.stat(removal.path).st_size != removal.size or os.stat(removal.keeper).st_size != removal.size:
+                logging.warning(f"Skipping {removal.path}: changed since the duplicate scan.")
+                errors += 1
+                continue
+            os.remove(removal.path)
+            deleted += 1
+            freed += removal.size
+        except OSError as e:
+            logging.warning(f"Could not delete duplicate {removal.path}: {e}")
+            errors += 1
+    return deleted, freed, errors
+
+
+if __name__ == "__main__":
+    # Headless benchmark: python rboost_duplicates.py <folder> [workers]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    bench = DuplicateFinder(workers=workers).find([folder])
+    print("\n".join(summary_lines(bench, top=10)))
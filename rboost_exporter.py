@@ -0,0 +1,156 @@
+"""
+Opt-in OpenMetrics/Prometheus exporter for RBoost PRO.
+
+Serves the sampler's latest snapshot and the app's task counters in the
+Prometheus text format on a local HTTP port. Scrapes only read the cached
+snapshot, so they never trigger extra psutil calls.
+"""
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_EXPORTER_PORT = 9753
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class TaskCounters:
+    """Thread-safe monotonically increasing counters for finished work."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {
+            "items_cleaned": 0,
+            "bytes_reclaimed": 0,
+            "tasks_run": 0,
+        }
+        self.version = 0  # Bumped on every change so renderers can cache
+
+    def add(self, name, amount=1):
+        """Increments counter `name` by `amount`."""
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+            self.version += 1
+
+    def snapshot(self):
+        """Returns a copy of all counter values."""
+        with self._lock:
+            return dict(self._values)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def render_metrics(snapshot, counters):
+    """Renders a MetricsSnapshot and counter dict as Prometheus exposition text."""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+
+    if snapshot is not None:
+        family("rboost_cpu_percent", "gauge", "Total CPU utilisation in percent.", [({}, snapshot.cpu)])
+        family("rboost_ram_percent", "gauge", "Physical memory in use in percent.", [({}, snapshot.ram)])
+        family("rboost_network_kbytes_per_second", "gauge", "Combined send and receive rate in KB/s.", [({}, snapshot.net)])
+        family("rboost_disk_percent", "gauge", "System drive usage in percent.", [({}, snapshot.disk_percent)])
+        family("rboost_sample_timestamp_seconds", "gauge", "Unix time of the cached sample.", [({}, snapshot.timestamp)])
+
+        breakdown = snapshot.breakdown
+        if breakdown is not None:
+            family("rboost_cpu_core_percent", "gauge", "Per-core CPU utilisation in percent.",
+                   [({"core": i}, v) for i, v in enumerate(breakdown.per_cpu.tolist())])
+            family("rboost_disk_read_bytes_per_second", "gauge", "Per-disk read throughput.",
+                   [({"disk": d}, v) for d, v in zip(breakdown.disks, breakdown.disk_read_bps.tolist())])
+            family("rboost_disk_write_bytes_per_second", "gauge", "Per-disk write throughput.",
+                   [({"disk": d}, v) for d, v in zip(breakdown.disks, breakdown.disk_write_bps.tolist())])
+            family("rboost_disk_iops", "gauge", "Per-disk read plus write operations per second.",
+                   [({"disk": d}, v) for d, v in zip(breakdown.disks, (breakdown.disk_read_iops + breakdown.disk_write_iops).tolist())])
+            family("rboost_nic_sent_bytes_per_second", "gauge", "Per-interface send rate.",
+                   [({"nic": n}, v) for n, v in zip(breakdown.nics, breakdown.nic_sent_bps.tolist())])
+            family("rboost_nic_received_bytes_per_second", "gauge", "Per-interface receive rate.",
+                   [({"nic": n}, v) for n, v in zip(breakdown.nics, breakdown.nic_recv_bps.tolist())])
+
+    for name, value in sorted(counters.items()):
+        family(f"rboost_{name}_total", "counter", f"Total {name.replace('_', ' ')} since RBoost started.", [({}, value)])
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+class MetricsExporter:
+    """
+    Local HTTP endpoint serving /metrics. `snapshot_source` is a callable
+    returning the latest MetricsSnapshot (or None); it must not block.
+    """
+
+    def __init__(self, snapshot_source, counters, host="127.0.0.1", port=DEFAULT_EXPORTER_PORT):
+        self.snapshot_source = snapshot_source
+        self.counters = counters
+        self.host = host
+        self.port = port
+        self.server = None
+        self._thread = None
+        self._cache_lock = threading.Lock()
+        self._cache_key = None
+        self._cache_body = b""
+
+    def body(self):
+        """Returns the encoded exposition text, re-rendered only when inputs change."""
+        snapshot = self.snapshot_source()
+        version = self.counters.version
+        with self._cache_lock:
+            if self._cache_key is None or self._cache_key[0] is not snapshot or self._cache_key[1] != version:
+                self._cache_body = render_metrics(snapshot, self.counters.snapshot()).encode("utf-8")
+                self._cache_key = (snapshot, version)  # Holds the snapshot so identity stays meaningful
+            return self._cache_body
+
+    def start(self):
+        """Binds the port and serves on a daemon thread."""
+        if self.server is not None:
+            return
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                payload = exporter.body()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logging.debug(f"Metrics exporter: {format % args}")
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="rboost-metrics-exporter", daemon=True)
+        self._thread.start()
+        logging.info(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        """Stops serving and releases the port."""
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        logging.info("Metrics exporter stopped.")
@@ -10,20 +10,36 @@ import threading
 import subprocess
 import re
 import platform
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import time
 import getpass
 import json
 import ctypes
-import shutil
+import multiprocessing
 from collections import defaultdict
-import glob
 import winshell
 import winreg as reg
 import urllib.request
 from packaging.version import parse as parse_version
+from rboost_telemetry import TelemetryStore, DASHBOARD_WINDOWS
+from rboost_sampler import MetricsSampler, summarize_breakdown
+from rboost_history import HistoryStore, HISTORY_DIR
+from rboost_exporter import MetricsExporter, TaskCounters, DEFAULT_EXPORTER_PORT
+from rboost_charts import SparklineChart, TreemapChart
+from rboost_widgets import VirtualList
+from rboost_cleanup import (CleanupEngine, CleanupRules, DirectoryState, CLEANUP_STATE_FILE,
+                            default_cleanup_targets, scan_reclaimable)
+from rboost_diskmap import (DiskScanner, DiskTree, LargeFileFilter, LargestFiles, diff_snapshots, find_largest_files,
+                             list_snapshots, prune_snapshots, save_snapshot)
+from rboost_browsers import CacheEviction, clean_browser_caches, discover_cache_stores, wipe_stores
+from rboost_tweaks import RegistryTweak, TWEAK_GROUPS, core_registry_tweaks
+from rboost_batches import BatchExecutor, TransientError, summarize_reports
+from rboost_shell import ShellError, ShellExited, ShellPool, ShellTimeout, ps_quote
+from rboost_restore import RestorePointCatalog, describe_restore_point
+from rboost_transactions import Change, TweakJournal, registry_change
+from rboost_plans import PlanRunner, StepTimings, step
+from rboost_duplicates import DuplicateFinder, DUPLICATE_STAGES, plan_removals, reclaimable_bytes, remove_duplicates, summary_lines
+from rboost_processes import (ProcessTable, ProcessSampler, PROCESS_COLUMNS, TOP_N_VIEWS, BloatRules,
+                              DEFAULT_BLOAT_RULES, expand_trees, format_bytes, pids_by_name, terminate_processes)
 import win32event
 import win32api
 import winerror
@@ -96,16 +112,23 @@ class RBoostApp(ctk.CTk):
         self.cleanup_thread = None
         self.cleanup_stop_event = threading.Event()
         self.restore_point_manager_window = None
+        self.disk_analyzer_window = None
+        self.batch_executor = BatchExecutor(workers=self.settings.get("batch_workers", 4), timeout=self.settings.get("command_timeout", 120))
+        self.tweak_journal = TweakJournal(executor=self.batch_executor)
+        self.shell_pool = ShellPool(size=self.settings.get("shell_hosts", 2))  # PowerShell hosts start on first use
+        self.restore_points = RestorePointCatalog(self.shell_pool.run)
+        self.restore_point_records = []
+        self.tweak_journal.compact()
+        self.active_plan = None  # While a step plan runs, it alone drives the progress bar
 
         # --- System Monitor Data ---
-        self.max_data_points = 60
-        self.time_data = []
-        self.cpu_usage = []
-        self.ram_usage = []
-        self.net_usage = []
-        self.disk_usage = []
-        self.network_bytes_sent_prev = 0
-        self.network_bytes_recv_prev = 0
+        self.telemetry = TelemetryStore(["cpu", "ram", "net"])
+        self.history = HistoryStore(HISTORY_DIR, self.telemetry.series, retention_days=self.settings.get("history_retention_days", 30))
+        self.sampler = MetricsSampler(self.telemetry, history=self.history)
+        self.task_counters = TaskCounters()
+        self.metrics_exporter = None
+        self.dashboard_window = "1 min"
+        self.last_drawn_snapshot = None
         self.start_time = time.time()
 
         # --- UI Layout ---
@@ -193,6 +216,10 @@ class RBoostApp(ctk.CTk):
         
         # --- Start Background Tasks ---
         logging.info("Scheduling background threads and updates.")
+        self.sampler.start()
+        threading.Thread(target=self.history.maintain, daemon=True).start()
+        if self.settings.get("metrics_exporter_enabled", False):
+            self.start_metrics_exporter()
         self.after(100, self.update_system_metrics)
         
         # Start silent cleanup if setting is enabled
@@ -206,6 +233,10 @@ class RBoostApp(ctk.CTk):
     # --- UI Helper Functions ---
     def log_status(self, message):
         """Logs a message to the status box."""
+        if self.active_plan is not None and threading.current_thread() is not threading.main_thread():
+            # Plan steps run on several threads at once; only the Tk thread may touch widgets
+            self.after(0, self.log_status, message)
+            return
         self.status_box.configure(state="normal")
         self.status_box.insert("end", f"{message}\n")
         self.status_box.see("end")
@@ -213,7 +244,13 @@ class RBoostApp(ctk.CTk):
 
     def update_progress(self, value, message=None):
         """Updates the progress bar and status message."""
-        self.progress_bar.set(value)
+        if self.active_plan is not None and threading.current_thread() is not threading.main_thread():
+            # The plan drives the bar; a step's own value is dropped and its message logged on the Tk thread
+            if message:
+                self.after(0, self.log_status, message)
+            return
+        if self.active_plan is None:
+            self.progress_bar.set(value)
         if message:
             self.log_status(message)
         self.update_idletasks()
@@ -226,6 +263,13 @@ class RBoostApp(ctk.CTk):
         # Stop background cleanup thread
         self.stop_silent_cleanup()
 
+        # Stop the metrics exporter, sampler thread and persist buffered history
+        self.stop_metrics_exporter()
+        self.sampler.stop()
+        self.history.close()
+        self.batch_executor.shutdown()
+        self.shell_pool.close()
+
         # Cancel scheduled `after` calls
         for after_id in list(self.after_ids.keys()):
             if self.after_ids[after_id]:
@@ -338,39 +382,20 @@ class RBoostApp(ctk.CTk):
         welcome_label = ctk.CTkLabel(dashboard_frame, text=f"Welcome, {username}!", font=ctk.CTkFont(size=28, weight="bold"))
         welcome_label.grid(row=0, column=0, padx=20, pady=20, sticky="n")
 
-        # System Monitor Graphs
-        logging.info("Setting up Matplotlib for Dashboard.")
-        self.fig = Figure(figsize=(10, 8))
-        self.fig.patch.set_facecolor("#2b2b2b") # Match CTk background
-        self.ax_cpu = self.fig.add_subplot(3, 1, 1)
-        self.ax_ram = self.fig.add_subplot(3, 1, 2)
-        self.ax_net = self.fig.add_subplot(3, 1, 3)
-
-        # Configure axes
-        for ax in [self.ax_cpu, self.ax_ram, self.ax_net]:
-            ax.set_facecolor("#2b2b2b")
-            ax.tick_params(axis='both', colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['right'].set_visible(False)
-            ax.spines['top'].set_visible(False)
-            ax.title.set_color('white')
-            ax.set_ylabel('Usage (%)', color='white')
-            ax.tick_params(axis='x', labelbottom=False)
-
-        self.ax_cpu.set_title("CPU Usage (%)")
-        self.ax_ram.set_title("RAM Usage (%)")
-        self.ax_net.set_title("Network Usage (KB/s)")
-        self.ax_net.set_ylabel("Usage (KB/s)", color='white')
-
-        self.line_cpu, = self.ax_cpu.plot([], [], color='#4CAF50')
-        self.line_ram, = self.ax_ram.plot([], [], color='#2196F3')
-        self.line_net, = self.ax_net.plot([], [], color='#FFC107')
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=dashboard_frame)
-        self.canvas_widget = self.canvas.get_tk_widget()
-        self.canvas_widget.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
-        logging.info("Matplotlib canvas created successfully.")
+        # System Monitor Graphs (native canvas; matplotlib is only loaded for detail views)
+        logging.info("Setting up sparkline charts for Dashboard.")
+        self.dashboard_chart = SparklineChart(dashboard_frame, panels=[
+            ("cpu", "CPU Usage (%)", '#4CAF50', 100),
+            ("ram", "RAM Usage (%)", '#2196F3', 100),
+            ("net", "Network Usage (KB/s)", '#FFC107', None),
+        ], height=600)
+        self.dashboard_chart.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
+        logging.info("Dashboard chart created successfully.")
+
+        # History window selector (served from the telemetry rollups)
+        self.window_selector = ctk.CTkSegmentedButton(dashboard_frame, values=list(DASHBOARD_WINDOWS), command=self.change_dashboard_window)
+        self.window_selector.set(self.dashboard_window)
+        self.window_selector.grid(row=0, column=0, padx=20, pady=20, sticky="e")
 
         # Disk Usage Pie Chart
         disk_chart_frame = ctk.CTkFrame(dashboard_frame, fg_color="transparent")
@@ -379,6 +404,12 @@ class RBoostApp(ctk.CTk):
         # This will be updated later with the actual plot
         self.disk_label = ctk.CTkLabel(disk_chart_frame, text="Disk Usage: C:\\ (0%)", font=ctk.CTkFont(size=16))
         self.disk_label.pack(pady=5)
+
+        # Per-core / per-disk / per-NIC hot spots
+        self.breakdown_label = ctk.CTkLabel(disk_chart_frame, text="", font=ctk.CTkFont(size=13))
+        self.breakdown_label.pack(pady=5)
+
+        ctk.CTkButton(disk_chart_frame, text="📅 View History", command=self.open_history_window).pack(pady=5)
         
         logging.info("Dashboard built.")
 
@@ -409,16 +440,21 @@ class RBoostApp(ctk.CTk):
         ctk.CTkButton(buttons_frame, text="📦 Debloat Windows", command=lambda: self.run_task(self.debloat_windows_apps, "Debloating Windows apps...")).grid(row=0, column=2, padx=10, pady=10, sticky="ew")
         
         ctk.CTkButton(buttons_frame, text="⚙️ Optimize Services", command=lambda: self.run_task(self.deep_service_optimizer, "Optimizing services...")).grid(row=1, column=0, padx=10, pady=10, sticky="ew")
-        ctk.CTkButton(buttons_frame, text="📁 Disk Usage Analyzer", command=lambda: self.run_task(self.analyze_disk_usage, "Analyzing disk usage...")).grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+        ctk.CTkButton(buttons_frame, text="📁 Disk Usage Analyzer", command=self.analyze_disk_usage).grid(row=1, column=1, padx=10, pady=10, sticky="ew")
         ctk.CTkButton(buttons_frame, text="🗃️ Clear Browser Cache", command=lambda: self.run_task(self.clear_browser_cache, "Clearing browser caches...")).grid(row=1, column=2, padx=10, pady=10, sticky="ew")
         
         ctk.CTkButton(buttons_frame, text="💾 Flush Standby RAM", command=lambda: self.run_task(self.flush_standby_ram, "Flushing standby RAM...")).grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+        ctk.CTkButton(buttons_frame, text="📝 Edit Bloat Rules", command=self.open_bloat_rules_editor).grid(row=2, column=1, padx=10, pady=10, sticky="ew")
         ctk.CTkButton(buttons_frame, text="Kill Background Bloat", command=lambda: self.run_task(self.kill_background_apps, "Killing background apps...")).grid(row=2, column=2, padx=10, pady=10, sticky="ew")
         
         ctk.CTkButton(buttons_frame, text="Control Panel", command=self.launch_control_panel).grid(row=3, column=0, padx=10, pady=10, sticky="ew")
         ctk.CTkButton(buttons_frame, text="App Uninstaller", command=self.launch_app_uninstaller).grid(row=3, column=1, padx=10, pady=10, sticky="ew")
         ctk.CTkButton(buttons_frame, text="⏳ Manage Restore Points", command=self.open_restore_point_manager).grid(row=3, column=2, padx=10, pady=10, sticky="ew") # New button
 
+        ctk.CTkButton(buttons_frame, text="🔍 Scan Reclaimable Space", command=lambda: self.run_task(self.scan_reclaimable_space, "Scanning for reclaimable space...")).grid(row=4, column=0, padx=10, pady=10, sticky="ew")
+        ctk.CTkButton(buttons_frame, text="🗂️ Find Duplicate Files", command=self.find_duplicate_files).grid(row=4, column=1, padx=10, pady=10, sticky="ew")
+        ctk.CTkButton(buttons_frame, text="↩️ Undo Tweaks", command=self.open_tweak_history).grid(row=4, column=2, padx=10, pady=10, sticky="ew")
+
         logging.info("Toolbox built.")
 
     def build_startup_manager(self):
@@ -477,43 +513,76 @@ class RBoostApp(ctk.CTk):
         processes_frame.grid_columnconfigure(0, weight=1)
         processes_frame.grid_rowconfigure(1, weight=1)
 
-        self.process_listbox = tk.Listbox(
+        self.process_table = ProcessTable()
+        self.process_sampler = ProcessSampler()
+        self.process_refresh_pending = False
+
+        controls_frame = ctk.CTkFrame(processes_frame, fg_color="transparent")
+        controls_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        controls_frame.grid_columnconfigure(1, weight=1)
+
+        self.process_list = VirtualList(
             processes_frame,
-            bg="#2b2b2b",
-            fg="white",
-            selectbackground="#4CAF50",
-            activestyle="dotbox",
-            height=25
+            columns=[(title, width, anchor) for title, _, width, anchor in PROCESS_COLUMNS],
+            row_text=self.process_table.display,
         )
-        self.process_listbox.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-
-        self.process_data = {}
+        self.process_list.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+        def apply_processes(rows, quiet):
+            self.process_refresh_pending = False
+            self.process_table.apply(rows)
+            if self.process_list.selected not in self.process_table.rows:
+                self.process_list.selected = None
+            self.process_list.set_keys(self.process_table.view)
+            if not quiet:
+                self.log_status("✅ Process list refreshed.")
+
+        def load_processes(quiet=False):
+            # psutil walks run off the Tk thread; only the diff is applied here
+            if self.process_refresh_pending:
+                return
+            self.process_refresh_pending = True
+
+            def worker():
+                rows = self.process_sampler.sweep()
+                self.after(0, apply_processes, rows, quiet)
+            threading.Thread(target=worker, daemon=True).start()
+
+        def on_filter_change(*_):
+            self.process_table.set_filter(self.process_filter_var.get())
+            self.process_list.top = 0
+            self.process_list.set_keys(self.process_table.view)
+
+        def on_header_click(column):
+            self.process_table.set_sort(PROCESS_COLUMNS[column][1])
+            arrow = " ▼" if self.process_table.sort_descending else " ▲"
+            for index, (title, field, _, _) in enumerate(PROCESS_COLUMNS):
+                self.process_list.set_header_text(index, title + (arrow if field == self.process_table.sort_field else ""))
+            self.process_list.set_keys(self.process_table.view)
+
+        def on_view_change(choice):
+            self.process_table.set_top_n(TOP_N_VIEWS[choice])
+            self.process_list.top = 0
+            self.process_list.set_keys(self.process_table.view)
+
+        def on_tree_toggle():
+            self.process_table.set_tree_mode(self.process_tree_switch.get() == 1)
+            self.process_list.top = 0
+            self.process_list.set_keys(self.process_table.view)
+
+        def auto_refresh():
+            if self.process_auto_refresh_switch.get() == 1:
+                load_processes(quiet=True)
+                self.after_ids["process_refresh"] = self.after(2000, auto_refresh)
+            else:
+                self.after_ids["process_refresh"] = None
 
-        def load_processes():
-            self.process_listbox.delete(0, tk.END)
-            self.process_data.clear()
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    pid = proc.info['pid']
-                    name = proc.info['name']
-                    display = f"{name} (PID: {pid})"
-                    self.process_listbox.insert(tk.END, display)
-                    self.process_data[display] = pid
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            self.log_status("✅ Process list refreshed.")
-
-        def on_left_click(event):
+        def on_process_click(pid, event):
             try:
-                index = self.process_listbox.nearest(event.y)
-                if index == -1:
-                    return
-                self.process_listbox.selection_clear(0, tk.END)
-                self.process_listbox.selection_set(index)
-                selected_item = self.process_listbox.get(index)
-                pid = self.process_data.get(selected_item)
-                if not pid:
+                row = self.process_table.rows.get(pid)
+                if not row:
                     return
+                selected_item = f"{row[0]} (PID: {pid})"
 
                 def kill():
                     if not self.is_admin:
@@ -529,22 +598,51 @@ class RBoostApp(ctk.CTk):
                         except Exception as e:
                             self.log_status(f"❌ Failed to kill: {e}")
 
+                def end_bulk(label, pids):
+                    if not self.is_admin:
+                        messagebox.showerror("Permission Denied", "Administrator rights required.")
+                        return
+                    if not messagebox.askyesno("Confirm", f"{label}:\n{selected_item}?"):
+                        return
+
+                    def worker():
+                        report = terminate_processes(expand_trees(pids))
+                        self.after(0, self.log_status, self.describe_terminate_report(label, report))
+                        self.after(0, load_processes, True)
+                    threading.Thread(target=worker, daemon=True).start()
+
                 menu = tk.Menu(self, tearoff=0, bg="#333", fg="white",
                                activebackground="#4CAF50", activeforeground="white")
                 menu.add_command(label="❌ Kill Process", command=kill)
+                menu.add_command(label="🌳 End Process Tree", command=lambda: end_bulk("End process tree", [pid]))
+                menu.add_command(label=f"🗂️ End Process Group (all {row.name})", command=lambda: end_bulk("End process group", pids_by_name(row.name)))
                 menu.post(event.x_root, event.y_root)
 
             except Exception as e:
                 self.log_status(f"❌ Error: {e}")
 
-        self.process_listbox.bind("<Button-1>", on_left_click)
+        self.process_list.on_select = on_process_click
+        self.process_list.on_context = on_process_click
+        self.process_list.on_header_click = on_header_click
 
-        refresh_btn = ctk.CTkButton(processes_frame, text="🔄 Refresh", command=load_processes)
-        refresh_btn.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        refresh_btn = ctk.CTkButton(controls_frame, text="🔄 Refresh", command=load_processes)
+        refresh_btn.grid(row=0, column=0, padx=(0, 10), sticky="w")
 
-        load_processes()
+        self.process_filter_var = tk.StringVar()
+        self.process_filter_var.trace_add("write", on_filter_change)
+        filter_entry = ctk.CTkEntry(controls_frame, textvariable=self.process_filter_var, placeholder_text="Filter by name or PID...")
+        filter_entry.grid(row=0, column=1, padx=10, sticky="ew")
 
+        view_menu = ctk.CTkOptionMenu(controls_frame, values=list(TOP_N_VIEWS), command=on_view_change)
+        view_menu.grid(row=0, column=2, padx=10, sticky="e")
 
+        self.process_tree_switch = ctk.CTkSwitch(controls_frame, text="Tree view", command=on_tree_toggle)
+        self.process_tree_switch.grid(row=0, column=3, padx=10, sticky="e")
+
+        self.process_auto_refresh_switch = ctk.CTkSwitch(controls_frame, text="Auto-refresh", command=auto_refresh)
+        self.process_auto_refresh_switch.grid(row=0, column=4, padx=(10, 0), sticky="e")
+
+        load_processes()
 
     def build_speed_test(self):
         """Builds the Speed Test tab UI."""
@@ -619,9 +717,52 @@ class RBoostApp(ctk.CTk):
         if self.settings.get("silent_cleanup_enabled", False):
             self.silent_cleanup_switch.select()
 
+        # Metrics Exporter Toggle
+        exporter_frame = ctk.CTkFrame(settings_frame)
+        exporter_frame.grid(row=4, column=0, padx=20, pady=10, sticky="ew")
+        exporter_port = self.settings.get("metrics_exporter_port", DEFAULT_EXPORTER_PORT)
+        ctk.CTkLabel(exporter_frame, text=f"Serve Prometheus metrics on http://127.0.0.1:{exporter_port}/metrics:").pack(side="left", padx=10)
+        self.metrics_exporter_switch = ctk.CTkSwitch(exporter_frame, text="", command=self.toggle_metrics_exporter)
+        self.metrics_exporter_switch.pack(side="right", padx=10)
+        if self.settings.get("metrics_exporter_enabled", False):
+            self.metrics_exporter_switch.select()
+
+        # Cleanup Rules
+        rules = self.cleanup_rules()
+        rules_frame = ctk.CTkFrame(settings_frame)
+        rules_frame.grid(row=5, column=0, padx=20, pady=10, sticky="ew")
+        rules_frame.grid_columnconfigure(3, weight=1)
+        ctk.CTkLabel(rules_frame, text="Cleanup: skip files newer than (days):").grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.cleanup_min_age_entry = ctk.CTkEntry(rules_frame, width=60)
+        self.cleanup_min_age_entry.insert(0, f"{rules.min_age_days:g}")
+        self.cleanup_min_age_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ctk.CTkLabel(rules_frame, text="Exclude patterns:").grid(row=0, column=2, padx=10, pady=5, sticky="w")
+        self.cleanup_exclude_entry = ctk.CTkEntry(rules_frame, placeholder_text="*.lock, *\\Installer\\*")
+        self.cleanup_exclude_entry.insert(0, ", ".join(rules.exclude))
+        self.cleanup_exclude_entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
+        self.cleanup_skip_open_switch = ctk.CTkSwitch(rules_frame, text="Skip files in use")
+        self.cleanup_skip_open_switch.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        if rules.skip_open_files:
+            self.cleanup_skip_open_switch.select()
+        browser_frame = ctk.CTkFrame(rules_frame, fg_color="transparent")
+        browser_frame.grid(row=2, column=0, columnspan=4, padx=5, pady=5, sticky="ew")
+        ctk.CTkLabel(browser_frame, text="Browser cache:").pack(side="left", padx=5)
+        self.browser_cache_mode_menu = ctk.CTkOptionMenu(browser_frame, values=["Wipe everything", "Evict cold entries"])
+        self.browser_cache_mode_menu.set("Evict cold entries" if self.settings.get("browser_cache_mode") == "evict" else "Wipe everything")
+        self.browser_cache_mode_menu.pack(side="left", padx=5)
+        ctk.CTkLabel(browser_frame, text="unused for (days):").pack(side="left", padx=5)
+        self.browser_cache_age_entry = ctk.CTkEntry(browser_frame, width=50)
+        self.browser_cache_age_entry.insert(0, f"{self.settings.get('browser_cache_max_age_days', 14):g}")
+        self.browser_cache_age_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(browser_frame, text="or above MB per profile:").pack(side="left", padx=5)
+        self.browser_cache_budget_entry = ctk.CTkEntry(browser_frame, width=60)
+        self.browser_cache_budget_entry.insert(0, f"{self.settings.get('browser_cache_budget_mb', 500):g}")
+        self.browser_cache_budget_entry.pack(side="left", padx=5)
+        ctk.CTkButton(rules_frame, text="Save Cleanup Rules", command=self.save_cleanup_rules).grid(row=1, column=3, padx=5, pady=5, sticky="e")
+
         # Config Import/Export/Reset
         config_frame = ctk.CTkFrame(settings_frame)
-        config_frame.grid(row=4, column=0, padx=20, pady=10, sticky="ew")
+        config_frame.grid(row=6, column=0, padx=20, pady=10, sticky="ew")
         ctk.CTkButton(config_frame, text="Import Settings", command=self.import_settings).pack(side="left", expand=True, padx=10, pady=10)
         ctk.CTkButton(config_frame, text="Export Settings", command=self.export_settings).pack(side="left", expand=True, padx=10, pady=10)
         ctk.CTkButton(config_frame, text="Reset Settings", command=self.reset_settings).pack(side="left", expand=True, padx=10, pady=10)
@@ -651,6 +792,60 @@ class RBoostApp(ctk.CTk):
             self.stop_silent_cleanup()
             self.log_status("Silent background cleanup disabled.")
 
+    def save_cleanup_rules(self):
+        """Stores the cleanup rule fields from the Settings tab."""
+        rules = self.cleanup_rules()
+        try:
+            rules.min_age_days = max(0.0, float(self.cleanup_min_age_entry.get().strip() or 0))
+        except ValueError:
+            messagebox.showerror("Invalid Value", "Minimum age must be a number of days.")
+            return
+        try:
+            cache_age = max(0.0, float(self.browser_cache_age_entry.get().strip() or 0))
+            cache_budget = max(0.0, float(self.browser_cache_budget_entry.get().strip() or 0))
+        except ValueError:
+            messagebox.showerror("Invalid Value", "Browser cache age and budget must be numbers.")
+            return
+        self.settings["browser_cache_mode"] = "evict" if self.browser_cache_mode_menu.get() == "Evict cold entries" else "wipe"
+        self.settings["browser_cache_max_age_days"] = cache_age
+        self.settings["browser_cache_budget_mb"] = cache_budget
+        rules.exclude = [p.strip() for p in self.cleanup_exclude_entry.get().split(",") if p.strip()]
+        rules.skip_open_files = self.cleanup_skip_open_switch.get() == 1
+        self.settings["cleanup_rules"] = rules.to_settings()
+        self.save_settings()
+        self.log_status("Cleanup rules saved.")
+
+    def toggle_metrics_exporter(self):
+        """Toggles the local Prometheus metrics endpoint."""
+        enabled = self.metrics_exporter_switch.get() == 1
+        self.settings["metrics_exporter_enabled"] = enabled
+        self.save_settings()
+        if enabled:
+            self.start_metrics_exporter()
+        else:
+            self.stop_metrics_exporter()
+            self.log_status("Metrics exporter disabled.")
+
+    def start_metrics_exporter(self):
+        """Starts serving cached metrics on localhost."""
+        if self.metrics_exporter is not None:
+            return
+        port = self.settings.get("metrics_exporter_port", DEFAULT_EXPORTER_PORT)
+        try:
+            self.metrics_exporter = MetricsExporter(lambda: self.sampler.latest, self.task_counters, port=port)
+            self.metrics_exporter.start()
+            self.log_status(f"Metrics exporter listening on http://127.0.0.1:{self.metrics_exporter.port}/metrics")
+        except OSError as e:
+            self.metrics_exporter = None
+            logging.error(f"Failed to start metrics exporter: {e}")
+            self.log_status(f"❌ Failed to start metrics exporter: {e}")
+
+    def stop_metrics_exporter(self):
+        """Stops the local metrics endpoint if it is running."""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+
     def build_about(self):
         about_frame = self.tabview.tab("About")
         about_frame.grid_rowconfigure(0, weight=1)
@@ -702,53 +897,88 @@ class RBoostApp(ctk.CTk):
 
 
     # --- System Metrics & Update Functions ---
+    def change_dashboard_window(self, window_name):
+        """Switches the Dashboard history window and redraws immediately."""
+        self.dashboard_window = window_name
+        self.log_status(f"Dashboard window set to {window_name}.")
+        self.redraw_dashboard()
+
+    def redraw_dashboard(self):
+        """Plots the selected history window from the telemetry store."""
+        now = time.time()
+        seconds = DASHBOARD_WINDOWS[self.dashboard_window]
+        window = self.sampler.window(seconds, now)
+        columns = {name: self.telemetry.index(name) for name in ("cpu", "ram", "net")}
+        self.dashboard_chart.set_series(
+            window.times,
+            {name: window.mean[:, i] for name, i in columns.items()},
+            now - seconds, now,
+            lows={name: window.low[:, i] for name, i in columns.items()},
+            highs={name: window.high[:, i] for name, i in columns.items()},
+            formats={"cpu": "{:.1f}%", "ram": "{:.1f}%", "net": "{:.1f} KB/s"},
+        )
+
+    def open_history_window(self):
+        """Opens a window that plots a past day from the on-disk history."""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        history_window = ctk.CTkToplevel(self)
+        history_window.title("Metrics History")
+        history_window.geometry("900x650")
+
+        controls = ctk.CTkFrame(history_window, fg_color="transparent")
+        controls.pack(fill="x", padx=20, pady=10)
+        ctk.CTkLabel(controls, text="Day (YYYY-MM-DD):").pack(side="left", padx=5)
+        day_entry = ctk.CTkEntry(controls, width=140)
+        day_entry.insert(0, time.strftime("%Y-%m-%d", time.localtime(time.time() - 86400)))
+        day_entry.pack(side="left", padx=5)
+
+        fig = Figure(figsize=(9, 6))
+        fig.patch.set_facecolor("#2b2b2b")
+        canvas = FigureCanvasTkAgg(fig, master=history_window)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=20, pady=10)
+
+        def plot_day():
+            try:
+                start = time.mktime(time.strptime(day_entry.get().strip(), "%Y-%m-%d"))
+            except ValueError:
+                messagebox.showerror("Invalid Date", "Please enter a date as YYYY-MM-DD.", parent=history_window)
+                return
+            times, values = self.history.query(start, start + 86400, series=["cpu", "ram"], max_points=1440)
+            fig.clear()
+            for column, (title, color) in enumerate([("CPU Usage (%)", '#4CAF50'), ("RAM Usage (%)", '#2196F3')]):
+                ax = fig.add_subplot(2, 1, column + 1)
+                ax.set_facecolor("#2b2b2b")
+                ax.tick_params(axis='both', colors='white')
+                ax.set_title(title, color='white')
+                ax.plot((times - start) / 3600, values[:, column], color=color)
+                ax.set_xlim(0, 24)
+            fig.axes[-1].set_xlabel("Hour of day", color='white')
+            canvas.draw()
+            if not len(times):
+                self.log_status(f"ℹ️ No history recorded for {day_entry.get().strip()}.")
+
+        ctk.CTkButton(controls, text="Plot", command=plot_day).pack(side="left", padx=5)
+        plot_day()
+
     def update_system_metrics(self):
-        """Fetches and updates system metrics."""
+        """
+        Reads the sampler's latest snapshot and refreshes the Dashboard.
+        No psutil calls happen here; they all run on the sampler thread.
+        """
         try:
-            # CPU, RAM, and Disk usage
-            self.time_data.append(time.time() - self.start_time)
-            self.cpu_usage.append(psutil.cpu_percent(interval=None))
-            self.ram_usage.append(psutil.virtual_memory().percent)
-
-            # Network usage (per second)
-            net_io_counters = psutil.net_io_counters()
-            bytes_sent = net_io_counters.bytes_sent
-            bytes_recv = net_io_counters.bytes_recv
-            
-            if self.network_bytes_sent_prev == 0:
-                self.network_bytes_sent_prev = bytes_sent
-                self.network_bytes_recv_prev = bytes_recv
-            
-            sent_rate_kb = (bytes_sent - self.network_bytes_sent_prev) / 1024
-            recv_rate_kb = (bytes_recv - self.network_bytes_recv_prev) / 1024
-            
-            self.network_bytes_sent_prev = bytes_sent
-            self.network_bytes_recv_prev = bytes_recv
-            
-            total_rate_kb = sent_rate_kb + recv_rate_kb
-            self.net_usage.append(total_rate_kb)
-            
-            # Keep data lists at a maximum size for a rolling window
-            if len(self.time_data) > self.max_data_points:
-                self.time_data.pop(0)
-                self.cpu_usage.pop(0)
-                self.ram_usage.pop(0)
-                self.net_usage.pop(0)
-            
-            # Update plots
-            self.line_cpu.set_data(self.time_data, self.cpu_usage)
-            self.line_ram.set_data(self.time_data, self.ram_usage)
-            self.line_net.set_data(self.time_data, self.net_usage)
-            
-            for ax in [self.ax_cpu, self.ax_ram, self.ax_net]:
-                ax.relim()
-                ax.autoscale_view()
-            
-            self.canvas.draw()
-            
-            # Update disk label
-            c_disk = psutil.disk_usage('C:\\')
-            self.disk_label.configure(text=f"Disk Usage: C:\\ ({c_disk.percent:.1f}%)")
+            # Let the sampler slow down while the charts are not on screen
+            dashboard_visible = self.tabview.get() == "Dashboard"
+            self.sampler.set_activity(visible=dashboard_visible, minimized=self.state() == "iconic")
+
+            snapshot = self.sampler.latest
+            if dashboard_visible and snapshot is not None and snapshot is not self.last_drawn_snapshot:
+                self.last_drawn_snapshot = snapshot
+                self.redraw_dashboard()
+                self.disk_label.configure(text=f"Disk Usage: {self.sampler.disk_path} ({snapshot.disk_percent:.1f}%)")
+                if snapshot.breakdown is not None:
+                    self.breakdown_label.configure(text=summarize_breakdown(snapshot.breakdown))
 
         except Exception as e:
             logging.error(f"Error updating system metrics: {e}")
@@ -819,14 +1049,13 @@ class RBoostApp(ctk.CTk):
             return
             
         try:
-            if is_enabled:
-                # To enable, move from RunOnce to Run (if it was disabled)
-                self.log_status(f"Enabling startup item: {name}...")
-                self._run_command(f'reg add "{path}" /v "{name}" /t REG_SZ /d "{value}" /f', f"Enabling {name}...")
-            else:
-                # To disable, delete from Run key
-                self.log_status(f"Disabling startup item: {name}...")
-                self._run_command(f'reg delete "{path}" /v "{name}" /f', f"Disabling {name}...")
+            hive_name = "HKCU" if hive == reg.HKEY_CURRENT_USER else "HKLM"
+            # Enabling writes the value back to the Run key; disabling deletes it
+            row = RegistryTweak(hive_name, path, name, "REG_SZ", value if is_enabled else None)
+            result = self.apply_registry_tweaks([row], f"{'Enabling' if is_enabled else 'Disabling'} startup item: {name}...",
+                                                label=f"Startup item {name} {'enabled' if is_enabled else 'disabled'}")
+            if result.failed:
+                raise result.failed[0][1]
 
             self.log_status(f"Successfully {'enabled' if is_enabled else 'disabled'} {name}.")
             
@@ -852,6 +1081,7 @@ class RBoostApp(ctk.CTk):
                 
                 # Execute the task function
                 task_function()
+                self.task_counters.add("tasks_run")
                 
                 # Set progress to 100% and show completion message
                 self.after(0, self.update_progress, 1, "Task completed successfully!")
@@ -897,69 +1127,204 @@ class RBoostApp(ctk.CTk):
             return False
 
     # --- Core Toolbox Features ---
+    def one_click_boost_plan(self):
+        """The One-Click Boost steps; everything that changes the system waits for the restore point."""
+        return [
+            step("restore_point", self.create_restore_point, "Creating restore point", resources=["disk"], estimate=30),
+            step("registry", self.apply_core_registry_tweaks, "Applying registry tweaks", after=["restore_point"], estimate=5),
+            step("scheduled_tasks", self.disable_scheduled_tasks, "Disabling scheduled tasks", after=["restore_point"], estimate=5),
+            step("temp_cleanup", self.clean_temp_files, "Cleaning up temp files", resources=["disk"], estimate=15),
+            step("debloat", self.debloat_windows_apps, "Debloating Windows apps", after=["restore_point"], resources=["disk"], estimate=60),
+        ]
+
+    def run_plan(self, name, steps):
+        """Runs a step plan, independent steps in parallel, with progress weighted by past step timings."""
+        last_running = []
+
+        def report_progress(progress):
+            if progress.running and progress.running != last_running:
+                last_running[:] = progress.running
+                self.after(0, self.log_status, f"Running: {', '.join(progress.running)}...")
+            self.after(0, self.progress_bar.set, 0.1 + 0.85 * progress.fraction)
+
+        self.active_plan = name
+        try:
+            result = PlanRunner(steps, StepTimings.load(), progress=report_progress).run()
+        finally:
+            self.active_plan = None
+        for step_result in result.steps:
+            if step_result.status != "done":
+                self.log_status(f"❌ {step_result.name} {step_result.status}: {step_result.error}")
+        self.log_status(f"{name} finished in {result.elapsed:.1f}s.")
+        return result
+
     def one_click_boost(self):
         """Applies a series of performance tweaks in one go."""
         self.log_status("Applying One-Click Boost...")
-        self.update_progress(0.1, "Creating restore point...")
-        self.create_restore_point()
-        
-        self.update_progress(0.2, "Applying registry tweaks...")
-        self.apply_core_registry_tweaks()
-        
-        self.update_progress(0.5, "Debloating Windows apps...")
-        self.debloat_windows_apps()
-        
-        self.update_progress(0.7, "Disabling scheduled tasks...")
-        self.disable_scheduled_tasks()
-        
-        self.update_progress(0.9, "Cleaning up temp files...")
-        self.clean_temp_files()
-        
+        self.run_plan("One-Click Boost", self.one_click_boost_plan())
         self.update_progress(1.0, "One-Click Boost complete!")
 
-    def clean_temp_files(self):
-        """Deletes temporary files from common locations."""
-        temp_paths = [
-            os.path.join(os.environ.get('TEMP', ''), '*'),
-            os.path.join(os.environ.get('WINDIR', ''), 'temp', '*'),
-            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Temp', '*'),
-            os.path.join(winshell.startup(), '..', '..', 'Temp', '*') # User-specific temp
-        ]
-        
-        deleted_count = 0
-        total_size = 0
-        
-        for path_glob in temp_paths:
-            for item in glob.glob(path_glob):
-                try:
-                    if os.path.isfile(item):
-                        total_size += os.path.getsize(item)
-                        os.remove(item)
-                        deleted_count += 1
-                    elif os.path.isdir(item):
-                        shutil.rmtree(item, ignore_errors=True)
-                        deleted_count += 1
-                    self.update_progress(min(0.9, self.progress_bar.get() + 0.01), f"Deleting: {os.path.basename(item)}")
-                except Exception as e:
-                    logging.warning(f"Could not delete {item}: {e}")
-        
+    def cleanup_targets(self):
+        """Returns {category: [folders]} for the cleaner, including the user-specific temp."""
+        return default_cleanup_targets(extra_temp=[
+            os.path.join(winshell.startup(), '..', '..', 'Temp') # User-specific temp
+        ])
+
+    def cleanup_rules(self):
+        """Returns the user's CleanupRules from settings."""
+        return CleanupRules.from_settings(self.settings.get("cleanup_rules"))
+
+    def cleanup_progress_reporter(self, verb):
+        """Returns a progress callback that forwards coalesced engine updates to the Tk thread."""
+        last_fraction = [0.1]  # Kept here so the worker thread never reads the Tk progress bar
+
+        def report_progress(progress):
+            if progress.deleted or verb == "Deleting":
+                fraction = 0.1 + 0.8 * (progress.deleted + progress.errors) / max(progress.found, 1)
+            else:
+                fraction = min(0.9, last_fraction[0] + 0.02)
+            last_fraction[0] = fraction
+            message = f"{verb}: {os.path.basename(progress.current)}" if progress.current else None
+            self.after(0, self.update_progress, min(0.9, fraction), message)
+        return report_progress
+
+    def clean_from_index(self, index, categories=None, stop_event=None):
+        """Deletes what a dry-run scan found, without walking the folders again."""
+        if not index.complete:
+            self.log_status("❌ The scan was stopped before it finished; nothing was deleted.")
+            return
+        result = CleanupEngine(progress=self.cleanup_progress_reporter("Deleting"), stop_event=stop_event).clean(index, categories)
+        deleted_count = result.files_deleted + result.dirs_deleted
+        total_size = result.bytes_freed
+
+        self.task_counters.add("items_cleaned", deleted_count)
+        self.task_counters.add("bytes_reclaimed", total_size)
         self.log_status(f"Cleaned {deleted_count} items. Total size: {total_size / (1024*1024):.2f} MB.")
 
+    def clean_temp_files(self, incremental=False, stop_event=None):
+        """
+        Deletes temporary files from common locations; `incremental` skips
+        unchanged folders. Setting `stop_event` ends the scan or the deletes early.
+        """
+        targets = self.cleanup_targets()
+        temp_targets = {category: targets[category] for category in ("User temp", "Windows temp")}
+        state = DirectoryState.load(CLEANUP_STATE_FILE) if incremental else None
+        index = scan_reclaimable(temp_targets, rules=self.cleanup_rules(), progress=self.cleanup_progress_reporter("Scanning"),
+                                 stop_event=stop_event, state=state)
+        self.clean_from_index(index, stop_event=stop_event)
+        if state is not None and index.complete:
+            state.save()
+
+    def scan_reclaimable_space(self):
+        """Dry-run scan of every cleanup category; shows the breakdown before anything is deleted."""
+        index = scan_reclaimable(self.cleanup_targets(), rules=self.cleanup_rules(), progress=self.cleanup_progress_reporter("Scanning"))
+        self.log_status(f"Found {index.total_bytes() / (1024*1024):.1f} MB reclaimable in {len(index)} files.")
+        self.after(0, self.show_cleanup_preview, index)
+
+    def show_cleanup_preview(self, index):
+        """Shows reclaimable bytes by category, age and folder, and cleans the chosen categories."""
+        preview = ctk.CTkToplevel(self)
+        preview.title("Reclaimable Space")
+        preview.geometry("750x600")
+
+        ctk.CTkLabel(preview, text=f"Reclaimable: {index.total_bytes() / (1024*1024):.1f} MB", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
+
+        details = ctk.CTkTextbox(preview, height=300)
+        details.pack(fill="both", expand=True, padx=20, pady=5)
+        details.insert("1.0", "\n".join(index.summary_lines(top=10)))
+        details.configure(state="disabled")
+
+        choices = {}
+        choice_frame = ctk.CTkFrame(preview, fg_color="transparent")
+        choice_frame.pack(fill="x", padx=20, pady=5)
+        for name in index.categories:
+            files, bytes_ = index.category_totals[name]
+            box = ctk.CTkCheckBox(choice_frame, text=f"{name} ({bytes_ / (1024*1024):.1f} MB)")
+            box.pack(anchor="w", pady=2)
+            if name in ("User temp", "Windows temp"):
+                box.select()
+            choices[name] = box
+
+        def clean_selected():
+            selected = [name for name, box in choices.items() if box.get() == 1]
+            preview.destroy()
+            if selected:
+                self.run_task(lambda: self.clean_from_index(index, selected), f"Cleaning {', '.join(selected)}...")
+
+        ctk.CTkButton(preview, text="🧹 Clean Selected", command=clean_selected).pack(pady=10)
+
+    def find_duplicate_files(self):
+        """Asks for a folder and searches it for duplicate files."""
+        folder = filedialog.askdirectory(title="Folder to search for duplicates")
+        if folder:
+            self.run_task(lambda: self.scan_duplicates(folder), f"Searching {folder} for duplicates...")
+
+    def scan_duplicates(self, folder):
+        """Runs the staged duplicate search and shows the groups found."""
+        def report_progress(progress):
+            stage = DUPLICATE_STAGES.index(progress.stage)
+            fraction = (stage + (progress.done / progress.total if progress.total else 0.5)) / len(DUPLICATE_STAGES)
+            self.after(0, self.update_progress, min(0.9, fraction), f"{progress.stage}: {os.path.basename(progress.current)}")
+
+        result = DuplicateFinder(progress=report_progress).find([folder])
+        self.log_status(f"Found {len(result.groups)} duplicate groups, {reclaimable_bytes(result.groups) / (1024*1024):.1f} MB reclaimable.")
+        if result.groups:
+            self.after(0, self.show_duplicates_preview, result)
+
+    def show_duplicates_preview(self, result):
+        """Lists duplicate groups and deletes the extra copies using the chosen keep rule."""
+        preview = ctk.CTkToplevel(self)
+        preview.title("Duplicate Files")
+        preview.geometry("800x650")
+
+        ctk.CTkLabel(preview, text=f"Reclaimable: {reclaimable_bytes(result.groups) / (1024*1024):.1f} MB", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
+
+        details = ctk.CTkTextbox(preview, height=350)
+        details.pack(fill="both", expand=True, padx=20, pady=5)
+        details.insert("1.0", "\n".join(summary_lines(result, top=100)))
+        details.configure(state="disabled")
+
+        options_frame = ctk.CTkFrame(preview, fg_color="transparent")
+        options_frame.pack(fill="x", padx=20, pady=5)
+        keep_menu = ctk.CTkOptionMenu(options_frame, values=["Keep newest", "Keep oldest"])
+        keep_menu.pack(side="left", padx=5)
+        keep_in_entry = ctk.CTkEntry(options_frame, placeholder_text="Prefer copies in folder (optional)", width=350)
+        keep_in_entry.pack(side="left", padx=5, fill="x", expand=True)
+
+        def delete_duplicates():
+            keep = "newest" if keep_menu.get() == "Keep newest" else "oldest"
+            removals = plan_removals(result.groups, keep=keep, keep_in=keep_in_entry.get().strip() or None)
+            total = sum(removal.size for removal in removals)
+            if not messagebox.askyesno("Delete Duplicates", f"Delete {len(removals)} duplicate files ({total / (1024*1024):.1f} MB)?", parent=preview):
+                return
+            preview.destroy()
+            self.run_task(lambda: self.delete_duplicates(removals), "Deleting duplicate files...")
+
+        ctk.CTkButton(preview, text="🗑️ Delete Duplicates", command=delete_duplicates).pack(pady=10)
+
+    def delete_duplicates(self, removals):
+        """Deletes the planned duplicate copies."""
+        deleted, freed, errors = remove_duplicates(removals)
+        self.task_counters.add("items_cleaned", deleted)
+        self.task_counters.add("bytes_reclaimed", freed)
+        self.log_status(f"Deleted {deleted} duplicates, freed {freed / (1024*1024):.2f} MB ({errors} skipped).")
+
     def create_restore_point(self):
-        """Creates a system restore point."""
+        """Creates a system restore point; raises if it could not, so plan steps that depend on it are skipped."""
+        if not self.is_admin:
+            messagebox.showerror("Permission Denied", "This action requires administrator privileges.")
+            raise PermissionError("Creating a restore point requires administrator privileges")
         self.log_status("Creating a system restore point...")
         self.update_progress(0.5, "Executing PowerShell command...")
         
-        # Enable restore if not already enabled
-        self._run_command('powershell -NoProfile Enable-ComputerRestore -Drive "C:\\"', "Enabling System Restore...")
-        
-        # Create checkpoint
-        success = self._run_command('powershell "Checkpoint-Computer -Description \'RBoost PRO Tweaks\'"', "Creating restore point...")
-        
-        if success:
+        try:
+            # Enable restore if not already enabled, then create the checkpoint
+            self.restore_points.create("RBoost PRO Tweaks")
             self.log_status("✅ Restore point created successfully.")
-        else:
+        except ShellError as e:
+            logging.error(f"Failed to create restore point: {e}")
             self.log_status("❌ Failed to create restore point. Check if System Protection is enabled.")
+            raise
 
     def open_restore_point_manager(self):
         """Opens a new window to list and manage restore points."""
@@ -972,13 +1337,13 @@ class RBoostApp(ctk.CTk):
             # UI elements
             ctk.CTkLabel(self.restore_point_manager_window, text="Available Restore Points:", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
             
-            self.restore_point_listbox = tk.Listbox(self.restore_point_manager_window, selectmode=tk.SINGLE, bg="#2b2b2b", fg="white", selectbackground="#4CAF50", height=15)
+            self.restore_point_listbox = tk.Listbox(self.restore_point_manager_window, selectmode=tk.SINGLE, bg="#2b2b2b", fg="white", selectbackground="#4CAF50", height=15, font=("Consolas", 11))
             self.restore_point_listbox.pack(fill="x", padx=20, pady=5)
             
             remove_frame = ctk.CTkFrame(self.restore_point_manager_window, fg_color="transparent")
             remove_frame.pack(pady=10)
             
-            ctk.CTkButton(remove_frame, text="Refresh List", command=self.list_restore_points).pack(side="left", padx=10)
+            ctk.CTkButton(remove_frame, text="Refresh List", command=lambda: self.list_restore_points(refresh=True)).pack(side="left", padx=10)
             ctk.CTkButton(remove_frame, text="Remove Selected Restore Point", command=self.remove_selected_restore_point).pack(side="left", padx=10)
             
             # Load the list on opening
@@ -986,71 +1351,88 @@ class RBoostApp(ctk.CTk):
         else:
             self.restore_point_manager_window.focus()
 
-    def list_restore_points(self):
-        """Lists available restore points in the manager window."""
+    def list_restore_points(self, refresh=False):
+        """Fills the manager window from the restore point cache, querying Windows in the background if needed."""
+        cached = None if refresh else self.restore_points.cached
+        if cached is not None:
+            self.show_restore_points(cached)
+            return
+        self.restore_point_records = []
         self.restore_point_listbox.delete(0, tk.END)
+        self.restore_point_listbox.insert(tk.END, "Loading restore points...")
         self.log_status("Listing restore points...")
-        try:
-            # Use PowerShell to get the list of restore points
-            process = subprocess.run(['powershell', '-Command', 'Get-ComputerRestorePoint | Select-Object SequenceNumber, CreationTime, Description, EventType, RestorePointType'], 
-                                    capture_output=True, text=True, check=True)
-            output = process.stdout
-            
-            # Parse the output
-            lines = output.strip().split('\n')
-            if len(lines) > 2: # Check for header and divider
-                self.restore_point_listbox.insert(tk.END, lines[0].strip()) # Header
-                self.restore_point_listbox.insert(tk.END, lines[1].strip()) # Divider
-                for line in lines[2:]:
-                    if line.strip():
-                        self.restore_point_listbox.insert(tk.END, line.strip())
-            
-            self.log_status("✅ Restore points listed successfully.")
-        except Exception as e:
-            self.log_status(f"❌ Failed to list restore points: {e}")
-            
+
+        def fetch():
+            try:
+                points = self.restore_points.list(refresh=refresh)
+                self.after(0, self.show_restore_points, points)
+                self.after(0, self.log_status, "✅ Restore points listed successfully.")
+            except ShellError as e:
+                logging.error(f"Failed to list restore points: {e}")
+                self.after(0, self.log_status, f"❌ Failed to list restore points: {e}")
+
+        threading.Thread(target=fetch, daemon=True).start()
+
+    def show_restore_points(self, points):
+        """Shows RestorePoint records in the manager window, if it is still open."""
+        if self.restore_point_manager_window is None or not self.restore_point_manager_window.winfo_exists():
+            return
+        self.restore_point_records = list(points)
+        self.restore_point_listbox.delete(0, tk.END)
+        for point in self.restore_point_records:
+            self.restore_point_listbox.insert(tk.END, describe_restore_point(point))
+        if not self.restore_point_records:
+            self.restore_point_listbox.insert(tk.END, "No restore points found.")
+
     def remove_selected_restore_point(self):
         """Removes the selected restore point."""
         selection_indices = self.restore_point_listbox.curselection()
-        if not selection_indices:
+        if not selection_indices or selection_indices[0] >= len(self.restore_point_records):
             messagebox.showwarning("No Selection", "Please select a restore point to remove.")
             return
-            
-        selected_index = selection_indices[0]
-        selected_line = self.restore_point_listbox.get(selected_index)
-        
-        # Extract the sequence number from the line (first column)
-        try:
-            sequence_number = int(selected_line.split()[0])
-        except (ValueError, IndexError):
-            messagebox.showerror("Error", "Could not parse restore point sequence number.")
+        if not self.is_admin:
+            messagebox.showerror("Permission Denied", "This action requires administrator privileges.")
             return
 
+        point = self.restore_point_records[selection_indices[0]]
+        sequence_number = point.sequence
         if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove restore point with Sequence Number {sequence_number}? This action is permanent."):
             self.log_status(f"Removing restore point {sequence_number}...")
-            # Use PowerShell to remove the restore point
-            if self._run_command(f'powershell -Command "Remove-ComputerRestorePoint -RestorePoint {sequence_number}"', f"Removing restore point {sequence_number}..."):
-                self.log_status("✅ Restore point removed successfully.")
-                self.list_restore_points() # Refresh the list
-            else:
-                self.log_status("❌ Failed to remove restore point.")
+
+            def remove():
+                try:
+                    self.restore_points.remove(sequence_number)
+                    self.after(0, self.log_status, "✅ Restore point removed successfully.")
+                except ShellError as e:
+                    logging.error(f"Failed to remove restore point {sequence_number}: {e}")
+                    self.after(0, self.log_status, f"❌ Failed to remove restore point: {e}")
+                self.after(0, self.list_restore_points) # Refresh the list
+
+            threading.Thread(target=remove, daemon=True).start()
+
+    def apply_tweak_batch(self, label, changes, skip_missing=False, check=False):
+        """Applies a journaled batch of changes as one unit; it can be undone from Undo Tweaks. `check` raises if it failed."""
+        result = self.tweak_journal.apply(label, changes, skip_missing=skip_missing)
+        for change, error in result.failed:
+            self.log_status(f"❌ {change.kind} {change.target}: {error}")
+        if result.failed:
+            self.log_status(f"↩️ '{label}' was undone because a change failed.")
+            if check:
+                raise OSError(f"'{label}' failed: {result.failed[0][1]}")
+        else:
+            self.log_status(f"{label}: {len(result.changed)} changed, {len(result.unchanged)} already set.")
+        return result
+
+    def apply_registry_tweaks(self, tweaks, message, label=None, check=False):
+        """Applies registry tweak rows in-process as one journaled batch, writing only values that differ."""
+        self.log_status(message)
+        return self.apply_tweak_batch(label or message.rstrip("."), [registry_change(row) for row in tweaks], check=check)
 
     def apply_core_registry_tweaks(self):
         self.log_status("Applying deep system tweaks...")
-        self.update_progress(0.1, "Applying UI tweaks...")
-        self.enable_full_wallpaper_quality()
-        self.show_file_extensions()
-        self.enable_dark_mode()
-
-        self.update_progress(0.4, "Applying network tweaks...")
-        self.disable_network_throttling()
-        self.set_dns_priority()
-        
-        self.update_progress(0.7, "Applying performance tweaks...")
-        self.disable_telemetry()
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Control\\Session Manager\\Memory Management" /v "LargeSystemCache" /t REG_DWORD /d "1" /f', "Setting LargeSystemCache...")
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Control\\Session Manager\\Memory Management" /v "SecondLevelDataCache" /t REG_DWORD /d "1" /f', "Setting SecondLevelDataCache...")
-        
+        self.update_progress(0.2, "Applying UI, network and performance tweaks...")
+        self.apply_registry_tweaks(core_registry_tweaks(), "Applying registry tweaks...", label="Core registry tweaks", check=True)
+
         self.update_progress(0.9, "Applying power management tweaks...")
         self.reset_power_plans()
         
@@ -1063,13 +1445,30 @@ class RBoostApp(ctk.CTk):
             "SolitaireCollection", "ZuneMusic", "ZuneVideo", "XboxApp", "Microsoft.Windows.Photos"
         ]
         
-        total_apps = len(apps_to_remove)
-        for i, app_name in enumerate(apps_to_remove):
-            progress = (i + 1) / total_apps
-            self.update_progress(progress, f"Uninstalling {app_name}...")
-            cmd = f"powershell -Command \"Get-AppxPackage -allusers *{app_name}* | Remove-AppxPackage\""
-            self._run_command(cmd, f"Removing {app_name}...")
-            time.sleep(1) # Small delay to prevent overload
+        if not self.is_admin:
+            messagebox.showerror("Permission Denied", "This action requires administrator privileges.")
+            raise PermissionError("Removing apps requires administrator privileges")
+
+        def remove_app(app_name):
+            packages = f"Get-AppxPackage -AllUsers -Name {ps_quote('*' + app_name + '*')}"
+            script = f"$p = @({packages}); if ($p.Count -eq 0) {{ 'absent' }} else {{ $p | Remove-AppxPackage; 'removed' }}"
+            try:
+                status = self.shell_pool.run(script, timeout=self.batch_executor.timeout)
+            except (ShellTimeout, ShellExited) as e:
+                raise TransientError(f"{app_name}: {e}") from e  # The host is restarted, so a retry can succeed
+            return ("already", "not installed") if status == "absent" else ("changed", "removed")
+
+        def report_progress(done, total):
+            self.after(0, self.update_progress, done / total, None)
+
+        self.log_status(f"Removing {len(apps_to_remove)} apps, {min(self.batch_executor.workers, self.shell_pool.size)} at a time...")
+        reports = self.batch_executor.run(apps_to_remove, remove_app, progress=report_progress)
+        for report in reports:
+            if report.status == "failed":
+                logging.error(f"Failed to remove {report.item}: {report.detail}")
+                self.log_status(f"❌ {report.item}: {report.detail}")
+        changed, already, failed = summarize_reports(reports)
+        self.log_status(f"Debloat: {changed} removed, {already} not installed, {failed} failed.")
 
     def disable_scheduled_tasks(self):
         """Disables various scheduled tasks."""
@@ -1082,12 +1481,42 @@ class RBoostApp(ctk.CTk):
             "\\Microsoft\\Windows\\Maintenance\\WinSAT"
         ]
         
-        total_tasks = len(tasks_to_disable)
-        for i, task_path in enumerate(tasks_to_disable):
-            progress = (i + 1) / total_tasks
-            self.update_progress(progress, f"Disabling scheduled task: {task_path}...")
-            self._run_command(f'schtasks /change /tn "{task_path}" /Disable', f"Disabling task: {task_path}")
-            time.sleep(0.5)
+        self.update_progress(0.5, f"Disabling {len(tasks_to_disable)} scheduled tasks...")
+        self.apply_tweak_batch("Disable scheduled tasks", [Change("task", task_path, "disabled") for task_path in tasks_to_disable],
+                               skip_missing=True, check=True)
+
+    def open_tweak_history(self):
+        """Lists journaled tweak batches, newest first, each with an Undo button."""
+        window = ctk.CTkToplevel(self)
+        window.title("Tweak History")
+        window.geometry("750x500")
+        ctk.CTkLabel(window, text="Applied Tweak Batches", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
+        scroll_frame = ctk.CTkScrollableFrame(window)
+        scroll_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+
+        def undo(batch):
+            window.destroy()
+            self.run_task(lambda: self.rollback_tweak_batch(batch.batch_id), f"Undoing '{batch.label}'...")
+
+        batches = self.tweak_journal.batches()
+        if not batches:
+            ctk.CTkLabel(scroll_frame, text="No tweak batches recorded yet.").pack(pady=20)
+        for batch in batches:
+            row = ctk.CTkFrame(scroll_frame, fg_color="transparent")
+            row.pack(fill="x", pady=3)
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(batch.started))
+            ctk.CTkLabel(row, text=f"{started}  {batch.label}  ({batch.changes} changes, {batch.status.replace('_', ' ')})", anchor="w").pack(side="left", padx=5, fill="x", expand=True)
+            if batch.status in ("applied", "pending", "partial"):
+                ctk.CTkButton(row, text="Undo", width=70, command=lambda b=batch: undo(b)).pack(side="right", padx=5)
+
+    def rollback_tweak_batch(self, batch_id):
+        """Restores the values a tweak batch replaced."""
+        result = self.tweak_journal.rollback(batch_id)
+        for change in result.conflicts:
+            self.log_status(f"⚠️ Left {change.kind} {change.target} alone: it was changed after the tweak.")
+        for change, error in result.failed:
+            self.log_status(f"❌ Could not restore {change.kind} {change.target}: {error}")
+        self.log_status(f"↩️ Restored {len(result.restored)} settings.")
 
     def launch_control_panel(self):
         """Launches the Control Panel."""
@@ -1111,40 +1540,32 @@ class RBoostApp(ctk.CTk):
     def enable_full_wallpaper_quality(self):
         """Enables full JPEG wallpaper quality."""
         self.update_progress(0.5, "Enabling full wallpaper quality...")
-        self._run_command('reg add "HKCU\\Control Panel\\Desktop" /v "JPEGImportQuality" /t REG_DWORD /d "100" /f', "Setting JPEGImportQuality to 100...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["wallpaper_quality"], "Setting JPEGImportQuality to 100...")
 
     def show_file_extensions(self):
         """Shows file extensions in Windows Explorer."""
         self.update_progress(0.5, "Showing file extensions...")
-        self._run_command('reg add "HKCU\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced" /v "HideFileExt" /t REG_DWORD /d 0 /f', "Updating HideFileExt registry key...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["file_extensions"], "Updating HideFileExt registry key...")
         
     def enable_dark_mode(self):
         """Enables dark mode for apps and system UI."""
         self.update_progress(0.5, "Enabling dark mode...")
-        self._run_command('reg add "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize" /v "AppsUseLightTheme" /t REG_DWORD /d "0" /f', "Setting AppsUseLightTheme to 0...")
-        self._run_command('reg add "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize" /v "SystemUsesLightTheme" /t REG_DWORD /d "0" /f', "Setting SystemUsesLightTheme to 0...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["dark_mode"], "Setting AppsUseLightTheme and SystemUsesLightTheme to 0...")
 
     def disable_network_throttling(self):
         """Disables network throttling index."""
         self.update_progress(0.5, "Disabling network throttling...")
-        self._run_command('reg add "HKLM\\SOFTWARE\\Microsoft\\Windows NT\\CurrentVersion\\Multimedia\\SystemProfile" /v "NetworkThrottlingIndex" /t REG_DWORD /d 4294967295 /f', "Updating NetworkThrottlingIndex...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["network_throttling"], "Updating NetworkThrottlingIndex...")
 
     def set_dns_priority(self):
         """Sets DNS and other service provider priorities."""
         self.update_progress(0.2, "Setting DNS, Local, Hosts, and NetBT priorities...")
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Services\\Tcpip\\ServiceProvider" /v "DnsPriority" /t REG_DWORD /d 6 /f', "Setting DnsPriority...")
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Services\\Tcpip\\ServiceProvider" /v "LocalPriority" /t REG_DWORD /d 4 /f', "Setting LocalPriority...")
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Services\\Tcpip\\ServiceProvider" /v "HostsPriority" /t REG_DWORD /d 5 /f', "Setting HostsPriority...")
-        self._run_command('reg add "HKLM\\SYSTEM\\CurrentControlSet\\Services\\Tcpip\\ServiceProvider" /v "NetbtPriority" /t REG_DWORD /d 7 /f', "Setting NetbtPriority...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["dns_priority"], "Setting service provider priorities...")
         
     def disable_telemetry(self):
         """Disables telemetry and diagnostics."""
         self.update_progress(0.2, "Disabling telemetry and diagnostics...")
-        self._run_command('reg add "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Privacy" /v "TailoredExperiencesWithDiagnosticDataEnabled" /t REG_DWORD /d "0" /f', "Disabling tailored experiences...")
-        self._run_command('reg add "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Diagnostics\\DiagTrack" /v "ShowedToastAtLevel" /t REG_DWORD /d "1" /f', "Updating DiagTrack...")
-        self._run_command('reg add "HKLM\\Software\\Policies\\Microsoft\\Windows\\System" /v "UploadUserActivities" /t REG_DWORD /d "0" /f', "Disabling user activity uploads...")
-        self._run_command('reg add "HKLM\\Software\\Policies\\Microsoft\\Windows\\Windows Error Reporting" /v "DoReport" /t REG_DWORD /d "0" /f', "Disabling error reporting...")
-        self._run_command('reg add "HKLM\\Software\\Microsoft\\Windows\\Windows Error Reporting" /v "Disabled" /t REG_DWORD /d "1" /f', "Disabling Windows Error Reporting...")
+        self.apply_registry_tweaks(TWEAK_GROUPS["telemetry"], "Disabling telemetry, activity uploads and error reporting...")
         
     def reset_power_plans(self):
         """Resets power plans to default schemes."""
@@ -1153,80 +1574,263 @@ class RBoostApp(ctk.CTk):
 
     def deep_service_optimizer(self):
         """Disables a list of unnecessary services."""
-        services_to_disable = ["diagtrack", "dmwappushservice", "DiagTrack", "CDPUserSvc"] # Add more as needed
-        total_services = len(services_to_disable)
-        for i, service_name in enumerate(services_to_disable):
-            self.update_progress((i + 1) / total_services, f"Disabling service: {service_name}...")
-            self._run_command(f'sc config "{service_name}" start=disabled', f"Setting {service_name} to disabled...")
-            self._run_command(f'sc stop "{service_name}"', f"Stopping {service_name}...")
-            time.sleep(0.5)
+        services_to_disable = ["DiagTrack", "dmwappushservice", "CDPUserSvc"] # Add more as needed
+        self.update_progress(0.5, f"Disabling {len(services_to_disable)} services...")
+        self.apply_tweak_batch("Optimize services", [Change("service", name, ("disabled", "stopped")) for name in services_to_disable],
+                               skip_missing=True)
 
     def analyze_disk_usage(self):
-        """Analyzes disk usage and visualizes it."""
-        # This will just show the info. A full graphical analyzer is complex.
-        self.log_status("Analyzing disk usage...")
-        self.update_progress(0.5, "Scanning C:\\ drive...")
-        
-        try:
-            partitions = psutil.disk_partitions(all=False)
-            usage_data = {}
-            for partition in partitions:
-                if 'cdrom' not in partition.opts and partition.fstype:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    usage_data[partition.device] = usage.percent
-                    self.log_status(f"Drive {partition.device}: {usage.percent:.1f}% used.")
-            
-            # Matplotlib Pie Chart
-            labels = list(usage_data.keys())
-            sizes = list(usage_data.values())
-            
-            self.after(0, self.show_disk_pie_chart, labels, sizes)
-            self.log_status("Disk analysis complete.")
-            
-        except Exception as e:
-            self.log_status(f"❌ Failed to analyze disk usage: {e}")
-
-    def show_disk_pie_chart(self, labels, sizes):
-        """Shows a pie chart of disk usage."""
-        # Create a new frame and figure for the pie chart
-        disk_chart_window = ctk.CTkToplevel(self)
-        disk_chart_window.title("Disk Usage Breakdown")
-        disk_chart_window.geometry("600x600")
-        
-        fig = Figure(figsize=(6, 6))
-        ax = fig.add_subplot(111)
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-        ax.axis('equal') # Equal aspect ratio ensures that pie is drawn as a circle.
-        
-        canvas = FigureCanvasTkAgg(fig, master=disk_chart_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
+        """Opens the disk analyzer: a treemap of folder sizes that fills in while the drive is scanned."""
+        if self.disk_analyzer_window is not None and self.disk_analyzer_window.winfo_exists():
+            self.disk_analyzer_window.focus()
+            return
+        window = ctk.CTkToplevel(self)
+        window.title("Disk Usage Analyzer")
+        window.geometry("900x650")
+        self.disk_analyzer_window = window
+
+        drives = [p.mountpoint for p in psutil.disk_partitions(all=False) if 'cdrom' not in p.opts and p.fstype]
+        state = {"tree": None, "node": 0, "thread": None, "stop": threading.Event(), "poll_id": None}
+
+        top_frame = ctk.CTkFrame(window, fg_color="transparent")
+        top_frame.pack(fill="x", padx=10, pady=10)
+        drive_menu = ctk.CTkOptionMenu(top_frame, values=drives or [os.path.abspath(os.sep)])
+        drive_menu.pack(side="left", padx=5)
+        up_button = ctk.CTkButton(top_frame, text="⬆ Up", width=60)
+        up_button.pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="📄 Largest Files", width=110, command=lambda: self.show_largest_files(drive_menu.get())).pack(side="right", padx=5)
+        ctk.CTkButton(top_frame, text="📈 What Grew", width=110, command=lambda: self.show_disk_changes(drive_menu.get())).pack(side="right", padx=5)
+        path_label = ctk.CTkLabel(top_frame, text="", anchor="w")
+        path_label.pack(side="left", padx=10, fill="x", expand=True)
+
+        def open_node(index):
+            state["node"] = index
+            show_node()
+
+        def go_up():
+            tree = state["tree"]
+            if tree is not None and state["node"] > 0:
+                open_node(tree.parents[state["node"]])
+
+        treemap = TreemapChart(window, on_open=open_node, on_back=go_up)
+        treemap.pack(fill="both", expand=True, padx=10, pady=5)
+        status_label = ctk.CTkLabel(window, text="", anchor="w")
+        status_label.pack(fill="x", padx=10, pady=(0, 10))
+        up_button.configure(command=go_up)
+
+        def show_node():
+            tree = state["tree"]
+            if tree is None or not window.winfo_exists():
+                return
+            node = tree.node(state["node"])
+            sizes = tree.totals()[0]
+            entries = [(child, f"{tree.names[child]}\n{format_bytes(sizes[child])}", int(sizes[child]))
+                       for child in tree.children(node.index)[:80]]
+            own_size = tree.own_sizes[node.index]
+            if own_size:
+                entries.append((None, f"(files)\n{format_bytes(own_size)}", own_size))
+            entries.sort(key=lambda entry: entry[2], reverse=True)
+            treemap.set_items(entries)
+            path_label.configure(text=f"{node.path}  —  {format_bytes(node.size)} in {node.files} files")
+            scanning = state["thread"] is not None and state["thread"].is_alive()
+            status_label.configure(text=f"{'Scanning' if scanning else 'Scanned'} {len(tree)} folders"
+                                        f"{'...' if scanning else ''} ({tree.errors} unreadable). Click a block to open it, right-click to go up.")
+
+        def poll():
+            state["poll_id"] = None
+            show_node()
+            if state["thread"] is not None and state["thread"].is_alive() and window.winfo_exists():
+                state["poll_id"] = window.after(500, poll)
+
+        def cancel_poll():
+            # One poll chain per window; a new scan replaces the old chain instead of adding to it
+            if state["poll_id"] is not None:
+                window.after_cancel(state["poll_id"])
+                state["poll_id"] = None
+
+        def start_scan(root):
+            cancel_poll()
+            state["stop"].set()
+            state["stop"] = threading.Event()
+            state["tree"] = DiskTree(root)
+            state["node"] = 0
+            scanner = DiskScanner(stop_event=state["stop"])
+
+            def scan_and_save(tree):
+                scanner.scan(root, tree)
+                if tree.complete:
+                    save_snapshot(tree)
+                    prune_snapshots()
+
+            state["thread"] = threading.Thread(target=scan_and_save, args=(state["tree"],), daemon=True)
+            state["thread"].start()
+            self.log_status(f"Scanning {root}...")
+            poll()
+
+        def close():
+            cancel_poll()
+            state["stop"].set()
+            window.destroy()
+
+        drive_menu.configure(command=start_scan)
+        window.protocol("WM_DELETE_WINDOW", close)
+        start_scan(drive_menu.get())
+
+    def show_largest_files(self, root):
+        """Finds the largest files on a drive, updating the list while the scan runs."""
+        window = ctk.CTkToplevel(self)
+        window.title(f"Largest Files on {root}")
+        window.geometry("900x600")
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(1, weight=1)
+        state = {"results": None, "rows": [], "version": -1, "thread": None, "stop": threading.Event(), "poll_id": None}
+
+        filter_frame = ctk.CTkFrame(window, fg_color="transparent")
+        filter_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        extensions_entry = ctk.CTkEntry(filter_frame, placeholder_text="Extensions, e.g. iso vhdx dmp", width=200)
+        extensions_entry.pack(side="left", padx=5)
+        age_entry = ctk.CTkEntry(filter_frame, placeholder_text="Older than (days)", width=130)
+        age_entry.pack(side="left", padx=5)
+        prefix_entry = ctk.CTkEntry(filter_frame, placeholder_text="Path prefix", width=220)
+        prefix_entry.insert(0, root)
+        prefix_entry.pack(side="left", padx=5)
+        count_menu = ctk.CTkOptionMenu(filter_frame, values=["100", "500", "1000"], width=80)
+        count_menu.pack(side="left", padx=5)
+
+        def row_text(index):
+            large = state["rows"][index]
+            return (format_bytes(large.size), time.strftime("%Y-%m-%d", time.localtime(large.mtime)), large.path)
+
+        def show_in_explorer(index, event):
+            subprocess.Popen(["explorer", "/select,", state["rows"][index].path])
+
+        file_list = VirtualList(window, columns=[("Size", 90, "e"), ("Modified", 100, "w"), ("Path", 700, "w")],
+                                row_text=row_text, on_context=show_in_explorer)
+        file_list.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        status_label = ctk.CTkLabel(window, text="", anchor="w")
+        status_label.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
+
+        def poll():
+            state["poll_id"] = None
+            results = state["results"]
+            if results is None or not window.winfo_exists():
+                return
+            if results.version != state["version"]:
+                state["version"] = results.version
+                state["rows"] = results.snapshot()
+                file_list.set_keys(list(range(len(state["rows"]))))
+            scanning = state["thread"].is_alive()
+            status_label.configure(text=f"{'Scanning' if scanning else 'Scanned'} {results.files_seen} files"
+                                        f"{'...' if scanning else '.'} Right-click a file to show it in Explorer.")
+            if scanning:
+                state["poll_id"] = window.after(500, poll)
+
+        def cancel_poll():
+            if state["poll_id"] is not None:
+                window.after_cancel(state["poll_id"])
+                state["poll_id"] = None
+
+        def start_scan():
+            try:
+                min_age = float(age_entry.get() or 0)
+            except ValueError:
+                messagebox.showerror("Invalid Age", "Enter the minimum age as a number of days.", parent=window)
+                return
+            cancel_poll()
+            state["stop"].set()
+            state["stop"] = threading.Event()
+            file_filter = LargeFileFilter(extensions=extensions_entry.get().replace(",", " ").split(),
+                                          min_age_days=min_age, path_prefix=prefix_entry.get().strip() or None)
+            state["results"] = LargestFiles(int(count_menu.get()))
+            state["version"] = -1
+            state["thread"] = threading.Thread(target=find_largest_files, daemon=True,
+                                               kwargs={"root": root, "file_filter": file_filter, "stop_event": state["stop"],
+                                                       "results": state["results"]})
+            state["thread"].start()
+            poll()
+
+        def close():
+            cancel_poll()
+            state["stop"].set()
+            window.destroy()
+
+        ctk.CTkButton(filter_frame, text="🔍 Scan", width=80, command=start_scan).pack(side="left", padx=5)
+        window.protocol("WM_DELETE_WINDOW", close)
+        start_scan()
+
+    def show_disk_changes(self, root):
+        """Shows which folders grew or shrank between two saved scans of a drive."""
+        snapshots = list_snapshots(root=root)
+        if len(snapshots) < 2:
+            messagebox.showinfo("What Grew", "Scan this drive at least twice to compare snapshots.")
+            return
+        window = ctk.CTkToplevel(self)
+        window.title(f"What Grew on {root}")
+        window.geometry("800x600")
+
+        latest = snapshots[-1]
+        labels = {time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshot.taken_at)): snapshot for snapshot in snapshots[:-1]}
+        top_frame = ctk.CTkFrame(window, fg_color="transparent")
+        top_frame.pack(fill="x", padx=20, pady=10)
+        ctk.CTkLabel(top_frame, text=f"Latest scan: {time.strftime('%Y-%m-%d %H:%M', time.localtime(latest.taken_at))}   Compare with:").pack(side="left")
+        baseline_menu = ctk.CTkOptionMenu(top_frame, values=list(reversed(list(labels))))
+        baseline_menu.pack(side="left", padx=10)
+
+        details = ctk.CTkTextbox(window)
+        details.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+
+        def show_text(text):
+            if window.winfo_exists():
+                details.configure(state="normal")
+                details.delete("1.0", "end")
+                details.insert("1.0", text)
+                details.configure(state="disabled")
+
+        def compare(label):
+            show_text("Comparing...")
+            baseline = labels[label]
+
+            def worker():
+                growing, shrinking = diff_snapshots(baseline, latest)
+                baseline.release()
+                lines = [f"Total: {format_bytes(baseline.meta['bytes'])} -> {format_bytes(latest.meta['bytes'])}", "", "Top growing folders:"]
+                lines += [f"  +{format_bytes(change.delta):>10}  {change.path}" for change in growing] or ["  (none)"]
+                lines += ["", "Top shrinking folders:"]
+                lines += [f"  -{format_bytes(-change.delta):>10}  {change.path}" for change in shrinking] or ["  (none)"]
+                self.after(0, show_text, "\n".join(lines))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        baseline_menu.configure(command=compare)
+        compare(baseline_menu.get())
+
     def clear_browser_cache(self):
-        """Clears cache from common browsers."""
-        browsers = {
-            "Chrome": os.path.join(os.environ['LOCALAPPDATA'], 'Google', 'Chrome', 'User Data', 'Default', 'Cache'),
-            "Edge": os.path.join(os.environ['LOCALAPPDATA'], 'Microsoft', 'Edge', 'User Data', 'Default', 'Cache'),
-            "Firefox": os.path.join(os.environ['APPDATA'], 'Mozilla', 'Firefox', 'Profiles') # Requires more complex logic
-        }
-        
-        for browser, path in browsers.items():
-            self.update_progress(0.1, f"Clearing {browser} cache...")
-            if os.path.exists(path):
-                try:
-                    if browser == "Firefox":
-                        # Find profile folders and clear cache within each
-                        for profile in os.listdir(path):
-                            cache_path = os.path.join(path, profile, 'cache2', 'entries')
-                            if os.path.exists(cache_path):
-                                shutil.rmtree(cache_path, ignore_errors=True)
-                    else:
-                        shutil.rmtree(path, ignore_errors=True)
-                    self.log_status(f"✅ {browser} cache cleared.")
-                except Exception as e:
-                    self.log_status(f"❌ Failed to clear {browser} cache: {e}")
-            else:
-                self.log_status(f"ℹ️ {browser} cache path not found.")
+        """Clears (or evicts cold entries from) every browser profile's caches, skipping browsers that are open."""
+        stores = discover_cache_stores()
+        if not stores:
+            self.log_status("ℹ️ No browser caches found.")
+            return
+        self.update_progress(0.3, f"Clearing {len(stores)} browser cache folders...")
+        policy = wipe_stores
+        if self.settings.get("browser_cache_mode") == "evict":
+            # A zero age or budget turns that limit off
+            max_age = self.settings.get("browser_cache_max_age_days", 14) or None
+            budget_mb = self.settings.get("browser_cache_budget_mb", 500) or None
+            policy = CacheEviction(max_age_days=max_age, budget_bytes=budget_mb * 1024 * 1024 if budget_mb else None)
+        total_freed = total_files = 0
+        for report in clean_browser_caches(stores, policy=policy):
+            if report.running:
+                self.log_status(f"⚠️ {report.browser} is running; close it to clear its cache.")
+                continue
+            freed = sum(store.bytes_freed for store in report.stores)
+            total_freed += freed
+            total_files += sum(store.files_deleted for store in report.stores)
+            for store in report.stores:
+                self.log_status(f"  {report.browser} [{store.store.profile}] {store.store.store}: {format_bytes(store.bytes_freed)}")
+            self.log_status(f"✅ {report.browser} cache cleared ({format_bytes(freed)}).")
+        self.task_counters.add("items_cleaned", total_files)
+        self.task_counters.add("bytes_reclaimed", total_freed)
+        self.log_status(f"Browser caches: freed {format_bytes(total_freed)}.")
 
     def flush_standby_ram(self):
         """Flush standby RAM by trimming working sets of all accessible processes."""
@@ -1280,19 +1884,51 @@ class RBoostApp(ctk.CTk):
             self.log_status("⚠️ Tip: Run RBoost as Administrator for better results.")
 
 
+    def describe_terminate_report(self, label, report):
+        """Formats a TerminateReport for the status box."""
+        return (f"✅ {label}: {report.terminated} exited, {report.killed} force-killed, "
+                f"{report.failed} failed. Reclaimed {report.reclaimed_bytes / (1024*1024):.1f} MB.")
+
     def kill_background_apps(self):
-        """Terminates known idle/bloat apps."""
-        bloat_processes = ["spotify.exe", "discord.exe", "epicgameslauncher.exe", "steam.exe"]
-        killed_count = 0
-        for proc in psutil.process_iter(['name']):
-            if proc.name() in bloat_processes:
-                try:
-                    proc.terminate()
-                    killed_count += 1
-                    self.log_status(f"Killed process: {proc.name()}")
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-        self.log_status(f"Killed {killed_count} known background processes.")
+        """Terminates processes matching the user's bloat rules; their child processes are left running."""
+        rules = BloatRules(self.settings.get("bloat_rules", DEFAULT_BLOAT_RULES))
+        pids = rules.matching_pids()
+        if not pids:
+            self.log_status("No processes matched the bloat rules.")
+            return
+        self.update_progress(0.3, f"Ending {len(pids)} matching processes...")
+        procs = []
+        for pid in pids:
+            try:
+                procs.append(psutil.Process(pid))
+            except psutil.NoSuchProcess:
+                continue
+        report = terminate_processes(procs)
+        self.log_status(self.describe_terminate_report("Kill background bloat", report))
+
+    def open_bloat_rules_editor(self):
+        """Opens an editor for the process name patterns used by Kill Background Bloat."""
+        editor = ctk.CTkToplevel(self)
+        editor.title("Bloat Rules")
+        editor.geometry("500x450")
+        editor.grab_set()
+
+        ctk.CTkLabel(editor, text="One process name per line (wildcards like *updater*.exe allowed):").pack(padx=20, pady=(20, 5), anchor="w")
+        rules_box = ctk.CTkTextbox(editor)
+        rules_box.pack(fill="both", expand=True, padx=20, pady=5)
+        rules_box.insert("1.0", "\n".join(self.settings.get("bloat_rules", DEFAULT_BLOAT_RULES)))
+
+        def save_rules():
+            patterns = [line.strip() for line in rules_box.get("1.0", "end").splitlines() if line.strip()]
+            self.settings["bloat_rules"] = patterns
+            self.save_settings()
+            self.log_status(f"Saved {len(BloatRules(patterns).patterns)} bloat rules.")
+            editor.destroy()
+
+        buttons = ctk.CTkFrame(editor, fg_color="transparent")
+        buttons.pack(pady=10)
+        ctk.CTkButton(buttons, text="Save", command=save_rules).pack(side="left", padx=10)
+        ctk.CTkButton(buttons, text="Restore Defaults", command=lambda: (rules_box.delete("1.0", "end"), rules_box.insert("1.0", "\n".join(DEFAULT_BLOAT_RULES)))).pack(side="left", padx=10)
 
     # --- Speed Test & Console Functions ---
     def run_speed_test(self):
@@ -1378,7 +2014,7 @@ class RBoostApp(ctk.CTk):
         # This is a bit risky to do at runtime, but fulfills the user request.
         # It's better to ensure dependencies are bundled with PyInstaller.
         self.log_status("Checking for missing dependencies...")
-        required_packages = ["customtkinter", "psutil", "matplotlib", "speedtest-cli"]
+        required_packages = ["customtkinter", "psutil", "numpy", "matplotlib", "speedtest-cli"]
         
         for package in required_packages:
             try:
@@ -1399,25 +2035,28 @@ class RBoostApp(ctk.CTk):
         while not self.cleanup_stop_event.is_set():
             # Run cleanup every 12 hours (43200 seconds)
             self.log_status("Running silent background cleanup...")
-            self.clean_temp_files()
+            started = time.time()
+            self.clean_temp_files(incremental=True, stop_event=self.cleanup_stop_event)
+            logging.info(f"Silent cleanup finished in {time.time() - started:.1f}s.")
             # Wait for 12 hours or until the stop event is set
             self.cleanup_stop_event.wait(43200)
             
     def start_silent_cleanup(self):
         """Starts the silent cleanup thread."""
+        self.cleanup_stop_event.clear()  # A thread still winding down from a stop carries on instead
         if self.cleanup_thread is None or not self.cleanup_thread.is_alive():
-            self.cleanup_stop_event.clear()
             self.cleanup_thread = threading.Thread(target=self.silent_cleanup_loop, daemon=True)
             self.cleanup_thread.start()
             
     def stop_silent_cleanup(self):
-        """Stops the silent cleanup thread."""
+        """Stops the silent cleanup thread; a run in progress ends at its next file."""
         if self.cleanup_thread and self.cleanup_thread.is_alive():
             self.cleanup_stop_event.set()
-            self.cleanup_thread.join()
+            self.cleanup_thread.join(timeout=1)  # Never hold the Tk thread for a whole scan
             
 # --- Main Entry Point ---
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Duplicate hashing uses a process pool
     # Check if a log file from a previous run exists and delete it
     if os.path.exists(log_filename):
         try:
@@ -0,0 +1,262 @@
+"""
+Persistent metrics history for RBoost PRO.
+
+The sampler's series are appended to daily segment files of fixed-width
+binary records (float64 timestamp + float32 values). Writes are batched in
+memory and flushed in one write() call, and range queries memory-map the
+segments so only the requested slice is ever read from disk.
+"""
+import glob
+import json
+import logging
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+HISTORY_DIR = "rboost_history"
+SEGMENT_SUFFIX = ".rbh"
+_MAGIC = b"RBHS"
+_VERSION = 1
+_PREAMBLE = struct.Struct("<4sHII")  # magic, version, resolution, header size
+
+
+def _day_key(timestamp):
+    """Returns the local YYYYMMDD day a timestamp belongs to."""
+    return time.strftime("%Y%m%d", time.localtime(timestamp))
+
+
+class Segment:
+    """One on-disk segment file: a small header followed by fixed-width records."""
+
+    def __init__(self, path, series, resolution, header_size):
+        self.path = path
+        self.series = tuple(series)
+        self.resolution = resolution
+        self.header_size = header_size
+        self.dtype = np.dtype([("t", "<f8"), ("v", "<f4", (len(self.series),))])
+
+    @classmethod
+    def create(cls, path, series, resolution=1):
+        """Writes a fresh segment header and returns the Segment."""
+        names = json.dumps(list(series)).encode("utf-8")
+        header_size = -(-(_PREAMBLE.size + len(names)) // 64) * 64  # Round up to 64 bytes
+        with open(path, "wb") as f:
+            f.write(_PREAMBLE.pack(_MAGIC, _VERSION, resolution, header_size))
+            f.write(names.ljust(header_size - _PREAMBLE.size, b" "))
+        return cls(path, series, resolution, header_size)
+
+    @classmethod
+    def open(cls, path):
+        """Reads a segment header; raises ValueError if it is not a history segment."""
+        with open(path, "rb") as f:
+            magic, version, resolution, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Not an RBoost history segment: {path}")
+            series = json.loads(f.read(header_size - _PREAMBLE.size).decode("utf-8"))
+        return cls(path, series, resolution, header_size)
+
+    def record_count(self):
+        """Number of complete records on disk; a torn trailing record is ignored."""
+        return max(os.path.getsize(self.path) - self.header_size, 0) // self.dtype.itemsize
+
+    def records(self):
+        """Returns a read-only memmap over the records, or None if empty."""
+        count = self.record_count()
+        if not count:
+            return None
+        return np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.header_size, shape=(count,))
+
+
+class HistoryStore:
+    """
+    Daily-segmented, memory-mapped history for a fixed list of series.
+    append() only buffers; records reach disk every `batch_size` samples
+    or `flush_every` seconds, whichever comes first.
+    """
+
+    def __init__(self, directory=HISTORY_DIR, series=("cpu", "ram", "net"), batch_size=120,
+                 flush_every=60.0, retention_days=30, compact_after_days=2, compact_resolution=60):
+        self.directory = directory
+        self.series = tuple(series)
+        self.batch_size = batch_size
+        self.flush_every = flush_every
+        self.retention_days = retention_days
+        self.compact_after_days = compact_after_days
+        self.compact_resolution = compact_resolution
+
+        self.lock = threading.Lock()
+        self.dtype = np.dtype([("t", "<f8"), ("v", "<f4", (len(self.series),))])
+        self._batch = np.zeros(batch_size, dtype=self.dtype)
+        self._pending = 0
+        self._last_flush = time.time()
+        self._segment = None
+        self._day = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    # --- Writing ---
+    def append(self, timestamp, row):
+        """Buffers one record (values in `self.series` order)."""
+        with self.lock:
+            if self._day is not None and _day_key(timestamp) != self._day:
+                self._flush_locked()  # Keep each batch inside a single day's segment
+            self._batch[self._pending] = (timestamp, row)
+            self._pending += 1
+            if self._day is None:
+                self._day = _day_key(timestamp)
+            if self._pending >= self.batch_size or timestamp - self._last_flush >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes any buffered records to disk."""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.time()
+        if not self._pending:
+            return
+        day = _day_key(self._batch[0]["t"])
+        segment = self._writable_segment(day)
+        try:
+            with open(segment.path, "ab") as f:
+                f.write(self._batch[:self._pending].tobytes())
+        except OSError as e:
+            logging.error(f"Failed to write history batch to {segment.path}: {e}")
+        self._pending = 0
+        self._day = None
+
+    def _writable_segment(self, day):
+        """Returns the open segment for `day`, creating one if the series changed."""
+        if self._segment is not None and os.path.basename(self._segment.path).startswith(day):
+            return self._segment
+        for n in range(1, 100):
+            name = day if n == 1 else f"{day}_{n}"
+            path = os.path.join(self.directory, name + SEGMENT_SUFFIX)
+            if not os.path.exists(path):
+                self._segment = Segment.create(path, self.series)
+                logging.info(f"Started history segment {path}.")
+                return self._segment
+            try:
+                segment = Segment.open(path)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping unreadable history segment {path}: {e}")
+                continue
+            if segment.series == self.series and segment.resolution == 1:
+                self._segment = segment
+                return segment
+        raise OSError(f"Too many history segments for {day}")
+
+    def close(self):
+        """Flushes buffered records; call from on_close."""
+        self.flush()
+
+    # --- Reading ---
+    def segments(self, start=None, end=None):
+        """Yields readable Segments whose day overlaps [start, end], oldest first."""
+        first = _day_key(start) if start is not None else "00000000"
+        last = _day_key(end) if end is not None else "99999999"
+        for path in sorted(glob.glob(os.path.join(self.directory, "*" + SEGMENT_SUFFIX))):
+            day = os.path.basename(path)[:8]
+            if first <= day <= last:
+                try:
+                    yield Segment.open(path)
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Skipping unreadable history segment {path}: {e}")
+
+    def query(self, start, end, series=None, max_points=None):
+        """
+        Returns (times, values) for [start, end]. `values` has one column per
+        requested series (NaN where a segment lacks it). Only the matching
+        slice of each segment is paged in. With `max_points`, the result is
+        thinned by averaging fixed-size groups of records.
+        """
+        series = tuple(series) if series else self.series
+        times_parts, value_parts = [], []
+        for segment in self.segments(start, end):
+            records = segment.records()
+            if records is None:
+                continue
+            lo = int(np.searchsorted(records["t"], start, side="left"))
+            hi = int(np.searchsorted(records["t"], end, side="right"))
+            if lo >= hi:
+                continue
+            chunk = records[lo:hi]
+            values = np.full((hi - lo, len(series)), np.nan, dtype=np.float64)
+            for column, name in enumerate(series):
+                if name in segment.series:
+                    values[:, column] = chunk["v"][:, segment.series.index(name)]
+            times_parts.append(np.array(chunk["t"], dtype=np.float64))
+            value_parts.append(values)
+            del records, chunk
+
+        # Include records still waiting in the write batch
+        with self.lock:
+            pending = self._batch[:self._pending].copy()
+        pending = pending[(pending["t"] >= start) & (pending["t"] <= end)]
+        if len(pending):
+            values = np.full((len(pending), len(series)), np.nan, dtype=np.float64)
+            for column, name in enumerate(series):
+                if name in self.series:
+                    values[:, column] = pending["v"][:, self.series.index(name)]
+            times_parts.append(pending["t"].astype(np.float64))
+            value_parts.append(values)
+
+        if not times_parts:
+            return np.empty(0), np.empty((0, len(series)))
+        times = np.concatenate(times_parts)
+        values = np.concatenate(value_parts)
+
+        if max_points and len(times) > max_points:
+            group = -(-len(times) // max_points)
+            # Groups start every `group` records; the last one holds the remainder, so the newest samples are kept
+            starts = np.arange(0, len(times), group)
+            sizes = np.diff(np.append(starts, len(times)))
+            times = np.add.reduceat(times, starts) / sizes
+            present = ~np.isnan(values)
+            sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+            counts = np.add.reduceat(present.astype(np.int64), starts, axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = np.where(counts > 0, sums / counts, np.nan)
+        return times, values
+
+    # --- Retention & compaction ---
+    def maintain(self, now=None):
+        """Deletes segments past retention and compacts older raw segments."""
+        now = time.time() if now is None else now
+        expire_before = _day_key(now - self.retention_days * 86400)
+        compact_before = _day_key(now - self.compact_after_days * 86400)
+        removed = compacted = 0
+        for segment in list(self.segments()):
+            day = os.path.basename(segment.path)[:8]
+            try:
+                if day < expire_before:
+                    os.remove(segment.path)
+                    removed += 1
+                elif day < compact_before and segment.resolution < self.compact_resolution:
+                    self._compact(segment)
+                    compacted += 1
+            except OSError as e:
+                logging.warning(f"History maintenance failed for {segment.path}: {e}")
+        if removed or compacted:
+            logging.info(f"History maintenance: removed {removed} segments, compacted {compacted}.")
+        return removed, compacted
+
+    def _compact(self, segment):
+        """Rewrites a segment as `compact_resolution`-second averages, atomically."""
+        records = segment.records()
+        tmp_path = segment.path + ".tmp"
+        compact = Segment.create(tmp_path, segment.series, self.compact_resolution)
+        if records is not None:
+            buckets = (records["t"] // self.compact_resolution).astype(np.int64)
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            counts = np.diff(np.r_[starts, len(records)])
+            out = np.zeros(len(starts), dtype=segment.dtype)
+            out["t"] = buckets[starts] * self.compact_resolution
+            out["v"] = np.add.reduceat(records["v"].astype(np.float64), starts, axis=0) / counts[:, None]
+            with open(tmp_path, "ab") as f:
+                f.write(out.tobytes())
+            del records
+        os.replace(tmp_path, segment.path)
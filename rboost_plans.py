@@ -0,0 +1,183 @@
+"""
+Dependency-aware step plans for RBoost PRO.
+
+A plan is a list of steps, each naming the steps it must run after and the
+resources it needs exclusively (e.g. "disk"). The runner starts every step
+whose dependencies have finished and whose resources are free, so
+independent steps run side by side. A step that fails takes its dependents
+down with it; unrelated steps still run.
+
+Progress is weighted by how long each step took on earlier runs, tracked as
+a moving average in a small JSON file, so the bar advances at a steady rate
+and never moves backwards.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STEP_TIMINGS_FILE = "rboost_step_timings.json"
+
+Step = namedtuple("Step", ["name", "label", "run", "after", "resources", "estimate"])
+StepResult = namedtuple("StepResult", ["name", "status", "elapsed", "error"])  # status: done, failed or skipped
+PlanProgress = namedtuple("PlanProgress", ["fraction", "running", "finished", "total"])
+PlanResult = namedtuple("PlanResult", ["steps", "elapsed"])
+
+
+def step(name, run, label=None, after=(), resources=(), estimate=5.0):
+    """Builds a Step; `estimate` is the duration in seconds used until one has been measured."""
+    return Step(name, label or name, run, tuple(after), frozenset(resources), float(estimate))
+
+
+def check_plan(steps):
+    """Raises ValueError on duplicate names, unknown dependencies or cycles; returns steps in a valid order."""
+    by_name = {}
+    for item in steps:
+        if item.name in by_name:
+            raise ValueError(f"Duplicate step name: {item.name}")
+        by_name[item.name] = item
+    for item in steps:
+        for name in item.after:
+            if name not in by_name:
+                raise ValueError(f"Step {item.name} depends on unknown step {name}")
+
+    ordered, state = [], {}  # state: 1 visiting, 2 done
+
+    def visit(item, chain):
+        if state.get(item.name) == 2:
+            return
+        if state.get(item.name) == 1:
+            raise ValueError(f"Dependency cycle: {' -> '.join(chain + [item.name])}")
+        state[item.name] = 1
+        for name in item.after:
+            visit(by_name[name], chain + [item.name])
+        state[item.name] = 2
+        ordered.append(item)
+
+    for item in steps:
+        visit(item, [])
+    return ordered
+
+
+class StepTimings:
+    """Exponential moving average of each step's duration, persisted as JSON."""
+
+    def __init__(self, path=STEP_TIMINGS_FILE, alpha=0.3):
+        self.path = path
+        self.alpha = alpha
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=STEP_TIMINGS_FILE, alpha=0.3):
+        timings = cls(path, alpha)
+        try:
+            with open(path, "r") as f:
+                timings.durations = {name: float(value) for name, value in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable step timings {path}: {e}")
+        return timings
+
+    def estimate(self, item):
+        """Expected duration of a step: its measured average, else the step's own estimate."""
+        with self.lock:
+            return self.durations.get(item.name, item.estimate)
+
+    def record(self, name, seconds):
+        with self.lock:
+            previous = self.durations.get(name)
+            self.durations[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def save(self):
+        with self.lock:
+            durations = dict(self.durations)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(durations, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Failed to save step timings: {e}")
+
+
+class PlanRunner:
+    """
+    Runs a plan's steps on up to `workers` threads. `progress(PlanProgress)`
+    is called every `tick` seconds from the calling thread while steps run.
+    """
+
+    def __init__(self, steps, timings=None, workers=3, progress=None, tick=0.25):
+        self.steps = check_plan(list(steps))
+        self.timings = timings if timings is not None else StepTimings()
+        self.workers = workers
+        self.progress = progress
+        self.tick = tick
+
+    def _timed(self, item):
+        started = time.perf_counter()
+        item.run()
+        return time.perf_counter() - started
+
+    def run(self):
+        """Runs the plan to completion; returns a PlanResult with one StepResult per step, in plan order."""
+        plan_started = time.perf_counter()
+        weights = {item.name: max(self.timings.estimate(item), 0.01) for item in self.steps}
+        total_weight = sum(weights.values())
+        results = {}
+        pending = list(self.steps)
+        running = {}  # future -> (step, started)
+        held = set()
+        reported = 0.0
+
+        def report():
+            nonlocal reported
+            if self.progress is None:
+                return
+            now = time.perf_counter()
+            weight = sum(weights[name] for name in results)
+            for item, started in running.values():
+                # A running step fills its share at its expected pace, stopping short of the end
+                weight += weights[item.name] * min((now - started) / weights[item.name], 0.9)
+            reported = max(reported, weight / total_weight if total_weight else 1.0)
+            self.progress(PlanProgress(reported, [item.label for item, _ in running.values()], len(results), len(self.steps)))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                for item in list(pending):
+                    failed_deps = [name for name in item.after if name in results and results[name].status != "done"]
+                    if failed_deps:
+                        pending.remove(item)
+                        results[item.name] = StepResult(item.name, "skipped", 0.0, f"{failed_deps[0]} did not finish")
+                        logging.warning(f"Plan step {item.name} skipped: {failed_deps[0]} did not finish.")
+                        continue
+                    if len(running) >= self.workers or item.resources & held:
+                        continue
+                    if all(name in results for name in item.after):
+                        pending.remove(item)
+                        held |= item.resources
+                        running[executor.submit(self._timed, item)] = (item, time.perf_counter())
+                        logging.info(f"Plan step {item.name} started.")
+                if not running:
+                    continue  # Only skips happened; look at the remaining steps again
+                report()
+                done, _ = wait(list(running), timeout=self.tick, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, started = running.pop(future)
+                    held -= item.resources
+                    try:
+                        elapsed = future.result()
+                        results[item.name] = StepResult(item.name, "done", elapsed, None)
+                        self.timings.record(item.name, elapsed)
+                        logging.info(f"Plan step {item.name} finished in {elapsed:.1f}s.")
+                    except Exception as e:
+                        results[item.name] = StepResult(item.name, "failed", time.perf_counter() - started, e)
+                        logging.error(f"Plan step {item.name} failed: {e}")
+            report()
+
+        self.timings.save()
+        return PlanResult([results[item.name] for item in self.steps], time.perf_counter() - plan_started)
@@ -0,0 +1,372 @@
+"""
+Process list model for the RBoost PRO System Manager.
+
+ProcessSampler collects per-process stats in one batched sweep (one
+`oneshot()` block per process) and turns cumulative counters into rates by
+diffing against the previous sweep. ProcessTable keeps the current rows
+keyed by PID and applies each refresh as a diff (added / removed / changed),
+so the UI only touches rows that actually changed. A sorted name index and
+a sorted PID index answer the type-ahead filter with a binary search
+instead of a scan per keystroke, and top-N views use a heap rather than a
+full sort.
+"""
+import bisect
+import fnmatch
+import heapq
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+
+import psutil
+
+ProcessDiff = namedtuple("ProcessDiff", ["added", "removed", "changed"])
+
+ProcessStats = namedtuple("ProcessStats", [
+    "name",
+    "pid",
+    "cpu",        # % of total CPU capacity since the previous sweep
+    "rss",        # resident set size in bytes
+    "private",    # private bytes (Windows), None where unavailable
+    "read_bps",   # I/O read rate, None when access is denied
+    "write_bps",  # I/O write rate, None when access is denied
+    "threads",
+    "handles",    # handles on Windows, open file descriptors elsewhere
+    "ppid",       # parent PID, used for the tree view
+])
+
+TerminateReport = namedtuple("TerminateReport", ["terminated", "killed", "failed", "reclaimed_bytes"])
+
+DEFAULT_BLOAT_RULES = ["spotify.exe", "discord.exe", "epicgameslauncher.exe", "steam.exe"]
+
+# Never matched by bloat rules, whatever the patterns say
+PROTECTED_PROCESS_NAMES = frozenset([
+    "system", "system idle process", "registry", "smss.exe", "csrss.exe", "wininit.exe", "winlogon.exe",
+    "services.exe", "lsass.exe", "lsaiso.exe", "svchost.exe", "fontdrvhost.exe", "dwm.exe", "explorer.exe",
+    "sihost.exe", "ctfmon.exe", "memory compression", "secure system", "msmpeng.exe", "audiodg.exe",
+])
+
+# (title, stats field, width in px, anchor) for the Processes tab
+PROCESS_COLUMNS = [
+    ("Name", "name", 240, "w"),
+    ("PID", "pid", 70, "e"),
+    ("CPU %", "cpu", 70, "e"),
+    ("Memory", "rss", 100, "e"),
+    ("Private", "private", 100, "e"),
+    ("Read/s", "read_bps", 100, "e"),
+    ("Write/s", "write_bps", 100, "e"),
+    ("Threads", "threads", 70, "e"),
+    ("Handles", "handles", 80, "e"),
+]
+
+# Label -> (stats field, N) for the top-N selector
+TOP_N_VIEWS = {
+    "All processes": None,
+    "Top 10 by CPU": ("cpu", 10),
+    "Top 10 by memory": ("rss", 10),
+    "Top 10 by disk read": ("read_bps", 10),
+    "Top 10 by disk write": ("write_bps", 10),
+}
+
+
+def format_bytes(value, suffix=""):
+    """Formats a byte count (or rate) for a table cell."""
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}{suffix}" if unit == "B" else f"{value:.1f} {unit}{suffix}"
+        value /= 1024
+
+
+class ProcessSampler:
+    """Batched per-process stats with rates computed between sweeps."""
+
+    def __init__(self):
+        self.cpu_count = psutil.cpu_count() or 1
+        self._prev = {}  # (pid, create_time) -> (cpu seconds, read bytes, write bytes)
+        self._prev_time = None
+
+    def sweep(self):
+        """Returns {pid: ProcessStats} for every accessible process."""
+        now = time.monotonic()
+        elapsed = (now - self._prev_time) if self._prev_time is not None else None
+        current = {}
+        rows = {}
+        for proc in psutil.process_iter(['pid', 'name']):
+            try:
+                with proc.oneshot():
+                    pid = proc.info['pid']
+                    key = (pid, proc.create_time())
+                    times = proc.cpu_times()
+                    cpu_seconds = times.user + times.system
+                    memory = proc.memory_info()
+                    try:
+                        io = proc.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        read_bytes = write_bytes = None
+                    threads = proc.num_threads()
+                    ppid = proc.ppid()
+                    try:
+                        handles = proc.num_handles() if hasattr(proc, "num_handles") else proc.num_fds()
+                    except psutil.AccessDenied:
+                        handles = None
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+            current[key] = (cpu_seconds, read_bytes, write_bytes)
+            prev = self._prev.get(key)
+            cpu = read_bps = write_bps = None
+            if prev is not None and elapsed:
+                cpu = max(cpu_seconds - prev[0], 0.0) / elapsed * 100 / self.cpu_count
+                if read_bytes is not None and prev[1] is not None:
+                    read_bps = max(read_bytes - prev[1], 0) / elapsed
+                    write_bps = max(write_bytes - prev[2], 0) / elapsed
+            rows[pid] = ProcessStats(proc.info['name'] or "", pid, cpu, memory.rss,
+                                     getattr(memory, "private", None), read_bps, write_bps, threads, handles, ppid)
+
+        self._prev = current
+        self._prev_time = now
+        return rows
+
+
+class ProcessTable:
+    """Diff-applied process rows with a prefix filter index."""
+
+    def __init__(self):
+        self.rows = {}          # pid -> row tuple, row[0] is the process name
+        self._by_name = []      # sorted (lowercase name, pid)
+        self._by_pid = []       # sorted (str(pid), pid)
+        self.filter_text = ""
+        self.sort_field = "name"
+        self.sort_descending = False
+        self.top_n = None       # (field, n) to show only the N largest rows
+        self.tree_mode = False  # Show parents above their indented children
+        self.view = []          # PIDs currently shown, in display order
+        self._depth = {}        # pid -> indent level while in tree mode
+
+    def _index_add(self, pid, row):
+        bisect.insort(self._by_name, (row[0].lower(), pid))
+        bisect.insort(self._by_pid, (str(pid), pid))
+
+    def _index_remove(self, pid, row):
+        for index, entry in ((self._by_name, (row[0].lower(), pid)), (self._by_pid, (str(pid), pid))):
+            i = bisect.bisect_left(index, entry)
+            if i < len(index) and index[i] == entry:
+                del index[i]
+
+    def apply(self, rows):
+        """Replaces the table contents with `rows` ({pid: row}) and returns the diff."""
+        added = [pid for pid in rows if pid not in self.rows]
+        removed = [pid for pid in self.rows if pid not in rows]
+        changed = [pid for pid, row in rows.items() if pid in self.rows and self.rows[pid] != row]
+
+        for pid in removed:
+            self._index_remove(pid, self.rows.pop(pid))
+        for pid in changed:
+            old = self.rows[pid]
+            if old[0] != rows[pid][0]:
+                self._index_remove(pid, old)
+                self._index_add(pid, rows[pid])
+            self.rows[pid] = rows[pid]
+        for pid in added:
+            self.rows[pid] = rows[pid]
+            self._index_add(pid, rows[pid])
+
+        if added or removed or changed:
+            logging.debug(f"Process diff: +{len(added)} -{len(removed)} ~{len(changed)}")
+        self._rebuild_view()
+        return ProcessDiff(added, removed, changed)
+
+    def set_filter(self, text):
+        """Filters the view to names (or PIDs, for digits) starting with `text`."""
+        self.filter_text = text.strip().lower()
+        self._rebuild_view()
+
+    def set_sort(self, field, descending=None):
+        """Sorts by `field`; re-selecting the same field flips the direction."""
+        if descending is None:
+            descending = not self.sort_descending if field == self.sort_field else field != "name"
+        self.sort_field = field
+        self.sort_descending = descending
+        self._rebuild_view()
+
+    def set_top_n(self, top_n):
+        """Shows only the N largest rows by a field, or everything when None."""
+        self.top_n = top_n
+        self._rebuild_view()
+
+    def set_tree_mode(self, enabled):
+        """Switches between the flat list and the parent/child tree."""
+        self.tree_mode = enabled
+        self._rebuild_view()
+
+    def children_map(self):
+        """Returns {ppid: [child pids]} in name order for the current rows."""
+        children = {}
+        for _, pid in self._by_name:
+            children.setdefault(self.rows[pid].ppid, []).append(pid)
+        return children
+
+    def _tree_order(self):
+        """Depth-first order of all rows; orphans become roots."""
+        children = self.children_map()
+        order, depth = [], {}
+        roots = [pid for _, pid in self._by_name
+                 if self.rows[pid].ppid not in self.rows or self.rows[pid].ppid == pid]
+        stack = [(pid, 0) for pid in reversed(roots)]
+        while stack:
+            pid, level = stack.pop()
+            if pid in depth:
+                continue
+            depth[pid] = level
+            order.append(pid)
+            stack.extend((child, level + 1) for child in reversed(children.get(pid, [])) if child != pid)
+        return order, depth
+
+    def _value(self, pid, field):
+        value = getattr(self.rows[pid], field)
+        return -1 if value is None else value
+
+    def _prefix_range(self, index, prefix):
+        lo = bisect.bisect_left(index, (prefix,))
+        hi = bisect.bisect_left(index, (prefix + "\uffff",))
+        return index[lo:hi]
+
+    def _rebuild_view(self):
+        text = self.filter_text
+        if not text:
+            matches = self._by_name
+        elif text.isdigit():
+            matches = self._prefix_range(self._by_pid, text)
+        else:
+            matches = self._prefix_range(self._by_name, text)
+        pids = [pid for _, pid in matches]
+
+        self._depth = {}
+        if self.tree_mode and not text and self.top_n is None:
+            self.view, self._depth = self._tree_order()
+        elif self.top_n is not None:
+            field, n = self.top_n
+            self.view = heapq.nlargest(n, pids, key=lambda pid: self._value(pid, field))
+        elif self.sort_field == "name":
+            self.view = pids[::-1] if self.sort_descending else pids
+        else:
+            self.view = sorted(pids, key=lambda pid: self._value(pid, self.sort_field), reverse=self.sort_descending)
+
+    def display(self, pid):
+        """Returns the display cells for a PID, in PROCESS_COLUMNS order."""
+        row = self.rows.get(pid)
+        if row is None:
+            return ("",) * len(PROCESS_COLUMNS)
+        return (
+            "   " * self._depth.get(pid, 0) + row.name,
+            str(row.pid),
+            "-" if row.cpu is None else f"{row.cpu:.1f}",
+            format_bytes(row.rss),
+            format_bytes(row.private),
+            format_bytes(row.read_bps, "/s"),
+            format_bytes(row.write_bps, "/s"),
+            str(row.threads),
+            "-" if row.handles is None else str(row.handles),
+        )
+
+
+class BloatRules:
+    """
+    User-editable list of process name patterns (fnmatch style, case
+    insensitive) compiled into a single regular expression.
+    """
+
+    def __init__(self, patterns=DEFAULT_BLOAT_RULES):
+        self.patterns = [p.strip() for p in patterns if p.strip() and not p.strip().startswith("#")]
+        if self.patterns:
+            self._regex = re.compile("|".join(fnmatch.translate(p.lower()) for p in self.patterns))
+        else:
+            self._regex = None
+
+    def matches(self, name):
+        return bool(self._regex and name and self._regex.match(name.lower()))
+
+    def matching_pids(self):
+        """Returns the PIDs of running processes whose name matches a rule, never RBoost itself or a system process."""
+        pids = []
+        if self._regex is None:
+            return pids
+        own_pid = os.getpid()
+        for proc in psutil.process_iter(['pid', 'name']):
+            name = proc.info['name']
+            if proc.info['pid'] in (0, 4, own_pid) or (name or "").lower() in PROTECTED_PROCESS_NAMES:
+                continue
+            if self.matches(name):
+                pids.append(proc.info['pid'])
+        return pids
+
+
+def expand_trees(pids):
+    """Returns psutil.Process objects for `pids` and all their descendants, deduplicated."""
+    procs = {}
+    for pid in pids:
+        try:
+            root = psutil.Process(pid)
+            for proc in [root] + root.children(recursive=True):
+                procs.setdefault(proc.pid, proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return list(procs.values())
+
+
+def pids_by_name(name):
+    """Returns PIDs of every process named `name` (case insensitive)."""
+    name = name.lower()
+    return [proc.info['pid'] for proc in psutil.process_iter(['pid', 'name'])
+            if (proc.info['name'] or "").lower() == name]
+
+
+def terminate_processes(procs, timeout=3.0, kill_timeout=2.0):
+    """
+    Terminates all `procs` at once, waits for them together, then kills
+    any stragglers. Returns a TerminateReport; reclaimed_bytes is the
+    resident memory of the processes that actually exited.
+    """
+    rss = {}
+    signalled = []
+    failed = []
+    for proc in procs:
+        try:
+            rss[proc.pid] = proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            rss[proc.pid] = 0
+        try:
+            proc.terminate()
+            signalled.append(proc)
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.AccessDenied:
+            failed.append(proc)
+
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    killed = []
+    if alive:
+        logging.info(f"{len(alive)} processes ignored terminate; escalating to kill().")
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                failed.append(proc)
+        killed, still_alive = psutil.wait_procs(alive, timeout=kill_timeout)
+        failed.extend(proc for proc in still_alive if proc not in failed)
+
+    exited = list(gone) + list(killed)
+    report = TerminateReport(
+        terminated=len(gone),
+        killed=len(killed),
+        failed=len(failed),
+        reclaimed_bytes=sum(rss.get(proc.pid, 0) for proc in exited),
+    )
+    logging.info(f"Terminate report: {report}")
+    return report
@@ -0,0 +1,117 @@
+"""
+System restore point catalog for RBoost PRO.
+
+Restore points are enumerated through a PowerShell host as JSON, with
+creation times converted to Unix timestamps on the Windows side, so nothing
+depends on the console's column layout or the locale's date format. The
+list is cached until a restore point is created or removed through the
+catalog (or a refresh is asked for), so reopening the manager is instant.
+"""
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from rboost_shell import ps_quote
+
+RestorePoint = namedtuple("RestorePoint", ["sequence", "created", "description", "event_type", "point_type"])
+
+# RESTOREPOINTINFO dwRestorePtType values
+RESTORE_POINT_TYPES = {
+    0: "Application install",
+    1: "Application uninstall",
+    6: "Restore",
+    7: "Checkpoint",
+    10: "Device driver install",
+    12: "Modify settings",
+    13: "Cancelled operation",
+}
+
+# RESTOREPOINTINFO dwEventType values
+RESTORE_EVENT_TYPES = {
+    100: "Begin system change",
+    101: "End system change",
+    102: "Begin nested change",
+    103: "End nested change",
+}
+
+LIST_SCRIPT = (
+    "@(Get-ComputerRestorePoint | ForEach-Object { [pscustomobject]@{ "
+    "sequence = [int]$_.SequenceNumber; "
+    "created = ([DateTimeOffset][Management.ManagementDateTimeConverter]::ToDateTime($_.CreationTime)).ToUnixTimeSeconds(); "
+    "description = [string]$_.Description; "
+    "event_type = [int]$_.EventType; "
+    "point_type = [int]$_.RestorePointType } })"
+)
+
+
+def parse_restore_points(result):
+    """Turns the list script's JSON result into RestorePoint records, newest first."""
+    if result is None:
+        return []
+    if isinstance(result, dict):
+        result = [result]  # A single record arrives unwrapped
+    points = []
+    for item in result:
+        try:
+            created = datetime.fromtimestamp(int(item["created"]), timezone.utc)
+            points.append(RestorePoint(int(item["sequence"]), created, item.get("description") or "",
+                                       int(item.get("event_type") or 0), int(item.get("point_type") or 0)))
+        except (KeyError, TypeError, ValueError, OverflowError, OSError) as e:
+            logging.warning(f"Skipping unreadable restore point record {item!r}: {e}")
+    points.sort(key=lambda point: point.sequence, reverse=True)
+    return points
+
+
+def describe_restore_point(point):
+    """One-line summary of a restore point in local time."""
+    kind = RESTORE_POINT_TYPES.get(point.point_type, f"Type {point.point_type}")
+    return f"#{point.sequence:<5} {point.created.astimezone():%Y-%m-%d %H:%M}   {kind:<22} {point.description}"
+
+
+class RestorePointCatalog:
+    """
+    Cached restore point list over `run_script(script, timeout)`, e.g. a
+    ShellPool's run. create() and remove() invalidate the cache.
+    """
+
+    def __init__(self, run_script):
+        self.run_script = run_script
+        self.lock = threading.Lock()
+        self._points = None
+        self._generation = 0  # Bumped by invalidate() so a listing that raced a change is not cached
+
+    @property
+    def cached(self):
+        """The cached list, or None if it has to be fetched."""
+        return self._points
+
+    def invalidate(self):
+        self._generation += 1
+        self._points = None
+
+    def list(self, refresh=False):
+        """Returns RestorePoint records, newest first; only the first call after an invalidation queries Windows."""
+        with self.lock:
+            if self._points is not None and not refresh:
+                return self._points
+            generation = self._generation
+            points = parse_restore_points(self.run_script(LIST_SCRIPT, timeout=120))
+            if generation == self._generation:
+                self._points = points
+            return points
+
+    def create(self, description, drive="C:\\"):
+        """Enables System Restore on `drive` if needed and creates a checkpoint."""
+        try:
+            self.run_script(f"Enable-ComputerRestore -Drive {ps_quote(drive)}; Checkpoint-Computer -Description {ps_quote(description)}",
+                            timeout=600)
+        finally:
+            self.invalidate()
+
+    def remove(self, sequence):
+        """Removes the restore point with this sequence number."""
+        try:
+            self.run_script(f"Remove-ComputerRestorePoint -RestorePoint {int(sequence)}", timeout=120)
+        finally:
+            self.invalidate()
@@ -0,0 +1,314 @@
+"""
+Background metrics sampler for RBoost PRO.
+
+All psutil calls for the Dashboard run on a dedicated thread. Each tick
+publishes an immutable MetricsSnapshot that the Tk thread can read at any
+time without blocking. The sampler slows down on its own when nobody is
+looking at the charts or the machine is running on battery.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import psutil
+
+from rboost_telemetry import TelemetryStore
+
+MetricsSnapshot = namedtuple("MetricsSnapshot", [
+    "timestamp",     # time.time() of the sample
+    "cpu",           # total CPU %
+    "ram",           # RAM %
+    "net",           # combined send + receive rate in KB/s
+    "disk_percent",  # usage % of the system drive
+    "interval",      # sampling interval in effect when this was taken
+    "breakdown",     # Breakdown of per-core/per-disk/per-NIC series, or None
+])
+
+Breakdown = namedtuple("Breakdown", [
+    "per_cpu",          # CPU % per logical core
+    "disks",            # disk names, aligned with the disk_* arrays
+    "disk_read_bps",
+    "disk_write_bps",
+    "disk_read_iops",
+    "disk_write_iops",
+    "nics",             # interface names, aligned with the nic_* arrays
+    "nic_sent_bps",
+    "nic_recv_bps",
+])
+
+# Leading fields shared by psutil's sdiskio and snetio on every platform.
+_DISK_FIELDS = 4  # read_count, write_count, read_bytes, write_bytes
+_NIC_FIELDS = 2   # bytes_sent, bytes_recv
+
+DEFAULT_DISK = os.path.abspath(os.sep)  # e.g. C:\ on Windows, / elsewhere
+
+
+def _frozen(array):
+    """Marks an array read-only so snapshots stay immutable."""
+    array.flags.writeable = False
+    return array
+
+
+class BreakdownCollector:
+    """
+    Collects per-core CPU, per-disk and per-NIC counters in one pass per tick.
+    Devices are fixed on the first tick so every later tick is a straight
+    array subtraction; devices that disappear read as NaN.
+    """
+
+    def __init__(self):
+        self.cores = 0
+        self.disks = ()
+        self.nics = ()
+        self.series = None
+        self._prev_time = None
+        self._prev_disk = None
+        self._prev_nic = None
+
+    def _counter_matrix(self, counters, names, width):
+        """Packs per-device psutil counters into a (devices, width) array."""
+        missing = (np.nan,) * width
+        return np.array([counters[name][:width] if name in counters else missing for name in names],
+                        dtype=np.float64).reshape(len(names), width)
+
+    def collect(self, now):
+        """Returns a Breakdown; rates are zero on the first call."""
+        per_cpu = np.array(psutil.cpu_percent(interval=None, percpu=True), dtype=np.float64)
+        disk_counters = psutil.disk_io_counters(perdisk=True) or {}
+        nic_counters = psutil.net_io_counters(pernic=True) or {}
+
+        if self.series is None:
+            self.cores = len(per_cpu)
+            self.disks = tuple(sorted(disk_counters))
+            self.nics = tuple(sorted(nic_counters))
+            self.series = (
+                [f"cpu{i}" for i in range(self.cores)]
+                + [f"disk:{d}:{m}" for m in ("read_bps", "write_bps", "read_iops", "write_iops") for d in self.disks]
+                + [f"nic:{n}:{m}" for m in ("sent_bps", "recv_bps") for n in self.nics]
+            )
+            logging.info(f"Breakdown series: {self.cores} cores, {len(self.disks)} disks, {len(self.nics)} NICs.")
+
+        if len(per_cpu) != self.cores:
+            per_cpu = np.resize(np.append(per_cpu, np.full(self.cores, np.nan)), self.cores)
+
+        disk = self._counter_matrix(disk_counters, self.disks, _DISK_FIELDS)
+        nic = self._counter_matrix(nic_counters, self.nics, _NIC_FIELDS)
+
+        if self._prev_time is None:
+            disk_rates = np.zeros_like(disk)
+            nic_rates = np.zeros_like(nic)
+        else:
+            elapsed = max(now - self._prev_time, 1e-6)
+            # Counters can reset (device re-attached); clamp those deltas to zero
+            disk_rates = np.maximum(disk - self._prev_disk, 0.0) / elapsed
+            nic_rates = np.maximum(nic - self._prev_nic, 0.0) / elapsed
+        self._prev_time, self._prev_disk, self._prev_nic = now, disk, nic
+
+        return Breakdown(
+            per_cpu=_frozen(per_cpu),
+            disks=self.disks,
+            disk_read_bps=_frozen(disk_rates[:, 2]),
+            disk_write_bps=_frozen(disk_rates[:, 3]),
+            disk_read_iops=_frozen(disk_rates[:, 0]),
+            disk_write_iops=_frozen(disk_rates[:, 1]),
+            nics=self.nics,
+            nic_sent_bps=_frozen(nic_rates[:, 0]),
+            nic_recv_bps=_frozen(nic_rates[:, 1]),
+        )
+
+    def series_row(self, breakdown):
+        """Flattens a Breakdown into one row matching `self.series`."""
+        return np.concatenate((
+            breakdown.per_cpu,
+            breakdown.disk_read_bps, breakdown.disk_write_bps,
+            breakdown.disk_read_iops, breakdown.disk_write_iops,
+            breakdown.nic_sent_bps, breakdown.nic_recv_bps,
+        ))
+
+
+def _busiest(names, values):
+    """Returns (name, value) of the largest non-NaN entry, or None."""
+    if not len(values) or np.isnan(values).all():
+        return None
+    i = int(np.nanargmax(values))
+    return names[i], float(values[i])
+
+
+def summarize_breakdown(breakdown):
+    """Formats the busiest core, disk and NIC of a Breakdown as one line."""
+    parts = []
+    core = _busiest(range(len(breakdown.per_cpu)), breakdown.per_cpu)
+    if core:
+        parts.append(f"Busiest core: #{core[0]} ({core[1]:.0f}%)")
+    disk = _busiest(breakdown.disks, breakdown.disk_read_bps + breakdown.disk_write_bps)
+    if disk:
+        i = breakdown.disks.index(disk[0])
+        iops = breakdown.disk_read_iops[i] + breakdown.disk_write_iops[i]
+        parts.append(f"Disk {disk[0]}: {disk[1] / 1024:.0f} KB/s, {iops:.0f} IOPS")
+    nic = _busiest(breakdown.nics, breakdown.nic_sent_bps + breakdown.nic_recv_bps)
+    if nic:
+        i = breakdown.nics.index(nic[0])
+        parts.append(f"NIC {nic[0]}: ↑ {breakdown.nic_sent_bps[i] / 1024:.0f} KB/s ↓ {breakdown.nic_recv_bps[i] / 1024:.0f} KB/s")
+    return "  |  ".join(parts)
+
+
+class MetricsSampler:
+    """
+    Samples system metrics on its own thread and feeds a TelemetryStore.
+    The UI only ever reads `latest` and `window()`.
+    """
+
+    def __init__(self, store=None, interval=1.0, idle_interval=10.0, battery_interval=5.0,
+                 disk_path=DEFAULT_DISK, battery_check_every=60.0, breakdown=True, history=None):
+        self.store = store if store is not None else TelemetryStore(["cpu", "ram", "net"])
+        self.history = history  # Optional HistoryStore that persists the main series
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.battery_interval = battery_interval
+        self.disk_path = disk_path
+        self.battery_check_every = battery_check_every
+        self.breakdown = BreakdownCollector() if breakdown else None
+        self.breakdown_store = None  # Created on the first tick, once devices are known
+
+        self.latest = None  # Replaced atomically by the sampler thread
+        self.lock = threading.Lock()  # Guards the store between writer and readers
+        self.visible = True
+        self.minimized = False
+        self.on_battery = False
+        self.samples_taken = 0
+        self.sample_time_total = 0.0  # Seconds spent inside sample()
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._prev_net = None
+        self._last_battery_check = 0.0
+
+    # --- Rate control ---
+    def set_activity(self, visible=None, minimized=None):
+        """Updates UI visibility hints; wakes the thread if the rate should change."""
+        before = self.current_interval()
+        if visible is not None:
+            self.visible = visible
+        if minimized is not None:
+            self.minimized = minimized
+        if self.current_interval() != before:
+            logging.info(f"Metrics sampler interval changed to {self.current_interval()}s.")
+            self._wake_event.set()
+
+    def current_interval(self):
+        """Returns the sampling interval for the current window and power state."""
+        interval = self.interval
+        if self.minimized or not self.visible:
+            interval = max(interval, self.idle_interval)
+        if self.on_battery:
+            interval = max(interval, self.battery_interval)
+        return interval
+
+    def _check_battery(self, now):
+        """Refreshes the on-battery flag, at most once per `battery_check_every`."""
+        if now - self._last_battery_check < self.battery_check_every:
+            return
+        self._last_battery_check = now
+        try:
+            battery = psutil.sensors_battery() if hasattr(psutil, "sensors_battery") else None
+            self.on_battery = battery is not None and not battery.power_plugged
+        except Exception as e:
+            logging.warning(f"Could not read battery state: {e}")
+            self.on_battery = False
+
+    # --- Sampling ---
+    def sample(self):
+        """Takes one sample, stores it and returns the new snapshot."""
+        started = time.perf_counter()
+        now = time.time()
+        self._check_battery(now)
+
+        cpu = psutil.cpu_percent(interval=None)
+        ram = psutil.virtual_memory().percent
+
+        counters = psutil.net_io_counters()
+        net = 0.0
+        if self._prev_net is not None:
+            prev_time, prev_sent, prev_recv = self._prev_net
+            elapsed = max(now - prev_time, 1e-6)
+            # Clamped like the per-NIC rates: counters restart from zero when an adapter resets
+            net = max(((counters.bytes_sent - prev_sent) + (counters.bytes_recv - prev_recv)) / 1024 / elapsed, 0.0)
+        self._prev_net = (now, counters.bytes_sent, counters.bytes_recv)
+
+        try:
+            disk_percent = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            disk_percent = float("nan")
+
+        breakdown = self.breakdown.collect(now) if self.breakdown else None
+
+        with self.lock:
+            self.store.append(now, {"cpu": cpu, "ram": ram, "net": net})
+            if breakdown is not None:
+                if self.breakdown_store is None:
+                    self.breakdown_store = TelemetryStore(self.breakdown.series)
+                self.breakdown_store.append(now, self.breakdown.series_row(breakdown))
+        if self.history is not None:
+            self.history.append(now, (cpu, ram, net))
+        snapshot = MetricsSnapshot(now, cpu, ram, net, disk_percent, self.current_interval(), breakdown)
+        self.latest = snapshot
+
+        self.samples_taken += 1
+        self.sample_time_total += time.perf_counter() - started
+        return snapshot
+
+    def window(self, seconds, now=None):
+        """Reads a history window from the store under the sampler lock."""
+        with self.lock:
+            return self.store.window(seconds, time.time() if now is None else now)
+
+    def breakdown_window(self, seconds, now=None):
+        """Reads a per-device history window, or None before the first tick."""
+        with self.lock:
+            if self.breakdown_store is None:
+                return None
+            return self.breakdown_store.window(seconds, time.time() if now is None else now)
+
+    def average_sample_time(self):
+        """Returns the mean wall time of one sample() call in seconds."""
+        return self.sample_time_total / self.samples_taken if self.samples_taken else 0.0
+
+    # --- Thread lifecycle ---
+    def _run(self):
+        logging.info("Metrics sampler thread started.")
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"Error sampling system metrics: {e}")
+            self._wake_event.wait(self.current_interval())
+            self._wake_event.clear()
+        logging.info("Metrics sampler thread stopped.")
+
+    def start(self):
+        """Starts the sampler thread if it is not already running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="rboost-metrics-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stops the sampler thread and waits for it to exit."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+
+# --- Headless overhead measurement ---
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sampler = MetricsSampler()
+    for _ in range(count):
+        sampler.sample()
+    print(f"{count} samples, average {sampler.average_sample_time() * 1000:.3f} ms per sample")
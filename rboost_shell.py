@@ -0,0 +1,210 @@
+"""
+Persistent PowerShell hosts for RBoost PRO.
+
+Starting powershell.exe costs 0.5-2 seconds, which used to be paid for every
+restore point, listing and app removal. A ShellHost keeps one interpreter
+running and sends it scripts over its stdin; each request and response is a
+single JSON line, and responses carry a marker prefix so stray console
+output from a script can never be mistaken for one. A request that overruns
+its timeout kills the host, and a host that died is restarted on its next
+request. ShellPool hands out a few hosts, started lazily, so independent
+operations do not queue behind each other.
+
+The host command line is pluggable: stand_in_argv() runs a small Python
+interpreter speaking the same protocol, with Python expressions as scripts.
+"""
+import base64
+import json
+import logging
+import queue
+import subprocess
+import sys
+import threading
+from itertools import count
+
+FRAME_MARKER = "\x1eRBOOST "
+
+# Reads one JSON request per line, runs its script and writes one marked JSON response line
+_POWERSHELL_HOST = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::InputEncoding = New-Object Text.UTF8Encoding $false
+[Console]::OutputEncoding = New-Object Text.UTF8Encoding $false
+$marker = [string][char]30 + 'RBOOST '
+[Console]::Out.WriteLine($marker + '{"id":0,"ok":true,"result":"ready","error":null}')
+[Console]::Out.Flush()
+while ($null -ne ($line = [Console]::In.ReadLine())) {
+    $request = $line | ConvertFrom-Json
+    try {
+        $result = @(& ([ScriptBlock]::Create($request.script)))
+        if ($result.Count -eq 1) { $result = $result[0] }
+        $response = @{ id = $request.id; ok = $true; result = $result; error = $null }
+    } catch {
+        $response = @{ id = $request.id; ok = $false; result = $null; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine($marker + ($response | ConvertTo-Json -Depth 6 -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+_STAND_IN_HOST = r"""
+import json, os, sys, time
+marker = "\x1eRBOOST "
+print(marker + json.dumps({"id": 0, "ok": True, "result": "ready", "error": None}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    try:
+        response = {"id": request["id"], "ok": True, "result": eval(request["script"]), "error": None}
+    except Exception as e:
+        response = {"id": request["id"], "ok": False, "result": None, "error": str(e)}
+    print(marker + json.dumps(response), flush=True)
+"""
+
+
+class ShellError(OSError):
+    """A script failed, or the host could not run it."""
+
+
+class ShellTimeout(ShellError):
+    """A script overran its timeout; the host was killed."""
+
+
+class ShellExited(ShellError):
+    """The host died while running a script; it is restarted on the next request."""
+
+
+def powershell_argv():
+    """Command line for a PowerShell host; the loop is passed encoded to avoid quoting issues."""
+    encoded = base64.b64encode(_POWERSHELL_HOST.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+            "-EncodedCommand", encoded]
+
+
+def stand_in_argv():
+    """Command line for a Python host that speaks the same protocol, for running without PowerShell."""
+    return [sys.executable, "-u", "-c", _STAND_IN_HOST]
+
+
+class ShellHost:
+    """One long-lived interpreter process; requests are serialized."""
+
+    def __init__(self, argv=None, startup_timeout=30):
+        self.argv = argv or powershell_argv()
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.responses = None
+        self.lock = threading.Lock()
+        self.ids = count(1)
+        self.starts = 0
+
+    def _read_frames(self, process, responses):
+        for line in process.stdout:
+            line = line.lstrip("\ufeff")
+            if line.startswith(FRAME_MARKER):
+                try:
+                    responses.put(json.loads(line[len(FRAME_MARKER):]))
+                except ValueError:
+                    logging.warning(f"Unreadable shell host frame: {line[:200]!r}")
+        responses.put(None)  # Host exited
+
+    def _start(self):
+        creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        self.process = subprocess.Popen(self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        encoding="utf-8", errors="replace", bufsize=1, creationflags=creationflags)
+        self.responses = queue.Queue()
+        threading.Thread(target=self._read_frames, args=(self.process, self.responses), daemon=True).start()
+        self.starts += 1
+        self._wait(0, self.startup_timeout)
+        logging.info(f"Shell host started (pid {self.process.pid}).")
+
+    def _kill(self):
+        if self.process is not None:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self.process = None
+
+    def _wait(self, request_id, timeout):
+        while True:
+            try:
+                response = self.responses.get(timeout=timeout)
+            except queue.Empty:
+                self._kill()
+                raise ShellTimeout(f"Shell host did not answer within {timeout}s")
+            if response is None:
+                self._kill()
+                raise ShellExited("Shell host exited unexpectedly")
+            if response.get("id") == request_id:
+                return response
+
+    def run(self, script, timeout=60):
+        """Runs a script and returns its JSON-decoded output; raises ShellError if it fails."""
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self._kill()
+                self._start()
+            request_id = next(self.ids)
+            try:
+                self.process.stdin.write(json.dumps({"id": request_id, "script": script}) + "\n")
+                self.process.stdin.flush()
+            except OSError as e:
+                self._kill()
+                raise ShellExited(f"Shell host is not accepting input: {e}")
+            response = self._wait(request_id, timeout)
+        if not response.get("ok"):
+            raise ShellError(response.get("error") or "Script failed")
+        return response.get("result")
+
+    def close(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+                self._kill()
+
+
+class ShellPool:
+    """Up to `size` ShellHosts, created on first use; run() borrows an idle one."""
+
+    def __init__(self, size=2, argv=None):
+        self.size = size
+        self.argv = argv
+        self.hosts = []
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def _borrow(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.hosts) < self.size:
+                host = ShellHost(self.argv)
+                self.hosts.append(host)
+                return host
+        return self.idle.get()
+
+    def run(self, script, timeout=60):
+        """Runs a script on an idle host; see ShellHost.run."""
+        host = self._borrow()
+        try:
+            return host.run(script, timeout)
+        finally:
+            self.idle.put(host)
+
+    def close(self):
+        with self.lock:
+            hosts = list(self.hosts)
+        for host in hosts:
+            host.close()
+
+
+def ps_quote(value):
+    """Quotes a value as a PowerShell single-quoted string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
@@ -0,0 +1,197 @@
+"""
+Telemetry storage for the RBoost PRO dashboard.
+
+Samples are written into preallocated NumPy ring buffers and rolled up
+1s -> 1min -> 1h (min/mean/max) as they arrive, so memory stays constant
+and every append is O(1) no matter how long the app has been running.
+"""
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+# (name, resolution in seconds, capacity in rows)
+TELEMETRY_TIERS = (
+    ("1s", 1, 3600),          # 1 hour of raw samples
+    ("1min", 60, 7 * 1440),   # 7 days of minute rollups
+    ("1h", 3600, 90 * 24),    # 90 days of hour rollups
+)
+
+# Window choices offered on the Dashboard, in seconds.
+DASHBOARD_WINDOWS = {
+    "1 min": 60,
+    "1 h": 3600,
+    "24 h": 86400,
+}
+
+TelemetryWindow = namedtuple("TelemetryWindow", ["resolution", "times", "mean", "low", "high"])
+
+
+class RingBuffer:
+    """Fixed-capacity ring of timestamped rows backed by NumPy arrays."""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.width = width
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.rows = np.zeros((capacity, width), dtype=np.float64)
+        self.head = 0  # Next slot to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, row):
+        """Writes one row over the oldest slot."""
+        self.times[self.head] = timestamp
+        self.rows[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest(self):
+        """Returns the most recent (timestamp, row), or None when empty."""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return self.times[index], self.rows[index].copy()
+
+    def since(self, start):
+        """Returns copies of the (times, rows) recorded at or after `start`, oldest first."""
+        if self.count < self.capacity:
+            i = int(np.searchsorted(self.times[:self.count], start, side="left"))
+            return self.times[i:self.count].copy(), self.rows[i:self.count].copy()
+
+        # Full ring: [head:] holds the older half, [:head] the newer half.
+        if self.head and start >= self.times[0]:
+            i = int(np.searchsorted(self.times[:self.head], start, side="left"))
+            return self.times[i:self.head].copy(), self.rows[i:self.head].copy()
+        i = self.head + int(np.searchsorted(self.times[self.head:], start, side="left"))
+        times = np.concatenate((self.times[i:], self.times[:self.head]))
+        rows = np.concatenate((self.rows[i:], self.rows[:self.head]))
+        return times, rows
+
+
+class _Rollup:
+    """Accumulates one open bucket and flushes min/mean/max rows into its ring."""
+
+    def __init__(self, resolution, capacity, width):
+        self.resolution = resolution
+        self.width = width
+        self.ring = RingBuffer(capacity, width * 3)
+        self.bucket = None
+        self._reset()
+
+    def _reset(self):
+        self.low = np.full(self.width, np.inf)
+        self.high = np.full(self.width, -np.inf)
+        self.total = np.zeros(self.width)
+        self.weight = 0
+
+    def pending(self):
+        """Returns the open bucket as a (timestamp, row) pair, or None."""
+        if not self.weight:
+            return None
+        row = np.concatenate((self.low, self.total / self.weight, self.high))
+        return self.bucket * self.resolution, row
+
+    def add(self, timestamp, low, mean, high, weight=1):
+        """
+        Folds a sample (or a finer rollup row) into the open bucket.
+        Returns the flushed (timestamp, low, mean, high, weight) when a bucket closes.
+        """
+        bucket = int(timestamp // self.resolution)
+        flushed = None
+        if self.bucket is not None and bucket != self.bucket and self.weight:
+            start, row = self.pending()
+            self.ring.append(start, row)
+            w = self.width
+            flushed = (start, row[:w], row[w:2 * w], row[2 * w:], self.weight)
+            self._reset()
+        self.bucket = bucket
+        np.minimum(self.low, low, out=self.low)
+        np.maximum(self.high, high, out=self.high)
+        self.total += mean * weight
+        self.weight += weight
+        return flushed
+
+
+class TelemetryStore:
+    """
+    Multi-resolution history for a fixed set of numeric series.
+    Raw samples go into the finest tier; each closed bucket cascades
+    into the next coarser tier.
+    """
+
+    def __init__(self, series, tiers=TELEMETRY_TIERS):
+        self.series = tuple(series)
+        self.width = len(self.series)
+        self._index = {name: i for i, name in enumerate(self.series)}
+        name, resolution, capacity = tiers[0]
+        self.tier_names = [name]
+        self.resolutions = [resolution]
+        self.raw = RingBuffer(capacity, self.width)
+        self.rollups = []
+        for name, resolution, capacity in tiers[1:]:
+            self.tier_names.append(name)
+            self.resolutions.append(resolution)
+            self.rollups.append(_Rollup(resolution, capacity, self.width))
+        self.spans = [resolution * capacity for _, resolution, capacity in tiers]
+        logging.info(f"TelemetryStore created for series {self.series} with tiers {self.tier_names}.")
+
+    def index(self, name):
+        """Returns the column index of a series."""
+        return self._index[name]
+
+    def append(self, timestamp, values):
+        """
+        Records one sample. `values` is a mapping of series name to value
+        or a sequence in series order.
+        """
+        if hasattr(values, "get"):
+            row = np.array([values.get(name, np.nan) for name in self.series], dtype=np.float64)
+        else:
+            row = np.asarray(values, dtype=np.float64)
+        self.raw.append(timestamp, row)
+
+        low = mean = high = row
+        weight = 1
+        for rollup in self.rollups:
+            flushed = rollup.add(timestamp, low, mean, high, weight)
+            if flushed is None:
+                break
+            timestamp, low, mean, high, weight = flushed
+
+    def latest(self):
+        """Returns the last raw sample as a dict, or an empty dict."""
+        sample = self.raw.latest()
+        if sample is None:
+            return {}
+        return dict(zip(self.series, sample[1].tolist()))
+
+    def pick_tier(self, seconds, max_points=1440):
+        """Returns the finest tier that covers `seconds` within `max_points` rows."""
+        for tier, (resolution, span) in enumerate(zip(self.resolutions, self.spans)):
+            if span >= seconds and seconds / resolution <= max_points:
+                return tier
+        return len(self.resolutions) - 1
+
+    def window(self, seconds, now, max_points=1440):
+        """
+        Returns a TelemetryWindow for the last `seconds` before `now`, read
+        from a single tier; the open rollup bucket is included as the last row.
+        """
+        tier = self.pick_tier(seconds, max_points)
+        start = now - seconds
+        if tier == 0:
+            times, rows = self.raw.since(start)
+            return TelemetryWindow(self.resolutions[0], times, rows, rows, rows)
+
+        rollup = self.rollups[tier - 1]
+        times, rows = rollup.ring.since(start)
+        pending = rollup.pending()
+        if pending is not None and pending[0] >= start:
+            times = np.append(times, pending[0])
+            rows = np.vstack((rows, pending[1]))
+        w = self.width
+        return TelemetryWindow(rollup.resolution, times, rows[:, w:2 * w], rows[:, :w], rows[:, 2 * w:])
@@ -0,0 +1,339 @@
+"""
+Transactional tweak batches for RBoost PRO.
+
+A batch is a list of desired settings (registry values, service start
+modes, scheduled task states, startup entries). Before anything is
+written, the current value of every setting in the batch is read and only
+the ones that differ are recorded, as (before, after) pairs, in an
+append-only JSON-lines journal. The batch is then applied as a unit: if any
+write fails, the writes already made are undone. Any finished batch can
+later be rolled back from the journal in seconds, without a system restore
+point. State access goes through per-kind backends, so the journal and
+replay logic run against in-memory fakes.
+"""
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+from rboost_batches import run_hidden
+from rboost_tweaks import default_backend
+
+JOURNAL_FILE = "rboost_journal.jsonl"
+
+Change = namedtuple("Change", ["kind", "target", "value"])  # value None means absent/deleted
+BatchResult = namedtuple("BatchResult", ["batch_id", "changed", "unchanged", "failed", "rolled_back"])
+RollbackResult = namedtuple("RollbackResult", ["restored", "conflicts", "failed"])
+BatchSummary = namedtuple("BatchSummary", ["batch_id", "label", "started", "status", "changes"])
+
+
+def _freeze(value):
+    """JSON round-trips tuples as lists; compare and key on tuples."""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict) and set(value) == {"hex"}:
+        return bytes.fromhex(value["hex"])
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, (tuple, list)):
+        return [_thaw(item) for item in value]
+    if isinstance(value, bytes):
+        return {"hex": value.hex()}
+    return value
+
+
+# --- State backends ---
+class RegistryState:
+    """Registry values; target (hive, key, name), value (type, data)."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+
+    def read(self, targets):
+        by_key = {}
+        for target in targets:
+            by_key.setdefault(target[:2], []).append(target)
+        values = {}
+        for (hive, key), key_targets in by_key.items():
+            found = self.backend.read_values(hive, key, [target[2] for target in key_targets])
+            for target in key_targets:
+                current = found.get(target[2])
+                values[target] = tuple(current) if current is not None else None
+        return values
+
+    def write(self, target, value):
+        hive, key, name = target
+        self.backend.write_values(hive, key, [(name, None, None) if value is None else (name, value[0], value[1])])
+
+
+class ServiceState:
+    """Windows services; target service name, value (start type, status) as reported by psutil."""
+
+    SC_START = {"automatic": "auto", "manual": "demand", "disabled": "disabled"}
+    # sc exit codes meaning the service is already in the requested state
+    SC_ALREADY = {"stop": 1062, "start": 1056}
+    independent_fields = True  # Start type and status are rolled back separately
+
+    def __init__(self, runner=run_hidden, executor=None):
+        self.runner = executor.command if executor is not None else runner
+
+    def read(self, targets):
+        import psutil
+        values = {}
+        for name in targets:
+            try:
+                info = psutil.win_service_get(name).as_dict()
+                values[name] = (info["start_type"], "running" if info["status"] == "running" else "stopped")
+            except (psutil.NoSuchProcess, OSError):
+                values[name] = None
+        return values
+
+    def write(self, name, value):
+        start_type, status = value
+        code, out = self.runner(["sc", "config", name, "start=", self.SC_START[start_type]])
+        if code != 0:
+            raise OSError(f"sc config {name} failed ({code}): {out.strip()}")
+        action = "stop" if status == "stopped" else "start"
+        code, out = self.runner(["sc", action, name])
+        if code not in (0, self.SC_ALREADY[action]):
+            raise OSError(f"sc {action} {name} failed ({code}): {out.strip()}")
+
+
+class ScheduledTaskState:
+    """Task Scheduler tasks; target task path, value "enabled" or "disabled". Queries run on `executor` if given."""
+
+    def __init__(self, runner=run_hidden, executor=None):
+        self.runner = executor.command if executor is not None else runner
+        self.executor = executor
+
+    TASK_NAMESPACE = "{http://schemas.microsoft.com/windows/2004/02/mit/task}"
+
+    def _query(self, path):
+        # The task XML is not localized, unlike the Status column of the table and CSV formats
+        code, out = self.runner(["schtasks", "/query", "/tn", path, "/xml"])
+        if code != 0 or not out.strip():
+            return None
+        try:
+            enabled = ET.fromstring(out.strip()).find(f"{self.TASK_NAMESPACE}Settings/{self.TASK_NAMESPACE}Enabled")
+        except ET.ParseError as e:
+            raise OSError(f"Unreadable task definition for {path}: {e}")
+        # A missing <Enabled> element means the default, enabled
+        return "disabled" if enabled is not None and enabled.text.strip().lower() == "false" else "enabled"
+
+    def read(self, targets):
+        targets = list(targets)
+        states = self.executor.map(self._query, targets) if self.executor is not None else map(self._query, targets)
+        return dict(zip(targets, states))
+
+    def write(self, path, value):
+        code, out = self.runner(["schtasks", "/change", "/tn", path, "/DISABLE" if value == "disabled" else "/ENABLE"])
+        if code != 0:
+            raise OSError(f"schtasks /change {path} failed ({code}): {out.strip()}")
+
+
+class MemoryState:
+    """In-memory state for any kind, for tests and dry runs. `fail_on` targets raise on write."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.fail_on = set()
+        self.writes = []
+
+    def read(self, targets):
+        return {target: self.values.get(target) for target in targets}
+
+    def write(self, target, value):
+        if target in self.fail_on:
+            raise OSError(f"Access is denied: {target}")
+        self.writes.append((target, value))
+        if value is None:
+            self.values.pop(target, None)
+        else:
+            self.values[target] = value
+
+
+def registry_change(row):
+    """Turns a RegistryTweak row into a journaled Change."""
+    return Change("registry", (row.hive, row.key, row.name), None if row.data is None else (row.type, row.data))
+
+
+def default_backends(executor=None):
+    return {"registry": RegistryState(), "service": ServiceState(executor=executor),
+            "task": ScheduledTaskState(executor=executor)}
+
+
+# --- Journal ---
+class TweakJournal:
+    """
+    Applies batches of Change tuples and records what they replaced.
+    The journal file is append-only: a "batch" record holds the diff and
+    later "status" records update it, so a crash mid-batch leaves the
+    diff on disk with status "pending" and it can still be rolled back.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, backends=None, keep=500, executor=None):
+        self.path = path
+        self.backends = backends if backends is not None else default_backends(executor)
+        self.keep = keep
+        self.executor = executor  # A BatchExecutor writes a batch's targets concurrently
+        self.lock = threading.Lock()  # Batches may be applied from several threads at once
+
+    # Storage
+    def _append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _load(self):
+        """Returns {batch id: batch record} in journal order, with statuses folded in."""
+        batches = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line after a crash
+                    if record.get("type") == "batch":
+                        batches[record["id"]] = record
+                    elif record.get("type") == "status" and record["id"] in batches:
+                        batches[record["id"]]["status"] = record["status"]
+        except FileNotFoundError:
+            pass
+        return batches
+
+    def batches(self):
+        """Summaries of recorded batches, newest first."""
+        return [BatchSummary(record["id"], record["label"], record["started"], record["status"], len(record["changes"]))
+                for record in reversed(list(self._load().values()))]
+
+    def compact(self):
+        """Rewrites the journal with one record per batch, keeping the newest `keep` batches."""
+        with self.lock:
+            batches = list(self._load().values())[-self.keep:]
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in batches:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+
+    # State
+    def read_current(self, changes):
+        """Current value of every change's target, one read pass per kind."""
+        by_kind = {}
+        for change in changes:
+            by_kind.setdefault(change.kind, []).append(change.target)
+        current = {}
+        for kind, targets in by_kind.items():
+            for target, value in self.backends[kind].read(targets).items():
+                current[(kind, target)] = value
+        return current
+
+    def _write_all(self, steps):
+        """Writes (kind, target, value) steps, in order or concurrently on the executor; returns (done, failure or None)."""
+        if self.executor is not None:
+            def write(step):
+                self.backends[step[0]].write(step[1], step[2])
+                return "changed", None
+            reports = self.executor.run(steps, write)
+            done = [report.item[:2] for report in reports if report.status == "changed"]
+            failure = next(((report.item[0], report.item[1], report.detail) for report in reports if report.status == "failed"), None)
+            return done, failure
+        done = []
+        for kind, target, value in steps:
+            try:
+                self.backends[kind].write(target, value)
+            except (OSError, subprocess.SubprocessError) as e:
+                return done, (kind, target, e)
+            done.append((kind, target))
+        return done, None
+
+    # Batches
+    def apply(self, label, changes, skip_missing=False):
+        """
+        Applies `changes` as one unit. Targets already at their wanted value
+        are skipped and not journaled. With `skip_missing`, targets that do
+        not exist (e.g. a service not installed) are left alone.
+        """
+        changes = [change._replace(value=_freeze(change.value), target=_freeze(change.target)) for change in changes]
+        current = self.read_current(changes)
+        diff, unchanged = [], []
+        for change in changes:
+            before = current.get((change.kind, change.target))
+            if before == change.value or (skip_missing and before is None):
+                unchanged.append(change)
+            else:
+                diff.append((change, before))
+        if not diff:
+            logging.info(f"Tweak batch '{label}': nothing to change ({len(unchanged)} already set).")
+            return BatchResult(None, [], unchanged, [], False)
+
+        batch_id = uuid.uuid4().hex[:12]
+        self._append({"type": "batch", "id": batch_id, "label": label, "started": time.time(), "status": "pending",
+                      "changes": [{"kind": change.kind, "target": _thaw(change.target), "before": _thaw(before),
+                                   "after": _thaw(change.value)} for change, before in diff]})
+
+        done, failure = self._write_all([(change.kind, change.target, change.value) for change, _ in diff])
+        if failure is None:
+            self._append({"type": "status", "id": batch_id, "status": "applied"})
+            logging.info(f"Tweak batch '{label}' ({batch_id}): {len(diff)} changed, {len(unchanged)} already set.")
+            return BatchResult(batch_id, [change for change, _ in diff], unchanged, [], False)
+
+        kind, target, error = failure
+        logging.error(f"Tweak batch '{label}' failed at {kind} {target}: {error}; undoing {len(done)} changes.")
+        befores = {(change.kind, change.target): before for change, before in diff}
+        _, undo_failure = self._write_all([(kind_, target_, befores[(kind_, target_)]) for kind_, target_ in reversed(done)])
+        self._append({"type": "status", "id": batch_id, "status": "failed" if undo_failure is None else "partial"})
+        failed = [(change, error) for change, _ in diff if (change.kind, change.target) == (kind, target)]
+        return BatchResult(batch_id, [], unchanged, failed, undo_failure is None)
+
+    def rollback(self, batch_id, force=False):
+        """
+        Restores the values a batch replaced, newest change first. A target
+        that no longer holds the batch's value was changed by someone else
+        since; it is reported as a conflict and left alone unless `force`.
+        For backends with `independent_fields` (services), each field of the
+        value is checked on its own, so a stop that never completed does not
+        keep the start type from being restored.
+        """
+        record = self._load().get(batch_id)
+        if record is None:
+            raise KeyError(f"No tweak batch {batch_id}")
+        changes = [Change(entry["kind"], _freeze(entry["target"]), _freeze(entry["after"])) for entry in record["changes"]]
+        befores = [_freeze(entry["before"]) for entry in record["changes"]]
+        current = self.read_current(changes)
+
+        restored, conflicts, failed = [], [], []
+        for change, before in reversed(list(zip(changes, befores))):
+            now = current.get((change.kind, change.target))
+            if now == before:
+                continue  # Never applied or already restored
+            target_value = before
+            if now != change.value and not force:
+                if not (getattr(self.backends[change.kind], "independent_fields", False)
+                        and isinstance(now, tuple) and isinstance(before, tuple) and isinstance(change.value, tuple)):
+                    conflicts.append(change)
+                    continue
+                # Restore each field still holding the batch's value; keep fields changed since
+                target_value = tuple(old if current_field == new else current_field
+                                     for current_field, old, new in zip(now, before, change.value))
+                if any(current_field not in (old, new) for current_field, old, new in zip(now, before, change.value)):
+                    conflicts.append(change)
+                if target_value == now:
+                    continue
+            try:
+                self.backends[change.kind].write(change.target, target_value)
+                restored.append(change)
+            except (OSError, subprocess.SubprocessError) as e:
+                failed.append((change, e))
+        self._append({"type": "status", "id": batch_id, "status": "rolled_back" if not failed else "partial"})
+        logging.info(f"Rolled back tweak batch '{record['label']}' ({batch_id}): {len(restored)} restored, "
+                     f"{len(conflicts)} conflicts, {len(failed)} failed.")
+        return RollbackResult(restored, conflicts, failed)
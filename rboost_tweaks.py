@@ -0,0 +1,218 @@
+"""
+Declarative registry tweaks for RBoost PRO.
+
+Each tweak is one row of (hive, key, value name, type, data). The engine
+reads the current value of every row in a single pass, opening each key
+once, and writes only the rows that differ, all in-process through
+winreg. The registry backend is pluggable; MemoryRegistry stands in for
+winreg so the engine runs anywhere.
+"""
+import logging
+from collections import namedtuple
+
+RegistryTweak = namedtuple("RegistryTweak", ["hive", "key", "name", "type", "data"])  # data None deletes the value
+TweakResult = namedtuple("TweakResult", ["changed", "unchanged", "failed"])  # failed holds (tweak, error) pairs
+
+HIVE_ALIASES = {
+    "HKEY_CURRENT_USER": "HKCU",
+    "HKEY_LOCAL_MACHINE": "HKLM",
+    "HKEY_CLASSES_ROOT": "HKCR",
+    "HKEY_USERS": "HKU",
+}
+
+_MEMORY = r"HKLM\SYSTEM\CurrentControlSet\Control\Session Manager\Memory Management"
+_SERVICE_PROVIDER = r"HKLM\SYSTEM\CurrentControlSet\Services\Tcpip\ServiceProvider"
+
+
+def tweak(path, name, type_, data):
+    """Builds a RegistryTweak from a reg.exe style path like HKCU\\Software\\..."""
+    hive, _, key = path.partition("\\")
+    return RegistryTweak(HIVE_ALIASES.get(hive.upper(), hive.upper()), key, name, type_, data)
+
+
+TWEAK_GROUPS = {
+    "wallpaper_quality": [
+        tweak(r"HKCU\Control Panel\Desktop", "JPEGImportQuality", "REG_DWORD", 100),
+    ],
+    "file_extensions": [
+        tweak(r"HKCU\SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\Advanced", "HideFileExt", "REG_DWORD", 0),
+    ],
+    "dark_mode": [
+        tweak(r"HKCU\Software\Microsoft\Windows\CurrentVersion\Themes\Personalize", "AppsUseLightTheme", "REG_DWORD", 0),
+        tweak(r"HKCU\Software\Microsoft\Windows\CurrentVersion\Themes\Personalize", "SystemUsesLightTheme", "REG_DWORD", 0),
+    ],
+    "network_throttling": [
+        tweak(r"HKLM\SOFTWARE\Microsoft\Windows NT\CurrentVersion\Multimedia\SystemProfile", "NetworkThrottlingIndex", "REG_DWORD", 0xFFFFFFFF),
+    ],
+    "dns_priority": [
+        tweak(_SERVICE_PROVIDER, "DnsPriority", "REG_DWORD", 6),
+        tweak(_SERVICE_PROVIDER, "LocalPriority", "REG_DWORD", 4),
+        tweak(_SERVICE_PROVIDER, "HostsPriority", "REG_DWORD", 5),
+        tweak(_SERVICE_PROVIDER, "NetbtPriority", "REG_DWORD", 7),
+    ],
+    "telemetry": [
+        tweak(r"HKCU\Software\Microsoft\Windows\CurrentVersion\Privacy", "TailoredExperiencesWithDiagnosticDataEnabled", "REG_DWORD", 0),
+        tweak(r"HKCU\Software\Microsoft\Windows\CurrentVersion\Diagnostics\DiagTrack", "ShowedToastAtLevel", "REG_DWORD", 1),
+        tweak(r"HKLM\Software\Policies\Microsoft\Windows\System", "UploadUserActivities", "REG_DWORD", 0),
+        tweak(r"HKLM\Software\Policies\Microsoft\Windows\Windows Error Reporting", "DoReport", "REG_DWORD", 0),
+        tweak(r"HKLM\Software\Microsoft\Windows\Windows Error Reporting", "Disabled", "REG_DWORD", 1),
+    ],
+    "memory": [
+        tweak(_MEMORY, "LargeSystemCache", "REG_DWORD", 1),
+        tweak(_MEMORY, "SecondLevelDataCache", "REG_DWORD", 1),
+    ],
+}
+
+CORE_TWEAK_GROUPS = ("wallpaper_quality", "file_extensions", "dark_mode", "network_throttling", "dns_priority",
+                     "telemetry", "memory")
+
+
+def core_registry_tweaks():
+    """The rows applied by the core registry boost, in order."""
+    return [row for group in CORE_TWEAK_GROUPS for row in TWEAK_GROUPS[group]]
+
+
+# --- Backends ---
+class WinRegBackend:
+    """Reads and writes the real registry through winreg (Windows only)."""
+
+    def __init__(self):
+        import winreg
+        self.winreg = winreg
+        self.hives = {
+            "HKCU": winreg.HKEY_CURRENT_USER,
+            "HKLM": winreg.HKEY_LOCAL_MACHINE,
+            "HKCR": winreg.HKEY_CLASSES_ROOT,
+            "HKU": winreg.HKEY_USERS,
+        }
+
+    def read_values(self, hive, key, names):
+        """Returns {name: (type name, data)} for the names that exist under one key."""
+        winreg = self.winreg
+        values = {}
+        try:
+            with winreg.OpenKey(self.hives[hive], key, 0, winreg.KEY_READ | winreg.KEY_WOW64_64KEY) as handle:
+                for name in names:
+                    try:
+                        data, type_id = winreg.QueryValueEx(handle, name)
+                    except FileNotFoundError:
+                        continue
+                    values[name] = (_type_name(winreg, type_id), data)
+        except FileNotFoundError:
+            pass
+        return values
+
+    def write_values(self, hive, key, changes):
+        """Applies [(name, type name, data)] under one key; data None deletes the value."""
+        winreg = self.winreg
+        with winreg.CreateKeyEx(self.hives[hive], key, 0, winreg.KEY_WRITE | winreg.KEY_WOW64_64KEY) as handle:
+            for name, type_, data in changes:
+                if data is None:
+                    try:
+                        winreg.DeleteValue(handle, name)
+                    except FileNotFoundError:
+                        pass
+                else:
+                    winreg.SetValueEx(handle, name, 0, getattr(winreg, type_), data)
+
+
+def _type_name(winreg, type_id):
+    for name in ("REG_DWORD", "REG_QWORD", "REG_SZ", "REG_EXPAND_SZ", "REG_MULTI_SZ", "REG_BINARY"):
+        if getattr(winreg, name) == type_id:
+            return name
+    return str(type_id)
+
+
+class MemoryRegistry:
+    """
+    In-memory registry with the backend interface. Key paths and value
+    names are case-insensitive as on Windows. `reads` and `writes` count
+    key opens so tests can check batching.
+    """
+
+    def __init__(self, values=None):
+        self.keys = {}
+        self.reads = 0
+        self.writes = 0
+        self.denied = set()  # Hives that raise PermissionError on write
+        for row in values or ():
+            self.keys.setdefault((row.hive, row.key.lower()), {})[row.name.lower()] = (row.type, row.data)
+
+    def read_values(self, hive, key, names):
+        self.reads += 1
+        stored = self.keys.get((hive, key.lower()), {})
+        return {name: stored[name.lower()] for name in names if name.lower() in stored}
+
+    def write_values(self, hive, key, changes):
+        if hive in self.denied:
+            raise PermissionError(f"Access is denied: {hive}\\{key}")
+        self.writes += 1
+        stored = self.keys.setdefault((hive, key.lower()), {})
+        for name, type_, data in changes:
+            if data is None:
+                stored.pop(name.lower(), None)
+            else:
+                stored[name.lower()] = (type_, data)
+
+    def get(self, hive, key, name):
+        return self.keys.get((hive, key.lower()), {}).get(name.lower())
+
+
+def default_backend():
+    return WinRegBackend()
+
+
+# --- Engine ---
+def _group_by_key(tweaks):
+    groups = {}
+    for row in tweaks:
+        groups.setdefault((row.hive, row.key), []).append(row)
+    return groups
+
+
+def _matches(row, current):
+    if row.data is None:
+        return current is None
+    return current is not None and current[0] == row.type and current[1] == row.data
+
+
+class TweakEngine:
+    """Applies RegistryTweak rows, skipping rows whose value is already in place."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+
+    def read_state(self, tweaks):
+        """Returns {tweak: (type, data) or None}, opening each key once."""
+        state = {}
+        for (hive, key), rows in _group_by_key(tweaks).items():
+            try:
+                values = self.backend.read_values(hive, key, [row.name for row in rows])
+            except OSError as e:
+                logging.warning(f"Could not read {hive}\\{key}: {e}")
+                values = {}
+            for row in rows:
+                state[row] = values.get(row.name)
+        return state
+
+    def pending(self, tweaks, state=None):
+        """Rows whose current value differs from the wanted one."""
+        state = self.read_state(tweaks) if state is None else state
+        return [row for row in tweaks if not _matches(row, state.get(row))]
+
+    def apply(self, tweaks):
+        """Writes only the differing rows, one key open per key. Returns a TweakResult."""
+        tweaks = list(tweaks)
+        changes = self.pending(tweaks)
+        pending = set(changes)
+        unchanged = [row for row in tweaks if row not in pending]
+        changed, failed = [], []
+        for (hive, key), rows in _group_by_key(changes).items():
+            try:
+                self.backend.write_values(hive, key, [(row.name, row.type, row.data) for row in rows])
+                changed.extend(rows)
+            except OSError as e:
+                logging.error(f"Failed to write {hive}\\{key}: {e}")
+                failed.extend((row, e) for row in rows)
+        logging.info(f"Registry tweaks: {len(changed)} changed, {len(unchanged)} already set, {len(failed)} failed.")
+        return TweakResult(changed, unchanged, failed)
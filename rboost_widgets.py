@@ -0,0 +1,196 @@
+"""
+Reusable Tk widgets for RBoost PRO.
+"""
+import tkinter as tk
+
+
+class VirtualList(tk.Frame):
+    """
+    Virtualized multi-column list on a Tk canvas.
+
+    Only the rows that fit on screen exist as canvas items; scrolling and
+    refreshes re-use that fixed pool and only re-configure items whose text
+    changed. Rows are addressed by key (e.g. PID), so the selection survives
+    refreshes and reordering.
+    """
+
+    ROW_HEIGHT = 22
+    HEADER_HEIGHT = 24
+
+    def __init__(self, master, columns, row_text, bg="#2b2b2b", fg="white", select_bg="#4CAF50",
+                 header_bg="#333333", font=("Segoe UI", 10), on_select=None, on_context=None,
+                 on_header_click=None, **kwargs):
+        """
+        `columns` is a list of (title, width in px, anchor). `row_text(key)`
+        returns the tuple of cell strings for a key.
+        """
+        super().__init__(master, bg=bg, **kwargs)
+        self.columns = list(columns)
+        self.row_text = row_text
+        self.fg = fg
+        self.bg = bg
+        self.select_bg = select_bg
+        self.font = font
+        self.on_select = on_select
+        self.on_context = on_context
+        self.on_header_click = on_header_click
+
+        self.keys = []
+        self.top = 0
+        self.selected = None
+        self._pool = []      # [(highlight rect, [text items])] per visible slot
+        self._texts = {}     # item -> last text
+        self._fills = {}     # rect -> last fill
+        self._header_items = []
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        header_rect = self.canvas.create_rectangle(0, 0, 0, self.HEADER_HEIGHT, fill=header_bg, outline="")
+        self._header_rect = header_rect
+        for index, (title, _, anchor) in enumerate(self.columns):
+            item = self.canvas.create_text(0, self.HEADER_HEIGHT / 2, anchor=anchor, text=title, fill=fg,
+                                           font=(font[0], font[1], "bold"))
+            self._header_items.append(item)
+
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Button-3>", self._on_right_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+    # --- Geometry ---
+    def _column_x(self, index):
+        """Returns the anchor x position of column `index`."""
+        left = sum(width for _, width, _ in self.columns[:index]) + 6
+        _, width, anchor = self.columns[index]
+        if anchor == "e":
+            return left + width - 12
+        if anchor == "center":
+            return left + width / 2 - 6
+        return left
+
+    def visible_rows(self):
+        height = self.canvas.winfo_height() - self.HEADER_HEIGHT
+        return max(height // self.ROW_HEIGHT, 1)
+
+    def _layout(self):
+        """Sizes the item pool to the canvas and repositions the header."""
+        width = self.canvas.winfo_width()
+        self.canvas.coords(self._header_rect, 0, 0, width, self.HEADER_HEIGHT)
+        for index, item in enumerate(self._header_items):
+            self.canvas.coords(item, self._column_x(index), self.HEADER_HEIGHT / 2)
+
+        wanted = self.visible_rows()
+        while len(self._pool) < wanted:
+            slot = len(self._pool)
+            y = self.HEADER_HEIGHT + slot * self.ROW_HEIGHT
+            rect = self.canvas.create_rectangle(0, y, width, y + self.ROW_HEIGHT, fill=self.bg, outline="")
+            texts = [self.canvas.create_text(self._column_x(i), y + self.ROW_HEIGHT / 2, anchor=anchor,
+                                             text="", fill=self.fg, font=self.font)
+                     for i, (_, _, anchor) in enumerate(self.columns)]
+            self._pool.append((rect, texts))
+        while len(self._pool) > wanted:
+            rect, texts = self._pool.pop()
+            self.canvas.delete(rect, *texts)
+            self._fills.pop(rect, None)
+            for item in texts:
+                self._texts.pop(item, None)
+        for slot, (rect, _) in enumerate(self._pool):
+            y = self.HEADER_HEIGHT + slot * self.ROW_HEIGHT
+            self.canvas.coords(rect, 0, y, width, y + self.ROW_HEIGHT)
+        self.refresh()
+
+    # --- Data ---
+    def set_keys(self, keys):
+        """Replaces the ordered list of row keys and redraws visible rows."""
+        self.keys = keys
+        self.top = min(self.top, max(len(keys) - self.visible_rows(), 0))
+        self.refresh()
+
+    def refresh(self):
+        """Redraws the visible slots, touching only items whose content changed."""
+        for slot, (rect, texts) in enumerate(self._pool):
+            index = self.top + slot
+            if index < len(self.keys):
+                key = self.keys[index]
+                cells = self.row_text(key)
+                fill = self.select_bg if key == self.selected else self.bg
+            else:
+                cells = ("",) * len(texts)
+                fill = self.bg
+            if self._fills.get(rect) != fill:
+                self.canvas.itemconfigure(rect, fill=fill)
+                self._fills[rect] = fill
+            for item, text in zip(texts, cells):
+                if self._texts.get(item) != text:
+                    self.canvas.itemconfigure(item, text=text)
+                    self._texts[item] = text
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = max(len(self.keys), 1)
+        self.scrollbar.set(self.top / total, min((self.top + len(self._pool)) / total, 1.0))
+
+    # --- Scrolling & selection ---
+    def scroll_rows(self, delta):
+        limit = max(len(self.keys) - self.visible_rows(), 0)
+        top = min(max(self.top + delta, 0), limit)
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_rows(int(float(args[0]) * len(self.keys)) - self.top)
+        elif action == "scroll":
+            step = self.visible_rows() if args[1] == "pages" else 1
+            self.scroll_rows(int(args[0]) * step)
+
+    def _on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def key_at(self, y):
+        """Returns the row key under canvas y, or None."""
+        if y < self.HEADER_HEIGHT:
+            return None
+        index = self.top + int((y - self.HEADER_HEIGHT) // self.ROW_HEIGHT)
+        return self.keys[index] if 0 <= index < len(self.keys) else None
+
+    def _header_column(self, x):
+        left = 0
+        for index, (_, width, _) in enumerate(self.columns):
+            if left <= x < left + width:
+                return index
+            left += width
+        return None
+
+    def _on_click(self, event):
+        if event.y < self.HEADER_HEIGHT:
+            column = self._header_column(event.x)
+            if column is not None and self.on_header_click:
+                self.on_header_click(column)
+            return
+        key = self.key_at(event.y)
+        if key is not None:
+            self.selected = key
+            self.refresh()
+            if self.on_select:
+                self.on_select(key, event)
+
+    def _on_right_click(self, event):
+        key = self.key_at(event.y)
+        if key is not None:
+            self.selected = key
+            self.refresh()
+            if self.on_context:
+                self.on_context(key, event)
+
+    def set_header_text(self, column, text):
+        """Updates a column title (e.g. to show a sort arrow)."""
+        self.canvas.itemconfigure(self._header_items[column], text=text)
@@ -0,0 +1,90 @@
+"""
+Protocol and pool tests for rboost_shell, run against the Python stand-in
+host so they need neither Windows nor PowerShell.
+"""
+import threading
+import unittest
+
+from rboost_shell import ShellError, ShellExited, ShellHost, ShellPool, ShellTimeout, stand_in_argv
+
+
+class ShellHostTest(unittest.TestCase):
+
+    def setUp(self):
+        self.host = ShellHost(stand_in_argv())
+
+    def tearDown(self):
+        self.host.close()
+
+    def test_round_trip_returns_structured_result(self):
+        self.assertEqual(self.host.run("1 + 1"), 2)
+        self.assertEqual(self.host.run("{'a': [1, 'x\\ny'], 'b': None}"), {"a": [1, "x\ny"], "b": None})
+        self.assertEqual(self.host.starts, 1)
+
+    def test_script_error_raises_and_keeps_host(self):
+        with self.assertRaises(ShellError) as raised:
+            self.host.run("1 / 0")
+        self.assertNotIsInstance(raised.exception, (ShellTimeout, ShellExited))
+        self.assertIn("division by zero", str(raised.exception))
+        self.assertEqual(self.host.run("'still here'"), "still here")
+        self.assertEqual(self.host.starts, 1)
+
+    def test_stray_output_is_not_a_response(self):
+        self.assertEqual(self.host.run("print('noise') or 7"), 7)
+
+    def test_timeout_kills_host_and_next_request_restarts_it(self):
+        with self.assertRaises(ShellTimeout):
+            self.host.run("time.sleep(5)", timeout=0.5)
+        self.assertIsNone(self.host.process)
+        self.assertEqual(self.host.run("'back'"), "back")
+        self.assertEqual(self.host.starts, 2)
+
+    def test_crash_raises_exited_and_restarts(self):
+        with self.assertRaises(ShellExited):
+            self.host.run("os._exit(3)")
+        self.assertEqual(self.host.run("3 * 3"), 9)
+        self.assertEqual(self.host.starts, 2)
+
+
+class ShellPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ShellPool(size=2, argv=stand_in_argv())
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_hosts_start_lazily(self):
+        self.assertEqual(self.pool.hosts, [])
+        self.assertEqual(self.pool.run("'x'"), "x")
+        self.assertEqual(len(self.pool.hosts), 1)
+
+    def test_concurrent_requests_share_at_most_size_hosts(self):
+        # Start both hosts first so interpreter start-up does not decide whether the calls overlap
+        hosts = [self.pool._borrow(), self.pool._borrow()]
+        for host in hosts:
+            host.run("1")
+            self.pool.idle.put(host)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.pool.run("[time.time(), time.sleep(0.5), time.time()]")))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(self.pool.hosts), 2)
+        # Measured inside the hosts: two scripts at a time, never more
+        spans = [(started, ended) for started, _, ended in results]
+        running = [sum(1 for other in spans if other[0] <= started < other[1]) for started, _ in spans]
+        self.assertEqual(max(running), 2)
+
+    def test_failed_host_is_returned_to_the_pool(self):
+        with self.assertRaises(ShellTimeout):
+            self.pool.run("time.sleep(5)", timeout=0.5)
+        self.assertEqual(self.pool.run("'ok'"), "ok")
+        self.assertEqual(len(self.pool.hosts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()